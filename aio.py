@@ -0,0 +1,172 @@
+import asyncio
+from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from base import BaseParser
+from parser_arbitr import ArbitrParser
+from parser_inn import InnParser
+from parser_npd import NpdParser
+from parser_rom import RomParser
+from pool import DriverPool
+
+# Атрибут цикла событий со словарем семафоров сайтов {хост: семафор}
+_SEMAPHORES_ATTR = "_parser_site_semaphores"
+
+
+def site_semaphore(url: str, limit: int) -> asyncio.Semaphore:
+    """
+    Возвращает общий для текущего цикла событий семафор сайта (по хосту URL).
+
+    Парсеры одного хоста (например, InnParser и RomParser на service.nalog.ru) делят один семафор;
+    лимит задается первым обратившимся к нему парсером. Семафоры хранятся в самом цикле событий
+    (семафор, на котором ждали, ссылается на свой цикл), поэтому освобождаются вместе с ним.
+    """
+    loop = asyncio.get_running_loop()
+    semaphores = getattr(loop, _SEMAPHORES_ATTR, None)
+    if semaphores is None:
+        semaphores = {}
+        setattr(loop, _SEMAPHORES_ATTR, semaphores)
+    host = urlsplit(url).hostname or url
+    semaphore = semaphores.get(host)
+    if semaphore is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+class AsyncBaseParser:
+    """
+    Асинхронная обертка над Selenium-парсером. Вызовы parse() выполняются в пуле потоков на драйверах
+    из DriverPool, число одновременных запросов к сайту ограничивается семафором хоста.
+    """
+    PARSER: type[BaseParser]
+
+    def __init__(
+            self,
+            timeout: int | float = 30,
+            headless: bool = True,
+            workers: int = 2,
+            concurrency: Optional[int] = None,
+            pool: Optional[DriverPool] = None,
+    ) -> None:
+        """
+        Инициализация асинхронного парсера.
+
+        Args:
+            timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
+            headless (bool): Если True, запускает браузеры в фоновом режиме без GUI (по-умолчанию True).
+            workers (int): Количество потоков и драйверов для этого парсера.
+            concurrency (Optional[int]): Лимит одновременных запросов к сайту (по-умолчанию равен workers).
+            pool (Optional[DriverPool]): Общий пул драйверов. Если не задан, создается собственный.
+        """
+        self.workers = workers
+        self.concurrency = concurrency or workers
+        self._owns_pool = pool is None
+        self._pool = pool or DriverPool(parsers=(self.PARSER,), size=workers, timeout=timeout, headless=headless)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.PARSER.__name__)
+
+    def _parse_sync(self, args: tuple, kwargs: dict[str, Any]) -> Any:
+        """Выполняет parse() на драйвере из пула (в рабочем потоке)."""
+        with self._pool.checkout(self.PARSER) as parser:
+            return parser.parse(*args, **kwargs)
+
+    async def _run(self, *args, call_timeout: Optional[int | float] = None, **kwargs) -> Any:
+        """
+        Выполняет parse() с учетом лимита сайта и таймаута вызова.
+
+        Raises:
+            asyncio.TimeoutError: Вызов не завершился за call_timeout секунд. Начатый сценарий
+                доигрывается в фоне, драйвер возвращается в пул после его завершения.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = site_semaphore(self.PARSER.URL, self.concurrency)
+        await semaphore.acquire()
+
+        # Семафор освобождается только после фактического завершения потока: отмена или таймаут
+        # не прерывают уже начатый Selenium-сценарий.
+        try:
+            future = self._executor.submit(self._parse_sync, args, kwargs)
+        except RuntimeError:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._release(loop, semaphore))
+        return await asyncio.wait_for(asyncio.wrap_future(future), call_timeout)
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore) -> None:
+        """Освобождает семафор сайта из рабочего потока."""
+        with suppress(RuntimeError):
+            loop.call_soon_threadsafe(semaphore.release)
+
+    async def close(self) -> None:
+        """Дожидается завершения текущих вызовов и закрывает драйверы."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        if self._owns_pool:
+            await loop.run_in_executor(None, self._pool.close)
+
+    async def __aenter__(self) -> 'AsyncBaseParser':
+        """Поддержка асинхронного менеджера контекста."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Закрытие драйверов при выходе из контекста."""
+        await self.close()
+
+
+class AsyncArbitrParser(AsyncBaseParser):
+    """Асинхронный парсер судебных производств на сайте kad.arbitr."""
+    PARSER = ArbitrParser
+
+    async def parse(self, inn: str, call_timeout: Optional[int | float] = None) -> bool:
+        """См. ArbitrParser.parse. call_timeout — общий таймаут вызова (в секундах)."""
+        return await self._run(inn, call_timeout=call_timeout)
+
+
+class AsyncInnParser(AsyncBaseParser):
+    """Асинхронный парсер ИНН по личным данным."""
+    PARSER = InnParser
+
+    async def parse(
+            self, surname: str, name: str, lastname: str, birthdate: str, passport: str,
+            call_timeout: Optional[int | float] = None,
+    ) -> str:
+        """См. InnParser.parse. call_timeout — общий таймаут вызова (в секундах)."""
+        return await self._run(surname, name, lastname, birthdate, passport, call_timeout=call_timeout)
+
+
+class AsyncNpdParser(AsyncBaseParser):
+    """Асинхронный парсер статуса самозанятости."""
+    PARSER = NpdParser
+
+    async def parse(self, inn: str, call_timeout: Optional[int | float] = None) -> bool:
+        """См. NpdParser.parse. call_timeout — общий таймаут вызова (в секундах)."""
+        return await self._run(inn, call_timeout=call_timeout)
+
+
+class AsyncRomParser(AsyncBaseParser):
+    """Асинхронный парсер реестра обеспечительных мер."""
+    PARSER = RomParser
+
+    async def parse(self, inn: str, call_timeout: Optional[int | float] = None) -> bool:
+        """См. RomParser.parse. call_timeout — общий таймаут вызова (в секундах)."""
+        return await self._run(inn, call_timeout=call_timeout)
+
+
+# Пример использования
+async def main():
+    async with AsyncNpdParser() as npd, AsyncRomParser() as rom, AsyncArbitrParser() as arbitr:
+        inn = "500100732259"
+        results = await asyncio.gather(
+            npd.parse(inn, call_timeout=60),
+            rom.parse(inn, call_timeout=60),
+            arbitr.parse(inn, call_timeout=60),
+            return_exceptions=True,
+        )
+        for service, result in zip(("npd", "rom", "arbitr"), results):
+            print(service, result)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
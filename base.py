@@ -1,14 +1,151 @@
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from selenium.common import NoSuchElementException, TimeoutException, WebDriverException
+
+from browser_profile import DEFAULT_PROFILE, BrowserProfile, RequestInterceptor, page_load_report
+from checkpoint import BatchCheckpoint
+from exceptions import LayoutDriftError
+from locators import LOCATOR_STATS, Locator, Selector, compile_registry, script_arguments
+from results import ParseResult, status_of
+from tracing import traced
+from useragents import random_user_agent
+
+logger = logging.getLogger(__name__)
+
+# Пакет selenium.webdriver (около 0.1 с на импорт) загружается только при создании драйвера
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
 
-from fake_useragent import UserAgent
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class By:
+    """
+    Стратегии поиска элементов. Значения совпадают с selenium.webdriver.common.by.By, но импорт
+    не требует загрузки selenium.webdriver.
+    """
+    ID = "id"
+    XPATH = "xpath"
+    LINK_TEXT = "link text"
+    PARTIAL_LINK_TEXT = "partial link text"
+    NAME = "name"
+    TAG_NAME = "tag name"
+    CLASS_NAME = "class name"
+    CSS_SELECTOR = "css selector"
+
+
+# Перехватчики XHR/fetch, устанавливаемые в каждый новый документ через CDP: считают начатые
+# и незавершенные запросы и время последней сетевой активности.
+_HOOKS_JS = """
+(() => {
+    if (window.__parserHooks) return;
+    const hooks = window.__parserHooks = {started: 0, pending: 0, last: Date.now()};
+    const begin = () => { hooks.started++; hooks.pending++; hooks.last = Date.now(); };
+    const end = () => { hooks.pending = Math.max(0, hooks.pending - 1); hooks.last = Date.now(); };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        begin();
+        this.addEventListener('loadend', end);
+        return send.apply(this, args);
+    };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function (...args) { begin(); return fetch.apply(this, args).finally(end); };
+    }
+})();
+"""
+
+# Сеть простаивает: документ загружен и нет незавершенных запросов в течение arguments[0] мс.
+_NETWORK_IDLE_JS = """
+const hooks = window.__parserHooks;
+if (document.readyState !== 'complete') return false;
+return !hooks || (hooks.pending === 0 && Date.now() - hooks.last >= arguments[0]);
+"""
+
+# Запоминает состояние страницы перед отправкой формы, чтобы отличить новый ответ от старого.
+_MARK_PAGE_JS = """
+window.__parserMark = {started: window.__parserHooks ? window.__parserHooks.started : 0};
+"""
+
+# Общая часть скриптов поиска: поиск по стратегии By (выражения XPath компилируются один раз
+# на документ), проверка отображения и поиск по вариантам локатора реестра (см. locators).
+_FIND_JS = """
+const xpaths = window.__parserXPaths || (window.__parserXPaths = new Map());
+const find = (by, value) => {
+    switch (by) {
+        case 'id': return [document.getElementById(value)];
+        case 'css selector': return Array.from(document.querySelectorAll(value));
+        case 'class name': return Array.from(document.getElementsByClassName(value));
+        case 'name': return Array.from(document.getElementsByName(value));
+        case 'tag name': return Array.from(document.getElementsByTagName(value));
+        case 'xpath': {
+            let expression = xpaths.get(value);
+            if (!expression) xpaths.set(value, expression = document.createExpression(value));
+            return [expression.evaluate(document, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue];
+        }
+        default: throw new Error('Unsupported locator: ' + by);
+    }
+};
+const displayed = node => {
+    if (!node || !node.isConnected || node.getClientRects().length === 0) return false;
+    const style = window.getComputedStyle(node);
+    return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+};
+const locate = (candidates, accept = displayed) => {
+    for (let index = 0; index < candidates.length; index++) {
+        const node = find(...candidates[index]).find(accept);
+        if (node) return [node, index];
+    }
+    return null;
+};
+const hooks = window.__parserHooks;
+const idleFor = ms => document.readyState === 'complete' && !!hooks && hooks.pending === 0 && Date.now() - hooks.last >= ms;
+"""
+
+# За один вызов возвращает [имя, номер варианта] первого отображаемого элемента. Локаторы результата
+# (arguments[1]) учитываются только после ответа сервера: документ заменен или начатые после отметки
+# запросы завершились. Если ответ получен, сеть простаивает arguments[3] мс и страница опознается
+# по локатору arguments[2], но ни один элемент результата не найден, возвращает [null, -1].
+_FIND_DISPLAYED_JS = _FIND_JS + """
+const [immediate, results, anchor, driftMs] = arguments;
+const check = locators => {
+    for (const [name, candidates] of locators) {
+        const found = locate(candidates);
+        if (found) return [name, found[1]];
+    }
+    return null;
+};
+const mark = window.__parserMark;
+const responded = !mark || !hooks || (hooks.started > mark.started && hooks.pending === 0);
+const outcome = check(immediate) || (responded ? check(results) : null);
+if (outcome) return outcome;
+const drift = anchor !== null && results.length > 0 && responded && idleFor(driftMs) && locate(anchor) !== null;
+return drift ? [null, -1] : null;
+"""
+
+# За один вызов находит отображаемые и доступные элементы реестра: {имя: [элемент, номер варианта]}
+# и признак того, что страница загружена, сеть простаивает arguments[2] мс и страница опознается
+# (найден хотя бы один элемент или отображается локатор arguments[1]).
+_LOCATE_JS = _FIND_JS + """
+const [locators, anchor, driftMs] = arguments;
+const usable = node => displayed(node) && !node.disabled;
+const found = {};
+for (const [name, candidates] of locators) {
+    const match = locate(candidates, usable);
+    if (match) found[name] = match;
+}
+const recognized = Object.keys(found).length > 0 || (anchor !== null && locate(anchor) !== null);
+return [found, idleFor(driftMs) && recognized];
+"""
 
 
 class BaseParser(ABC):
@@ -19,7 +156,55 @@ class BaseParser(ABC):
 
     DRIVER_PATH = "yandexdriver.exe"
 
-    def __init__(self, url: str, timeout: int | float, headless: bool) -> None:
+    # Профиль запуска браузера (None — DEFAULT_PROFILE) и шаблоны URL, которые профиль не должен
+    # блокировать (скрипты и запросы, нужные форме; применяются к отдельным запросам, см. RequestInterceptor)
+    PROFILE: Optional[BrowserProfile] = None
+    RESOURCE_ALLOWLIST: tuple[str, ...] = ()
+
+    # Время жизни результатов в ResultCache (в секундах): успешных и отрицательных (InnNotFoundError)
+    CACHE_TTL = 60 * 60
+    NEGATIVE_CACHE_TTL = 60 * 60
+
+    # Наблюдение за собственным браузером (см. supervised): предел памяти браузера (в МБ, None — без
+    # предела) и период его проверки (в секундах)
+    MAX_RSS_MB: Optional[int] = None
+    HEALTH_CHECK_INTERVAL = 30.0
+
+    # Допустимая длина ИНН во входных данных (см. validation.validate_inn)
+    INN_LENGTHS: tuple[int, ...] = (10, 12)
+
+    # Элементы результата и ошибок формы, которых ожидает _wait_for_response(), и элементы формы.
+    # Значение — локатор или варианты в порядке предпочтения (см. locators); вместе три словаря
+    # образуют реестр локаторов парсера для locate() и wait_for_locators().
+    RESULTS: dict[str, Locator | Selector] = {}
+    ERRORS: dict[str, Locator | Selector] = {}
+    LOCATORS: dict[str, Locator | Selector] = {}
+
+    # Элемент реестра, по которому опознается страница сервиса (None — изменение разметки не
+    # определяется), и простой сети (в секундах), после которого отсутствие ожидаемых элементов на
+    # опознанной странице считается изменением разметки (LayoutDriftError), а не ожиданием ответа
+    PAGE_ANCHOR: Optional[str] = None
+    DRIFT_GRACE = 3.0
+
+    _registry: dict[str, Selector] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Реестр проверяется и приводится к вариантам один раз при определении класса
+        cls._registry = {
+            **compile_registry(cls.ERRORS), **compile_registry(cls.RESULTS), **compile_registry(cls.LOCATORS),
+        }
+        if cls.PAGE_ANCHOR is not None and cls.PAGE_ANCHOR not in cls._registry:
+            raise ValueError(f"{cls.__name__}.PAGE_ANCHOR: элемент {cls.PAGE_ANCHOR} отсутствует в реестре")
+
+    def __init__(
+            self,
+            url: str,
+            timeout: int | float,
+            headless: bool,
+            driver: Optional[WebDriver] = None,
+            lazy: bool = False,
+    ) -> None:
         """
         Инициализация базового парсера.
 
@@ -27,15 +212,81 @@ class BaseParser(ABC):
             url (str): URL страницы, которую необходимо открыть в браузере.
             timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
             headless (bool): Если True, запускает браузер в фоновом режиме без GUI.
+            driver (Optional[WebDriver]): Готовый драйвер (например, из DriverPool). Должен быть уже
+                открыт на странице url. Внешний драйвер не закрывается в close().
+            lazy (bool): Если True, браузер запускается при первом обращении к driver, а не в конструкторе.
         """
+        self.url = url
         self.timeout = timeout
-        self.ua = UserAgent(browsers='chrome', os="windows", platforms="pc")
-        self.driver = self._initialize_driver(headless)
-        self.driver.get(url)
+        self.headless = headless
+        self._owns_driver = driver is None
+        # Закрывать драйвер в close(): собственный или переданный во владение (BrowserHost.parser)
+        self._closes_driver = self._owns_driver
+        self._driver = driver
+        self.restarts = 0
+        self._health_checked_at = time.monotonic()
+        # Запись итоговой страницы каждого ответа (см. replay.Recorder)
+        self.recorder: Optional[Any] = None
+        if driver is None and not lazy:
+            self._start_driver()
+
+    @property
+    def driver(self) -> WebDriver:
+        """Драйвер парсера. При ленивом запуске создается и открывает url при первом обращении."""
+        if self._driver is None:
+            self._start_driver()
+        return self._driver
+
+    @property
+    def driver_started(self) -> bool:
+        """True, если драйвер уже запущен или был передан извне."""
+        return self._driver is not None
 
+    def _start_driver(self) -> None:
+        """Запускает собственный драйвер и открывает исходную страницу."""
+        self.user_agent = random_user_agent()
+        self._driver = self._initialize_driver(self.headless)
+        self._open_start_page()
+
+    @traced
+    def _open_start_page(self) -> None:
+        """Открывает исходную страницу парсера в новом драйвере."""
+        self._driver.get(self.url)
+
+    @traced
     def _initialize_driver(self, headless: bool) -> WebDriver:
         """Создает и настраивает драйвер Selenium с учетом заданных параметров."""
+        return self.create_driver(self.timeout, headless, self.user_agent)
+
+    @classmethod
+    def create_driver(
+            cls,
+            timeout: int | float,
+            headless: bool,
+            user_agent: Optional[str] = None,
+            profile: Optional[BrowserProfile] = None,
+    ) -> WebDriver:
+        """
+        Создает и настраивает драйвер Selenium без привязки к экземпляру парсера.
+
+        Args:
+            timeout (int | float): Таймаут выполнения скриптов на странице (в секундах).
+            headless (bool): Если True, запускает браузер в фоновом режиме без GUI.
+            user_agent (Optional[str]): Пользовательский агент. Если не задан, выбирается случайный.
+            profile (Optional[BrowserProfile]): Профиль браузера. Если не задан, используется PROFILE класса.
+        Returns:
+            WebDriver: Запущенный драйвер.
+        """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        if user_agent is None:
+            user_agent = random_user_agent()
+
+        profile = profile or cls.PROFILE or DEFAULT_PROFILE
+
         options = webdriver.ChromeOptions()
+        options.page_load_strategy = profile.page_load_strategy
 
         # Запуск в headless-режиме, если задано
         if headless:
@@ -66,39 +317,421 @@ class BaseParser(ABC):
         options.add_argument("--disable-backgrounding-occluded-windows")
 
         # Пользовательский агент и прочие параметры
-        options.add_argument(f"user-agent={self.ua.random}")
-        options.add_argument("start-maximized")
+        options.add_argument(f"user-agent={user_agent}")
+        if profile.window_size:
+            options.add_argument("--window-size={},{}".format(*profile.window_size))
+        else:
+            options.add_argument("start-maximized")
         options.add_argument("--ignore-certificate-errors")
 
         # Дополнительные параметры для повышения незаметности
         options.add_argument("--incognito")
         options.add_argument("--disable-sync")
 
-        service = Service(executable_path=self.DRIVER_PATH)
+        service = Service(executable_path=cls.DRIVER_PATH)
         driver = webdriver.Chrome(service=service, options=options)
-        driver.implicitly_wait(self.timeout)
 
+        # Неявные ожидания не используются: готовность страницы определяется явными ожиданиями ниже
+        driver.set_script_timeout(timeout)
+        cls.prepare_target(driver, profile)
         return driver
 
+    @classmethod
+    def prepare_target(cls, driver: Any, profile: Optional[BrowserProfile] = None) -> None:
+        """
+        Настраивает текущую вкладку драйвера через CDP: перехват запросов для ожиданий (_HOOKS_JS)
+        и блокировка ресурсов, не нужных для работы форм. Если у парсера есть RESOURCE_ALLOWLIST,
+        блокировка выполняется перехватом запросов (RequestInterceptor), а при невозможности
+        перехвата — Network.setBlockedURLs без шаблонов, под которые попадает allowlist.
+        """
+        profile = profile or cls.PROFILE or DEFAULT_PROFILE
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _HOOKS_JS})
+
+        patterns = profile.patterns()
+        if patterns and cls.RESOURCE_ALLOWLIST:
+            try:
+                RequestInterceptor(driver, patterns, cls.RESOURCE_ALLOWLIST).start()
+                return
+            except Exception as ex:
+                logger.warning("%s: перехват запросов недоступен (%s), исключения применяются к шаблонам целиком",
+                               cls.__name__, ex)
+
+        blocked_urls = profile.blocked_urls(cls.RESOURCE_ALLOWLIST)
+        if blocked_urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+
     def wait_for_element_visibility(self, by: By, value: str, timeout: Optional[int | float] = None) -> WebElement:
         """Ожидает появления элемента на странице."""
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         timeout = timeout or self.timeout
         return WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located((by, value)))
 
     def wait_for_element_clickable(self, by: By, value: str, timeout: Optional[int | float] = None) -> WebElement:
         """Ожидает, пока элемент станет кликабельным."""
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         timeout = timeout or self.timeout
         return WebDriverWait(self.driver, timeout).until(EC.element_to_be_clickable((by, value)))
 
+    def is_element_displayed(self, by: By, value: str) -> bool:
+        """Проверяет отображение элемента за один вызов скрипта, без ожидания."""
+        return self.find_outcome({}, {"element": (by, value)}) is not None
+
+    def wait_for_element_invisibility(self, by: By, value: str, timeout: Optional[int | float] = None) -> None:
+        """Ожидает, пока элемент скроется или будет удален со страницы."""
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = timeout or self.timeout
+        WebDriverWait(self.driver, timeout).until(EC.invisibility_of_element_located((by, value)))
+
+    def wait_for_network_idle(self, idle_ms: int = 300, timeout: Optional[int | float] = None) -> None:
+        """Ожидает загрузки документа и отсутствия незавершенных XHR/fetch-запросов в течение idle_ms."""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = timeout or self.timeout
+        WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+            lambda driver: driver.execute_script(_NETWORK_IDLE_JS, idle_ms)
+        )
+
+    def mark_page(self) -> None:
+        """Отмечает текущее состояние страницы перед отправкой формы (см. wait_for_outcome)."""
+        self.driver.execute_script(_MARK_PAGE_JS)
+
+    def _drift_arguments(self) -> tuple[Optional[list[list[str]]], int]:
+        """Варианты PAGE_ANCHOR и DRIFT_GRACE в миллисекундах для скриптов поиска."""
+        anchor = None
+        if self.PAGE_ANCHOR is not None:
+            anchor = [list(candidate) for candidate in self._registry[self.PAGE_ANCHOR]]
+        return anchor, int(self.DRIFT_GRACE * 1000)
+
+    def _layout_drift(self, names: Iterable[str]) -> LayoutDriftError:
+        names = tuple(names)
+        LOCATOR_STATS.record_drift(type(self).__name__, names)
+        return LayoutDriftError(type(self).__name__, names)
+
+    def find_outcome(self, results: dict[str, Locator | Selector],
+                     errors: Optional[dict[str, Locator | Selector]] = None) -> Optional[str]:
+        """
+        За один вызов скрипта проверяет, какой из элементов отображается на странице.
+
+        Args:
+            results (dict[str, Locator | Selector]): Элементы результата. Если страница отмечена mark_page(),
+                они учитываются только после ответа сервера (замены документа или завершения запросов).
+            errors (Optional[dict[str, Locator | Selector]]): Элементы ошибок, проверяются сразу и в первую очередь.
+        Returns:
+            Optional[str]: Имя первого отображаемого элемента или None.
+        Raises:
+            LayoutDriftError: Ответ получен, сеть простаивает DRIFT_GRACE секунд, страница опознается
+                по PAGE_ANCHOR, но ни один элемент результата не найден.
+        """
+        errors = compile_registry(errors or {})
+        results = compile_registry(results)
+        found = self.driver.execute_script(
+            _FIND_DISPLAYED_JS,
+            script_arguments(errors, errors),
+            script_arguments(results, results),
+            *self._drift_arguments(),
+        )
+        if found is None:
+            return None
+        name, index = found
+        if name is None:
+            raise self._layout_drift(results)
+        LOCATOR_STATS.record(type(self).__name__, name, index)
+        return name
+
+    def wait_for_outcome(self, results: dict[str, Locator | Selector],
+                         errors: Optional[dict[str, Locator | Selector]] = None,
+                         timeout: Optional[int | float] = None) -> str:
+        """
+        Ожидает отображения одного из элементов результата или ошибки (см. find_outcome).
+
+        Returns:
+            str: Имя отображаемого элемента.
+        Raises:
+            TimeoutException: Ни один элемент не отобразился за время timeout.
+            LayoutDriftError: Разметка страницы изменилась (см. find_outcome).
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = timeout or self.timeout
+        return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+            lambda driver: self.find_outcome(results, errors)
+        )
+
+    def _locate(self, names: tuple[str, ...]) -> tuple[dict[str, tuple[WebElement, int]], bool]:
+        found, idle = self.driver.execute_script(
+            _LOCATE_JS, script_arguments(self._registry, names), *self._drift_arguments()
+        )
+        return {name: (element, index) for name, (element, index) in found.items()}, idle
+
+    def _record_found(self, found: dict[str, tuple[WebElement, int]]) -> dict[str, WebElement]:
+        parser = type(self).__name__
+        for name, (_, index) in found.items():
+            LOCATOR_STATS.record(parser, name, index)
+        return {name: element for name, (element, _) in found.items()}
+
+    def locate(self, *names: str) -> dict[str, WebElement]:
+        """
+        За один вызов скрипта находит отображаемые и доступные элементы реестра парсера без ожидания.
+
+        Returns:
+            dict[str, WebElement]: Найденные элементы по именам (ненайденных нет в словаре).
+        """
+        found, _ = self._locate(names)
+        return self._record_found(found)
+
+    def wait_for_locators(self, *names: str, timeout: Optional[int | float] = None) -> dict[str, WebElement]:
+        """
+        Ожидает отображения всех элементов реестра names, проверяя их одним вызовом скрипта за опрос.
+
+        Returns:
+            dict[str, WebElement]: Элементы по именам.
+        Raises:
+            TimeoutException: Элементы не отобразились за время timeout.
+            LayoutDriftError: Страница загружена и опознается (найдена часть элементов или отображается
+                PAGE_ANCHOR), сеть простаивает, но элементы не находятся ни одним вариантом в течение
+                DRIFT_GRACE секунд.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        drift_since = None
+        while True:
+            found, idle = self._locate(names)
+            if len(found) == len(names):
+                return self._record_found(found)
+            now = time.monotonic()
+            if not idle:
+                drift_since = None
+            elif drift_since is None:
+                drift_since = now
+            elif now - drift_since >= self.DRIFT_GRACE:
+                raise self._layout_drift(name for name in names if name not in found)
+            if now >= deadline:
+                missing = ", ".join(name for name in names if name not in found)
+                raise TimeoutException(f"Не отобразились элементы: {missing}")
+            time.sleep(0.1)
+
+    def wait_for_locator(self, name: str, timeout: Optional[int | float] = None) -> WebElement:
+        """Ожидает отображения элемента реестра (см. wait_for_locators)."""
+        return self.wait_for_locators(name, timeout=timeout)[name]
+
+    def wait_for_locator_invisibility(self, name: str, timeout: Optional[int | float] = None) -> None:
+        """Ожидает, пока элемент реестра скроется или будет удален со страницы."""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = timeout or self.timeout
+        WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+            lambda driver: name not in self._locate((name,))[0]
+        )
+
+    def find_locator(self, name: str) -> WebElement:
+        """
+        Находит элемент реестра (в том числе скрытый) по вариантам в порядке предпочтения. Используется
+        для чтения результата, когда исход уже известен.
+
+        Raises:
+            NoSuchElementException: Элемент не найден ни одним вариантом.
+        """
+        for index, (by, value) in enumerate(self._registry[name]):
+            elements = self.driver.find_elements(by, value)
+            if elements:
+                LOCATOR_STATS.record(type(self).__name__, name, index)
+                return elements[0]
+        raise NoSuchElementException(f"Элемент {name} не найден ни одним локатором")
+
+    def page_load_report(self) -> dict[str, Any]:
+        """Возвращает сводку загрузки текущей страницы: время загрузки и объем переданных данных."""
+        return page_load_report(self.driver)
+
     @abstractmethod
     def parse(self, *args, **kwargs) -> Any:
         """Абстрактный метод для реализации логики парсинга, который должен быть определён в дочернем классе."""
         pass
 
+    def parse_result(self, *args, **kwargs) -> ParseResult:
+        """
+        Вариант parse() без исключений для пакетной обработки: исход запроса возвращается как статус.
+
+        Returns:
+            ParseResult: Статус, значение parse() (для Status.OK), длительность и имя парсера.
+        """
+        started = time.perf_counter()
+        try:
+            value = self.parse(*args, **kwargs)
+        except Exception as ex:
+            return ParseResult(status_of(type(ex)), None, time.perf_counter() - started, type(self).__name__)
+        return ParseResult(status_of(None), value, time.perf_counter() - started, type(self).__name__)
+
+    def begin(self, *args, **kwargs) -> None:
+        """
+        Заполняет и отправляет форму, не дожидаясь ответа. Вместе с resolve() позволяет держать
+        несколько запросов в разных вкладках одного браузера (см. CompositeChecker).
+        """
+        raise NotImplementedError(f"{type(self).__name__} не поддерживает раздельную отправку формы")
+
+    def resolve(self, outcome: str) -> Any:
+        """
+        Преобразует имя отображаемого элемента (RESULTS или ERRORS) в результат parse().
+
+        Raises:
+            Exception: Исключение parse(), соответствующее исходу.
+        """
+        raise NotImplementedError(f"{type(self).__name__} не поддерживает раздельную отправку формы")
+
+    @traced
+    def _wait_for_response(self) -> str:
+        """Ожидает ответа на отправку формы: отображения одного из элементов RESULTS или ERRORS."""
+        if self.recorder is None:
+            return self.wait_for_outcome(self.RESULTS, errors=self.ERRORS)
+        try:
+            outcome = self.wait_for_outcome(self.RESULTS, errors=self.ERRORS)
+        except (TimeoutException, LayoutDriftError):
+            self.recorder.capture_page(self.driver.page_source, None)
+            raise
+        self.recorder.capture_page(self.driver.page_source, outcome)
+        return outcome
+
+    def parse_many(self, items: Iterable[Any], checkpoint: Optional[str] = None) -> Iterator[tuple[Any, Any]]:
+        """
+        Последовательно обрабатывает поток входных данных в одной сессии браузера.
+
+        Элемент передается в parse() как именованные аргументы (dict), позиционные аргументы (tuple, list)
+        или единственный аргумент. Между элементами состояние страницы сбрасывается через _reset_form(),
+        после ошибки страница загружается заново, а если сессия браузера не отвечает — собственный
+        браузер перезапускается.
+
+        Args:
+            items (Iterable[Any]): Входные данные; читаются лениво.
+            checkpoint (Optional[str]): Путь к файлу контрольной точки. Если задан, уже обработанные
+                элементы пропускаются, а после каждого элемента счетчик сохраняется на диск.
+        Yields:
+            tuple[Any, Any]: Пара (входные данные, результат parse() или возникшее исключение).
+        """
+        batch_checkpoint = BatchCheckpoint(checkpoint) if checkpoint else None
+        completed = batch_checkpoint.load() if batch_checkpoint else 0
+        first = True
+        failed = False
+
+        for index, item in enumerate(items):
+            if index < completed:
+                continue
+            try:
+                if (failed or not first) and self.driver_started:
+                    self._prepare_next(reload=failed)
+                first = False
+                result = self._parse_item(item)
+                failed = False
+            except Exception as ex:
+                result = ex
+                failed = True
+
+            if batch_checkpoint:
+                batch_checkpoint.save(index + 1)
+            yield item, result
+
+        if batch_checkpoint:
+            batch_checkpoint.clear()
+
+    def _parse_item(self, item: Any) -> Any:
+        """Вызывает parse() для одного элемента пакета."""
+        if isinstance(item, dict):
+            return self.parse(**item)
+        if isinstance(item, (tuple, list)):
+            return self.parse(*item)
+        return self.parse(item)
+
+    def _prepare_next(self, reload: bool) -> None:
+        """
+        Возвращает страницу в исходное состояние перед следующим запросом: _reload() (reload=True)
+        или _reset_form(). Собственный браузер с неотвечающей сессией перезапускается на странице url.
+        """
+        if self._owns_driver and not self.is_session_alive():
+            self.restart_driver()
+        elif reload:
+            self._reload()
+        else:
+            self._reset_form()
+
+    @traced
+    def _reset_form(self) -> None:
+        """
+        Возвращает страницу в исходное состояние перед следующим элементом пакета. Дочерние классы
+        могут переопределить метод, чтобы сбрасывать форму без перезагрузки страницы.
+        """
+        self._reload()
+
+    @traced
+    def _reload(self) -> None:
+        """Заново открывает исходную страницу парсера."""
+        self.driver.get(self.url)
+
+    def reset(self) -> None:
+        """
+        Возвращает парсер к исходной странице перед повтором запроса (например, после капчи или
+        недоступности сервиса). Незапущенный браузер не запускается, упавший собственный — перезапускается.
+        """
+        if self.driver_started:
+            self._prepare_next(reload=True)
+
+    def is_session_alive(self) -> bool:
+        """Проверяет, что сессия драйвера и страница отвечают. Незапущенный драйвер считается живым."""
+        if self._driver is None:
+            return True
+        try:
+            self._driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def health(self) -> dict[str, Any]:
+        """
+        Возвращает состояние браузера.
+
+        Returns:
+            dict[str, Any]: alive, rss_mb (None — браузер не запущен или память недоступна), restarts.
+        """
+        rss = get_driver_rss(self._driver) if self._driver is not None else None
+        return {
+            "alive": self.is_session_alive(),
+            "rss_mb": rss / 2 ** 20 if rss is not None else None,
+            "restarts": self.restarts,
+        }
+
+    @traced
+    def restart_driver(self) -> None:
+        """Закрывает собственный драйвер (даже если сессия уже мертва) и запускает новый на странице url."""
+        if not self._owns_driver:
+            raise RuntimeError("Внешний драйвер не перезапускается парсером")
+        driver, self._driver = self._driver, None
+        if driver is not None:
+            with suppress(Exception):
+                driver.quit()
+        self._start_driver()
+        self.restarts += 1
+        self._health_checked_at = time.monotonic()
+
+    def _check_health(self) -> None:
+        """Не чаще HEALTH_CHECK_INTERVAL перезапускает браузер, превысивший MAX_RSS_MB."""
+        if self.MAX_RSS_MB is None or self._driver is None or not self._owns_driver:
+            return
+        now = time.monotonic()
+        if now - self._health_checked_at < self.HEALTH_CHECK_INTERVAL:
+            return
+        self._health_checked_at = now
+        rss = get_driver_rss(self._driver)
+        if rss is not None and rss > self.MAX_RSS_MB * 2 ** 20:
+            self.restart_driver()
+
     def close(self) -> None:
-        """Закрытие браузера и освобождение ресурсов."""
-        if self.driver:
-            self.driver.quit()
+        """Закрытие браузера и освобождение ресурсов. Внешний драйвер остается открытым."""
+        if self._driver and self._closes_driver:
+            self._driver.quit()
+            self._driver = None
 
     def __enter__(self) -> 'BaseParser':
         """Поддержка менеджера контекста для безопасного закрытия браузера."""
@@ -107,3 +740,48 @@ class BaseParser(ABC):
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         """Закрытие браузера при выходе из контекста."""
         self.close()
+
+
+def supervised(method: F) -> F:
+    """
+    Декоратор parse(): перед вызовом перезапускает разросшийся браузер (MAX_RSS_MB), а если вызов
+    завершился ошибкой и сессия браузера не отвечает (упал драйвер или вкладка), перезапускает
+    браузер, открывает url и повторяет вызов один раз. Внешние драйверы (DriverPool,
+    CompositeChecker) не перезапускаются — ошибка передается владельцу драйвера.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._check_health()
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            if not self._owns_driver or self._driver is None or self.is_session_alive():
+                raise
+        self.restart_driver()
+        return method(self, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def get_driver_rss(driver: WebDriver) -> Optional[int]:
+    """
+    Возвращает суммарный объем резидентной памяти (в байтах) процесса драйвера и всех его
+    дочерних процессов браузера. Работает через /proc, на других платформах возвращает None.
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None or not os.path.isdir("/proc"):
+        return None
+
+    total = 0
+    pending = [process.pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as statm:
+                total += int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            for task in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{task}/children") as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
@@ -0,0 +1,85 @@
+"""
+Сравнение памяти на сессию: отдельный браузер на каждый парсер (BaseParser.create_driver) против
+одного браузера BrowserHost с изолированным контекстом на каждый парсер. Страницы открываются
+на локальных копиях сайтов (benchmarks/mock_sites.py).
+
+Запуск из корня репозитория:
+    python -m benchmarks.contexts --parser npd --sessions 1,4,8
+"""
+import argparse
+import json
+import time
+from typing import Any, Optional
+
+from benchmarks.mock_sites import MockSites
+
+
+def measure_processes(parser_cls: type, sessions: int, headless: bool) -> dict[str, Any]:
+    """Отдельный браузер на сессию: суммарная память всех браузеров."""
+    from base import get_driver_rss
+
+    drivers = []
+    try:
+        started = time.perf_counter()
+        for _ in range(sessions):
+            driver = parser_cls.create_driver(10, headless)
+            driver.get(parser_cls.URL)
+            drivers.append(driver)
+        startup = time.perf_counter() - started
+        rss = [get_driver_rss(driver) for driver in drivers]
+        total = None if None in rss else sum(rss) / 2 ** 20
+    finally:
+        for driver in drivers:
+            driver.quit()
+    return {"mode": "processes", "sessions": sessions, "startup": startup, "rss_mb": total}
+
+
+def measure_contexts(parser_cls: type, sessions: int, headless: bool) -> dict[str, Any]:
+    """Один браузер BrowserHost с контекстом на сессию."""
+    from browser_host import BrowserHost
+
+    with BrowserHost(timeout=10, headless=headless) as host:
+        started = time.perf_counter()
+        for _ in range(sessions):
+            host.new_driver(parser_cls)
+        startup = time.perf_counter() - started
+        rss_mb = host.memory()["rss_mb"]
+    return {"mode": "contexts", "sessions": sessions, "startup": startup, "rss_mb": rss_mb}
+
+
+def format_row(row: dict[str, Any]) -> str:
+    def mb(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f} МБ"
+
+    per_session = row["rss_mb"] / row["sessions"] if row["rss_mb"] is not None else None
+    return (f"{row['mode']:<10} сессий {row['sessions']:>3}: запуск {row['startup'] * 1000:.0f} мс, "
+            f"память {mb(row['rss_mb'])}, на сессию {mb(per_session)}")
+
+
+def main():
+    from benchmarks.mock_parsers import PARSERS
+
+    argparser = argparse.ArgumentParser(description="Память на сессию: процессы браузера против контекстов")
+    argparser.add_argument("--parser", default="npd", choices=sorted({name for name, _ in PARSERS}))
+    argparser.add_argument("--sessions", default="1,4,8", type=lambda value: [int(v) for v in value.split(",")])
+    argparser.add_argument("--port", default=8765, type=int)
+    argparser.add_argument("--no-headless", dest="headless", action="store_false")
+    argparser.add_argument("--json", help="Файл для сохранения результатов")
+    args = argparser.parse_args()
+
+    parser_cls = PARSERS[(args.parser, "selenium")]
+    rows = []
+    with MockSites(port=args.port):
+        for sessions in args.sessions:
+            for measure in (measure_processes, measure_contexts):
+                row = measure(parser_cls, sessions, args.headless)
+                print(format_row(row), flush=True)
+                rows.append(row)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Подклассы парсеров, направленные на локальные копии страниц (benchmarks/mock_sites.py).
+
+Адрес сервера берется из переменной окружения NALOG_MOCK_URL при импорте модуля, поэтому классы
+корректно работают и в рабочих процессах ParserExecutor (spawn).
+"""
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any, Optional
+
+from base import BaseParser
+from parser_arbitr import ArbitrParser
+from parser_inn import InnParser
+from parser_npd import NpdParser
+from parser_rom import RomParser
+from validation import is_valid_inn
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+MOCK_URL = os.environ.get("NALOG_MOCK_URL", "http://127.0.0.1:8765").rstrip("/")
+
+
+class MockArbitrParser(ArbitrParser):
+    URL = f"{MOCK_URL}/kad/"
+
+
+class MockInnParser(InnParser):
+    URL = f"{MOCK_URL}/inn.do"
+
+
+class MockNpdParser(NpdParser):
+    URL = f"{MOCK_URL}/check-status/"
+
+
+class MockNpdHttpParser(MockNpdParser):
+    def __init__(self, timeout: int | float, headless: bool = True, driver: Optional[WebDriver] = None) -> None:
+        super().__init__(timeout, headless, driver, engine="http")
+
+
+class MockRomParser(RomParser):
+    URL = f"{MOCK_URL}/rom/"
+
+
+class MockRomHttpParser(MockRomParser):
+    def __init__(self, timeout: int | float, headless: bool = True, driver: Optional[WebDriver] = None) -> None:
+        super().__init__(timeout, headless, driver, engine="http")
+
+
+# (парсер, движок) -> класс
+PARSERS: dict[tuple[str, str], type[BaseParser]] = {
+    ("arbitr", "selenium"): MockArbitrParser,
+    ("inn", "selenium"): MockInnParser,
+    ("npd", "selenium"): MockNpdParser,
+    ("npd", "http"): MockNpdHttpParser,
+    ("rom", "selenium"): MockRomParser,
+    ("rom", "http"): MockRomHttpParser,
+}
+
+
+def valid_inn(prefix: str) -> str:
+    """Дополняет 10 цифр ИНН физического лица контрольными цифрами."""
+    return next(inn for inn in (f"{prefix}{suffix:02d}" for suffix in range(100)) if is_valid_inn(inn))
+
+
+def make_items(parser: str, count: int) -> list[Any]:
+    """
+    Возвращает входные данные для parse_many. ИНН (с верными контрольными цифрами) и паспорта
+    перебираются, так что в выборке есть все исходы проверки (см. benchmarks/mock_sites.py).
+    """
+    if parser == "inn":
+        return [
+            {"surname": "Иванов", "name": "Иван", "lastname": "Иванович",
+             "birthdate": "01.01.1980", "passport": f"45 06 12345{index % 10}"}
+            for index in range(count)
+        ]
+    return [valid_inn(f"{5001007300 + index % 10}") for index in range(count)]
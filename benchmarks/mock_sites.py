@@ -0,0 +1,339 @@
+"""
+Локальные копии страниц inn.do, npd.nalog.ru/check-status, service.nalog.ru/rom и kad.arbitr.ru
+с настраиваемой задержкой ответа и внедрением капчи и ошибок сервиса.
+
+Исход проверки определяется последней цифрой входных данных:
+    ИНН (NPD): четная — является самозанятым, нечетная — не является, длина не 12 — ошибка валидатора;
+    ИНН (ROM, arbitr): четная — данные найдены, нечетная — не найдены;
+    паспорт (inn.do): 0 — result_0, 3 — result_3, 9 — result_err, иначе result_1.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+INN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Узнать ИНН</title>
+<style>.hidden { display: none; }</style></head>
+<body>
+<div id="personalData"><input type="checkbox" id="unichk_0"><button id="btnContinue" onclick="
+    document.getElementById('personalData').classList.add('hidden');
+    document.getElementById('frm').classList.remove('hidden');">Продолжить</button></div>
+<form id="frm" class="hidden" onsubmit="return false;">
+    <input id="fam" name="fam"><input id="nam" name="nam"><input id="otch" name="otch">
+    <input id="bdate" name="bdate"><input id="docno" name="docno">
+    <div class="field-errors hidden">Неверный формат</div>
+    <button id="btn_send" type="button" onclick="send()">Отправить запрос</button>
+</form>
+<div id="uniDialogData" class="hidden">Введите код с картинки</div>
+<div id="result_0" class="hidden">Информация об ИНН не найдена</div>
+<div id="result_1" class="hidden">ИНН: <span id="resultInn"></span></div>
+<div id="result_3" class="hidden">Данные не прошли проверку</div>
+<div id="result_err" class="hidden">Сервис недоступен</div>
+<script>
+function send() {
+    const form = document.getElementById('frm');
+    const passport = document.getElementById('docno').value;
+    const bdate = document.getElementById('bdate').value;
+    if (!/^\\d{2} \\d{2} \\d{6}$/.test(passport) || !/^\\d{2}\\.\\d{2}\\.\\d{4}$/.test(bdate)) {
+        form.querySelector('.field-errors').classList.remove('hidden');
+        return;
+    }
+    fetch('inn-proc.do', {method: 'POST', body: new URLSearchParams(new FormData(form))})
+        .then(response => response.json())
+        .then(data => {
+            if (data.captchaRequired) {
+                document.getElementById('uniDialogData').classList.remove('hidden');
+                return;
+            }
+            if (data.inn) document.getElementById('resultInn').textContent = data.inn;
+            document.getElementById('result_' + data.state).classList.remove('hidden');
+        });
+}
+</script>
+</body></html>
+"""
+
+NPD_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Проверка статуса налогоплательщика НПД</title></head>
+<body>
+<form method="post" action="./" id="aspnetForm">
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="dDwtMTA4NzI0NjA0Njs7Pg==">
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="/wEWBAKM54rGBgK=">
+<div id="content"><div><div><div>
+    <div><input name="ctl00$ctl00$tbINN" id="ctl00_ctl00_tbINN" value="{inn}"></div>
+    <div><input name="ctl00$ctl00$tbDate" id="ctl00_ctl00_tbDate" value="{date}"></div>
+    <div>
+        <span id="ctl00_ctl00_RequiredFieldValidator1" style="color:Red;display:none;">Укажите ИНН</span>
+        <span id="ctl00_ctl00_cv_Inn" style="color:Red;{inn_error}">Неверный ИНН</span>
+        <span id="ctl00_ctl00_RequiredFieldValidator2" style="color:Red;display:none;">Укажите дату</span>
+        <span id="ctl00_ctl00_CustomValidator1" style="color:Red;display:none;">Неверная дата</span>
+    </div>
+    <div><input type="submit" name="ctl00$ctl00$btSend" value="Найти" id="ctl00_ctl00_btSend"></div>
+    {result}
+</div></div></div></div>
+{captcha}
+</form>
+</body></html>
+"""
+
+ROM_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Реестр обеспечительных мер</title>
+<style>.hidden { display: none; }</style></head>
+<body>
+<form id="frmSearch" method="post" action="search-proc.json" onsubmit="return false;">
+<div id="pnlSearch">
+    <div>Поиск по ИНН</div>
+    <div><input id="query" name="query"></div>
+    <div class="field-errors hidden">Неверный ИНН</div>
+    <div><div></div><div><button type="button" onclick="search()">Найти</button></div></div>
+</div>
+</form>
+<div id="pnlNoData" class="hidden">Данные не найдены</div>
+<div id="pnlData" class="hidden">Найдены обеспечительные меры</div>
+<script>
+function search() {
+    const form = document.getElementById('frmSearch');
+    form.querySelector('.field-errors').classList.add('hidden');
+    fetch(form.getAttribute('action'), {method: 'POST', body: new URLSearchParams(new FormData(form))})
+        .then(response => response.json())
+        .then(data => {
+            if (data.captchaRequired) return;
+            if (data.ERRORS) {
+                form.querySelector('.field-errors').classList.remove('hidden');
+                return;
+            }
+            document.getElementById(data.rows.length ? 'pnlData' : 'pnlNoData').style.display = 'block';
+        });
+}
+</script>
+</body></html>
+"""
+
+ARBITR_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Картотека арбитражных дел</title>
+<style>.hidden { display: none; }</style></head>
+<body id="js">
+""" + "<div></div>" * 12 + """
+<div id="notification"><div></div><div><div><div><div><div>
+    <a href="#" class="b-promo_notification-popup-close js-promo_notification-popup-close"
+       onclick="document.getElementById('notification').remove(); return false;">Закрыть</a>
+</div></div></div></div></div></div>
+<div id="sug-participants"><div><textarea></textarea></div></div>
+<div id="b-form-submit"><div><button type="button" onclick="search()">Найти</button></div></div>
+<div class="b-noResults hidden">Ничего не найдено</div>
+<div class="b-results hidden">Найдены дела</div>
+<script>
+function search() {
+    const inn = document.querySelector('#sug-participants textarea').value;
+    fetch('Kad/SearchInstances', {method: 'POST', body: JSON.stringify({Sides: [{Name: inn}]})})
+        .then(response => response.json())
+        .then(data => {
+            if (data.Success === false) return;
+            document.querySelector(data.found ? '.b-results' : '.b-noResults').classList.remove('hidden');
+        });
+}
+</script>
+</body></html>
+"""
+
+# Количество дел в списке kad.arbitr.ru для ИНН с четной последней цифрой
+ARBITR_CASES = 60
+
+
+class MockSites:
+    """
+    HTTP-сервер с локальными копиями страниц всех четырех сервисов.
+
+    Пути: /inn.do, /check-status/, /rom/, /kad/.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, latency: float = 0.0,
+                 captcha_rate: float = 0.0, error_rate: float = 0.0) -> None:
+        """
+        Args:
+            host (str): Адрес сервера.
+            port (int): Порт сервера (0 — выбрать свободный).
+            latency (float): Задержка ответа на отправку формы (в секундах).
+            captcha_rate (float): Доля ответов с капчей.
+            error_rate (float): Доля ответов с ошибкой сервиса.
+        """
+        self.latency = latency
+        self.captcha_rate = captcha_rate
+        self.error_rate = error_rate
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Базовый URL сервера."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockSites':
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MockSites", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockSites':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _inject(self) -> Optional[str]:
+        """Возвращает внедряемую ошибку: captcha, error или None."""
+        roll = random.random()
+        if roll < self.captcha_rate:
+            return "captcha"
+        if roll < self.captcha_rate + self.error_rate:
+            return "error"
+        return None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        sites = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                path = urlsplit(self.path).path
+                if path == "/inn.do":
+                    self._send(INN_PAGE)
+                elif path == "/check-status/":
+                    self._send(NPD_PAGE.format(inn="", date="", inn_error="display:none;", result="", captcha=""))
+                elif path == "/rom/":
+                    self._send(ROM_PAGE)
+                elif path == "/kad/":
+                    self._send(ARBITR_PAGE)
+                else:
+                    self.send_error(404)
+
+            def do_POST(self) -> None:
+                path = urlsplit(self.path).path
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                time.sleep(sites.latency)
+                injected = sites._inject()
+
+                if path == "/inn-proc.do":
+                    self._send_inn(parse_qs(body), injected)
+                elif path == "/check-status/":
+                    self._send_npd(parse_qs(body), injected)
+                elif path == "/rom/search-proc.json":
+                    self._send_rom(parse_qs(body), injected)
+                elif path == "/kad/Kad/SearchInstances":
+                    self._send_arbitr(json.loads(body or "{}"), injected)
+                else:
+                    self.send_error(404)
+
+            def _send_inn(self, form: dict[str, list[str]], injected: Optional[str]) -> None:
+                passport = form.get("docno", [""])[0]
+                if injected == "captcha":
+                    self._send_json({"captchaRequired": True})
+                elif injected == "error" or passport.endswith("9"):
+                    self._send_json({"state": "err"})
+                elif passport.endswith("0"):
+                    self._send_json({"state": "0"})
+                elif passport.endswith("3"):
+                    self._send_json({"state": "3"})
+                else:
+                    self._send_json({"state": "1", "inn": "77" + passport.replace(" ", "")[:10]})
+
+            def _send_npd(self, form: dict[str, list[str]], injected: Optional[str]) -> None:
+                inn = form.get("ctl00$ctl00$tbINN", [""])[0]
+                if "__VIEWSTATE" not in form or injected == "error":
+                    self.send_error(503)
+                    return
+                valid = len(inn) == 12 and inn.isdigit()
+                result = ""
+                if valid and injected != "captcha":
+                    status = "является" if int(inn[-1]) % 2 == 0 else "не является"
+                    result = f"<div>{inn} {status} плательщиком налога на профессиональный доход</div>"
+                self._send(NPD_PAGE.format(
+                    inn=inn, date=form.get("ctl00$ctl00$tbDate", [""])[0],
+                    inn_error="" if not valid else "display:none;", result=result,
+                    captcha='<div id="captcha">Введите код</div>' if injected == "captcha" else "",
+                ))
+
+            def _send_rom(self, form: dict[str, list[str]], injected: Optional[str]) -> None:
+                inn = form.get("query", [""])[0]
+                if injected == "error":
+                    self.send_error(503)
+                elif injected == "captcha":
+                    self._send_json({"captchaRequired": True})
+                elif not (len(inn) in (10, 12) and inn.isdigit()):
+                    self._send_json({"ERRORS": {"query": ["Неверный ИНН"]}})
+                else:
+                    self._send_json({"rows": [{"inn": inn}] if int(inn[-1]) % 2 == 0 else []})
+
+            def _send_arbitr(self, payload: dict, injected: Optional[str]) -> None:
+                if injected is not None:
+                    self._send_json({"Success": False})
+                    return
+                inn = (payload.get("Sides") or [{}])[0].get("Name", "")
+                found = bool(inn) and inn[-1].isdigit() and int(inn[-1]) % 2 == 0
+                if "Page" in payload:
+                    self._send(self._arbitr_cases(inn if found else "", payload["Page"], payload.get("Count", 25)))
+                else:
+                    self._send_json({"found": found})
+
+            @staticmethod
+            def _arbitr_cases(inn: str, page: int, count: int) -> str:
+                """HTML-фрагмент списка дел, как ответ kad.arbitr.ru/Kad/SearchInstances: ARBITR_CASES дел на ИНН."""
+                total = ARBITR_CASES if inn else 0
+                pages = max(1, -(-total // count))
+                rows = []
+                for index in range((page - 1) * count, min(page * count, total)):
+                    plaintiff, respondent = (f"ООО Истец<br>ИНН: {inn}", "ООО Ответчик") if index % 2 else \
+                        ("ООО Истец", f"ИП Ответчик<br>ИНН: {inn}")
+                    rows.append(
+                        f'<tr><td class="num"><div class="b-container"><div><span>01.02.2023</span></div>'
+                        f'<a class="num_case" href="/Card/{index}">А40-{index + 1}/2023</a></div></td>'
+                        f'<td class="court"><div class="b-container"><div class="judge">Иванов И. И.</div>'
+                        f'<div>АС города Москвы</div></div></td>'
+                        f'<td class="plaintiff"><div class="b-container"><div class="one">'
+                        f'<span class="js-rolloverHtml">{plaintiff}</span></div></div></td>'
+                        f'<td class="respondent"><div class="b-container"><div class="one">'
+                        f'<span class="js-rolloverHtml">{respondent}</span></div></div></td></tr>'
+                    )
+                return (
+                    f'<table><tbody>{"".join(rows)}</tbody></table>'
+                    f'<input type="hidden" id="documentsPage" value="{page}">'
+                    f'<input type="hidden" id="documentsPagesCount" value="{pages}">'
+                    f'<input type="hidden" id="documentsTotalCount" value="{total}">'
+                )
+
+            def _send(self, html: str, content_type: str = "text/html; charset=utf-8") -> None:
+                data = html.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_json(self, payload: dict) -> None:
+                self._send(json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8")
+
+        return Handler
+
+
+# Пример использования
+def main():
+    with MockSites(latency=0.2) as sites:
+        print(f"Локальные копии сайтов: {sites.base_url}/inn.do, /check-status/, /rom/, /kad/")
+        input("Нажмите Enter для остановки...")
+
+
+if __name__ == '__main__':
+    main()
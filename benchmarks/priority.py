@@ -0,0 +1,77 @@
+"""
+Задержка интерактивных запросов на фоне массовой перепроверки: одна очередь (все запросы в полосе
+BULK, без резерва) против полос приоритета PriorityScheduler с резервом рабочих. Запросы выполняются
+HTTP-движком на локальных копиях сайтов (benchmarks/mock_sites.py), браузер не нужен.
+
+Запуск из корня репозитория:
+    python -m benchmarks.priority --bulk 200 --interactive 20 --workers 4 --latency 0.1
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import Future, wait
+from typing import Any
+
+from benchmarks.mock_sites import MockSites
+
+
+def measure(parser_cls: type, items: list[str], interactive: int, workers: int, lanes: bool) -> dict[str, Any]:
+    """Ставит массовые запросы, затем интерактивные раз в 0.1 с и измеряет задержку интерактивных."""
+    from priority import Lane, PriorityScheduler
+
+    latencies = []
+
+    def track(future: Future, requested: float) -> None:
+        future.add_done_callback(lambda _: latencies.append(time.perf_counter() - requested))
+
+    with PriorityScheduler({parser_cls: workers}, reserved=1 if lanes else 0, timeout=10) as scheduler:
+        started = time.perf_counter()
+        bulk = [scheduler.submit(parser_cls, inn, lane=Lane.BULK) for inn in items]
+        for inn in items[:interactive]:
+            requested = time.perf_counter()
+            track(scheduler.submit(parser_cls, inn, lane=Lane.INTERACTIVE if lanes else Lane.BULK), requested)
+            time.sleep(0.1)
+        wait(bulk)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mode": "lanes" if lanes else "fifo",
+        "interactive_p50": statistics.median(latencies),
+        "interactive_p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "bulk_seconds": elapsed,
+    }
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Задержка интерактивных запросов на фоне массовых")
+    argparser.add_argument("--bulk", default=200, type=int, help="Количество массовых запросов")
+    argparser.add_argument("--interactive", default=20, type=int, help="Количество интерактивных запросов")
+    argparser.add_argument("--workers", default=4, type=int, help="Количество рабочих")
+    argparser.add_argument("--latency", default=0.1, type=float, help="Задержка ответа сайта (с)")
+    argparser.add_argument("--port", default=8765, type=int)
+    argparser.add_argument("--json", help="Файл для сохранения результатов")
+    args = argparser.parse_args()
+
+    with MockSites(port=args.port, latency=args.latency) as sites:
+        os.environ["NALOG_MOCK_URL"] = sites.base_url
+        from benchmarks.mock_parsers import PARSERS, make_items
+
+        parser_cls = PARSERS[("npd", "http")]
+        items = make_items("npd", args.bulk)
+        rows = []
+        for lanes in (False, True):
+            row = measure(parser_cls, items, args.interactive, args.workers, lanes)
+            print(f"{row['mode']:<6} интерактивные p50 {row['interactive_p50'] * 1000:.0f} мс, "
+                  f"p95 {row['interactive_p95'] * 1000:.0f} мс; массовые за {row['bulk_seconds']:.1f} с", flush=True)
+            rows.append(row)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
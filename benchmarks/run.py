@@ -0,0 +1,146 @@
+"""
+Бенчмарк парсеров на локальных копиях сайтов: холодный старт, задержка на запрос (p50/p90/p99),
+пропускная способность при разном числе рабочих процессов и память браузера.
+
+Запуск из корня репозитория:
+    python -m benchmarks.run --parsers npd,rom --engines selenium,http --items 50 --concurrency 1,2,4
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Optional
+
+from benchmarks.mock_sites import MockSites
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Возвращает перцентиль q (0..100) методом ближайшего ранга."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def measure_sequential(parser_cls: type, items: list[Any], timeout: float, headless: bool) -> dict[str, Any]:
+    """
+    Один парсер, последовательная обработка: время запуска, первого запроса, перцентили задержки
+    последующих запросов, исходы и RSS браузера.
+    """
+    from base import get_driver_rss
+    from tracing import classify
+
+    started = time.perf_counter()
+    parser = parser_cls(timeout=timeout, headless=headless)
+    startup = time.perf_counter() - started
+
+    latencies = []
+    outcomes: dict[str, int] = {}
+    with parser:
+        previous = time.perf_counter()
+        for _, result in parser.parse_many(items):
+            now = time.perf_counter()
+            latencies.append(now - previous)
+            previous = now
+            outcome = classify(result if isinstance(result, BaseException) else None)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        rss = get_driver_rss(parser.driver) if parser.driver_started else None
+
+    warm = latencies[1:]
+    return {
+        "startup": startup,
+        "first_parse": latencies[0] if latencies else None,
+        "p50": percentile(warm, 50),
+        "p90": percentile(warm, 90),
+        "p99": percentile(warm, 99),
+        "outcomes": outcomes,
+        "rss_mb": rss / 2 ** 20 if rss is not None else None,
+    }
+
+
+def measure_throughput(parser_cls: type, items: list[Any], workers: int, timeout: float,
+                       headless: bool) -> dict[str, float]:
+    """
+    Пропускная способность ParserExecutor. Запуск рабочих исключается из замера прогревом:
+    сначала каждому рабочему выдается по одному заданию.
+    """
+    from executor import ParserExecutor
+
+    with ParserExecutor(parser_cls, workers=workers, timeout=timeout, headless=headless) as executor:
+        list(executor.map(items[:workers]))
+        started = time.perf_counter()
+        list(executor.map(items))
+        elapsed = time.perf_counter() - started
+        stats = executor.stats()
+    return {"items_per_second": len(items) / elapsed, "restarts": stats["restarts"]}
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Запускает локальные сайты и замеры для всех выбранных сочетаний парсера и движка."""
+    sites = MockSites(port=args.port, latency=args.latency, captcha_rate=args.captcha_rate,
+                      error_rate=args.error_rate).start()
+    # До импорта mock_parsers: адрес читается при импорте, в том числе рабочими процессами
+    os.environ["NALOG_MOCK_URL"] = sites.base_url
+    from benchmarks.mock_parsers import PARSERS, make_items
+
+    rows = []
+    try:
+        for parser in args.parsers:
+            for engine in args.engines:
+                parser_cls = PARSERS.get((parser, engine))
+                if parser_cls is None:
+                    continue
+                items = make_items(parser, args.items)
+                row = {"parser": parser, "engine": engine}
+                row.update(measure_sequential(parser_cls, items, args.timeout, args.headless))
+                row["throughput"] = {
+                    workers: measure_throughput(parser_cls, items, workers, args.timeout, args.headless)
+                    for workers in args.concurrency
+                }
+                rows.append(row)
+                print(format_row(row), flush=True)
+    finally:
+        sites.stop()
+    return rows
+
+
+def format_row(row: dict[str, Any]) -> str:
+    """Форматирует результат замера одной строкой."""
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.0f} мс" if value is not None else "-"
+
+    throughput = ", ".join(
+        f"{workers}x: {result['items_per_second']:.2f}/с" for workers, result in row["throughput"].items()
+    )
+    rss = f"{row['rss_mb']:.0f} МБ" if row["rss_mb"] is not None else "-"
+    return (
+        f"{row['parser']}/{row['engine']}: старт {ms(row['startup'])}, первый запрос {ms(row['first_parse'])}, "
+        f"p50 {ms(row['p50'])}, p90 {ms(row['p90'])}, p99 {ms(row['p99'])}, RSS {rss}, "
+        f"пропускная способность [{throughput}], исходы {row['outcomes']}"
+    )
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Бенчмарк парсеров на локальных копиях сайтов")
+    argparser.add_argument("--parsers", default="arbitr,inn,npd,rom", type=lambda value: value.split(","))
+    argparser.add_argument("--engines", default="selenium,http", type=lambda value: value.split(","))
+    argparser.add_argument("--items", default=20, type=int, help="Количество запросов на замер")
+    argparser.add_argument("--concurrency", default="1,2,4", type=lambda value: [int(v) for v in value.split(",")])
+    argparser.add_argument("--latency", default=0.2, type=float, help="Задержка ответа сервера (с)")
+    argparser.add_argument("--captcha-rate", default=0.0, type=float, help="Доля ответов с капчей")
+    argparser.add_argument("--error-rate", default=0.0, type=float, help="Доля ответов с ошибкой сервиса")
+    argparser.add_argument("--timeout", default=10, type=float, help="Таймаут ожидания элементов (с)")
+    argparser.add_argument("--port", default=8765, type=int)
+    argparser.add_argument("--no-headless", dest="headless", action="store_false")
+    argparser.add_argument("--json", help="Файл для сохранения результатов")
+    args = argparser.parse_args()
+
+    rows = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Бенчмарк холодного старта: время импорта модуля парсера, загрузки пула пользовательских агентов
+и создания экземпляра, каждый замер — в новом процессе интерпретатора.
+
+Создание парсера с движком selenium запускает браузер, поэтому по-умолчанию измеряется только для
+движка http; с флагом --browser — для всех.
+
+Запуск из корня репозитория:
+    python -m benchmarks.startup --repeat 5
+    python -m benchmarks.startup --targets parser_npd:NpdParser:http,parser_inn:InnParser --browser
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Optional
+
+DEFAULT_TARGETS = [
+    "parser_arbitr:ArbitrParser:selenium",
+    "parser_inn:InnParser:selenium",
+    "parser_npd:NpdParser:selenium",
+    "parser_npd:NpdParser:http",
+    "parser_rom:RomParser:selenium",
+    "parser_rom:RomParser:http",
+]
+
+
+def measure_child(target: str, construct: bool) -> dict[str, Any]:
+    """Замер в текущем (новом) процессе: импорт, пул пользовательских агентов, создание парсера."""
+    import importlib
+
+    module_name, class_name, engine = (target.split(":") + ["selenium"])[:3]
+
+    started = time.perf_counter()
+    parser_cls = getattr(importlib.import_module(module_name), class_name)
+    imported = time.perf_counter()
+    selenium_loaded = "selenium.webdriver.chrome.webdriver" in sys.modules
+
+    from useragents import user_agent_pool
+
+    user_agent_pool()
+    agents_loaded = time.perf_counter()
+
+    construct_ms = None
+    if construct:
+        kwargs = {"engine": engine} if engine != "selenium" else {}
+        parser = parser_cls(timeout=10, **kwargs)
+        construct_ms = (time.perf_counter() - agents_loaded) * 1000
+        parser.close()
+
+    return {
+        "import_ms": (imported - started) * 1000,
+        "user_agents_ms": (agents_loaded - imported) * 1000,
+        "construct_ms": construct_ms,
+        "selenium_loaded": selenium_loaded,
+    }
+
+
+def measure(target: str, construct: bool, repeat: int) -> dict[str, Any]:
+    """Повторяет замер target в repeat новых процессах и возвращает медианы."""
+    samples = []
+    for _ in range(repeat):
+        command = [sys.executable, "-m", "benchmarks.startup", "--child", target]
+        if construct:
+            command.append("--construct")
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+
+    def median(key: str) -> Optional[float]:
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        return statistics.median(values) if values else None
+
+    return {
+        "target": target,
+        "import_ms": median("import_ms"),
+        "user_agents_ms": median("user_agents_ms"),
+        "construct_ms": median("construct_ms"),
+        "selenium_loaded": any(sample["selenium_loaded"] for sample in samples),
+    }
+
+
+def format_row(row: dict[str, Any]) -> str:
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    return (f"{row['target']:<40} import={ms(row['import_ms']):>7} ms  ua={ms(row['user_agents_ms']):>7} ms  "
+            f"construct={ms(row['construct_ms']):>7} ms  selenium.webdriver={'yes' if row['selenium_loaded'] else 'no'}")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Бенчмарк холодного старта парсеров")
+    argparser.add_argument("--targets", default=",".join(DEFAULT_TARGETS), type=lambda value: value.split(","),
+                           help="Список модуль:Класс[:движок]")
+    argparser.add_argument("--repeat", default=5, type=int, help="Количество новых процессов на замер")
+    argparser.add_argument("--browser", action="store_true", help="Создавать и парсеры с движком selenium")
+    argparser.add_argument("--json", help="Файл для сохранения результатов")
+    argparser.add_argument("--child", help=argparse.SUPPRESS)
+    argparser.add_argument("--construct", action="store_true", help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_child(args.child, args.construct)))
+        return
+
+    rows = []
+    for target in args.targets:
+        construct = args.browser or target.endswith(":http")
+        row = measure(target, construct, args.repeat)
+        print(format_row(row), flush=True)
+        rows.append(row)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
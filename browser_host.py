@@ -0,0 +1,271 @@
+import threading
+import time
+from contextlib import suppress
+from typing import Any, Optional
+
+from selenium.common import TimeoutException, WebDriverException
+
+from base import BaseParser, get_driver_rss
+from browser_profile import DEFAULT_PROFILE, BrowserProfile
+
+# Метка документа, открытого до навигации: пока она видна, readyState относится к старому документу
+_DOCUMENT_MARKER = "__contextDriverStale"
+_READY_STATE_JS = f"return window.{_DOCUMENT_MARKER} ? null : document.readyState"
+
+
+class ContextElement:
+    """Элемент вкладки контекста: каждый вызов выполняется после переключения хоста на вкладку."""
+
+    def __init__(self, context: 'ContextDriver', element: Any) -> None:
+        self._context = context
+        self.element = element
+
+    def __getattr__(self, name: str) -> Any:
+        return self._context._access(self.element, name)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, ContextElement) and other.element == self.element
+
+    def __hash__(self) -> int:
+        return hash(self.element)
+
+
+class ContextDriver:
+    """
+    Драйвер одного изолированного контекста браузера BrowserHost (отдельные cookies, хранилища и кэш),
+    совместимый с WebDriver в объеме, который используют парсеры. Команды разных контекстов
+    выполняются по очереди под блокировкой хоста, перед каждой хост переключается на вкладку
+    контекста; ожидание между командами (WebDriverWait, загрузка страницы) блокировку не держит.
+    """
+
+    def __init__(self, host: 'BrowserHost', handle: str, context_id: str, target_id: str) -> None:
+        self.host = host
+        self.handle = handle
+        self.context_id = context_id
+        self.target_id = target_id
+
+    def _access(self, target: Any, name: str) -> Any:
+        """Читает атрибут target на вкладке контекста; методы оборачиваются тем же переключением."""
+        with self.host.lock:
+            self.host.switch(self.handle)
+            value = getattr(target, name)
+        if not callable(value):
+            return self._wrap(value)
+
+        def call(*args, **kwargs):
+            with self.host.lock:
+                self.host.switch(self.handle)
+                return self._wrap(value(*_unwrap(args), **_unwrap(kwargs)))
+
+        return call
+
+    def __getattr__(self, name: str) -> Any:
+        return self._access(self.host.driver, name)
+
+    def _wrap(self, value: Any) -> Any:
+        from selenium.webdriver.remote.webelement import WebElement
+
+        if isinstance(value, WebElement):
+            return ContextElement(self, value)
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        return value
+
+    def get(self, url: str) -> None:
+        """
+        Открывает url без удержания блокировки хоста на время загрузки: навигация запускается через
+        CDP Page.navigate, готовность нового документа проверяется короткими запросами.
+        """
+        self._mark_document()
+        result = self.execute_cdp_cmd("Page.navigate", {"url": url})
+        # Переход по якорю в том же документе (без loaderId) новый документ не создает
+        if result.get("loaderId"):
+            self._wait_loaded()
+
+    def refresh(self) -> None:
+        """Перезагружает страницу (см. get)."""
+        self._mark_document()
+        self.execute_cdp_cmd("Page.reload", {"ignoreCache": False})
+        self._wait_loaded()
+
+    def _mark_document(self) -> None:
+        """
+        Помечает текущий документ, чтобы _wait_loaded не принял его за загруженный после навигации.
+        Неотвечающий документ не помечается: навигация все равно его заменит.
+        """
+        with suppress(WebDriverException):
+            self.execute_script(f"window.{_DOCUMENT_MARKER} = true")
+
+    def _wait_loaded(self) -> None:
+        """Ждет документ без метки _mark_document (новый после навигации) с готовым readyState."""
+        ready_states = ("complete",) if self.host.profile.page_load_strategy == "normal" else ("interactive", "complete")
+        deadline = time.monotonic() + self.host.page_load_timeout
+        while True:
+            with suppress(WebDriverException):
+                if self.execute_script(_READY_STATE_JS) in ready_states:
+                    return
+            if time.monotonic() > deadline:
+                raise TimeoutException(f"Страница не загрузилась за {self.host.page_load_timeout} с")
+            time.sleep(0.05)
+
+    def quit(self) -> None:
+        """Закрывает вкладку и удаляет контекст (браузер хоста продолжает работать)."""
+        self.host.close_context(self)
+
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, ContextElement):
+        return value.element
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    return value
+
+
+class BrowserHost:
+    """
+    Один процесс браузера для многих парсеров: каждый парсер получает собственный контекст
+    (CDP Target.createBrowserContext — аналог отдельного окна инкогнито) с отдельной вкладкой.
+    Контексты изолированы по cookies и хранилищам, но делят процессы браузера и GPU, поэтому
+    сессия обходится значительно дешевле отдельного Chrome (см. benchmarks/contexts.py).
+
+    Команды контекстов выполняются по очереди, поэтому хост выгоден, пока время запроса определяется
+    ожиданием сайта, а не командами драйвера. Падение браузера затрагивает все контексты хоста.
+    """
+
+    def __init__(
+            self,
+            timeout: int | float = 30,
+            headless: bool = True,
+            profile: Optional[BrowserProfile] = None,
+            page_load_timeout: int | float = 60,
+    ) -> None:
+        """
+        Args:
+            timeout (int | float): Таймаут выполнения скриптов (в секундах).
+            headless (bool): Если True, запускает браузер в фоновом режиме без GUI.
+            profile (Optional[BrowserProfile]): Профиль запуска браузера (по-умолчанию DEFAULT_PROFILE).
+                Блокировка ресурсов настраивается для каждого контекста по PROFILE его парсера.
+            page_load_timeout (int | float): Таймаут загрузки страницы в ContextDriver.get (в секундах).
+        """
+        self.timeout = timeout
+        self.headless = headless
+        self.profile = profile or DEFAULT_PROFILE
+        self.page_load_timeout = page_load_timeout
+        self.lock = threading.RLock()
+        self.driver = BaseParser.create_driver(timeout, headless, profile=self.profile)
+        self._home = self.driver.current_window_handle
+        self._current = self._home
+        self._contexts: dict[str, ContextDriver] = {}
+
+    def switch(self, handle: str) -> None:
+        """Переключает драйвер на вкладку. Вызывается под lock."""
+        if self._current != handle:
+            self.driver.switch_to.window(handle)
+            self._current = handle
+
+    def new_driver(self, parser_cls: type[BaseParser], user_agent: Optional[str] = None) -> ContextDriver:
+        """
+        Создает контекст с вкладкой, настроенной для парсера и открытой на parser_cls.URL.
+
+        Args:
+            parser_cls (type[BaseParser]): Класс парсера.
+            user_agent (Optional[str]): Пользовательский агент контекста (по-умолчанию агент браузера).
+        Returns:
+            ContextDriver: Драйвер контекста для аргумента driver парсера.
+        """
+        with self.lock:
+            context_id = self.driver.execute_cdp_cmd(
+                "Target.createBrowserContext", {"disposeOnDetach": False}
+            )["browserContextId"]
+            target_id = self.driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+            )["targetId"]
+            # Дескриптор окна ChromeDriver совпадает с идентификатором цели DevTools
+            handle = next((handle for handle in self.driver.window_handles if target_id in handle), None)
+            if handle is None:
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+                raise WebDriverException(f"Вкладка {target_id} не найдена среди окон драйвера")
+            context = self._contexts[handle] = ContextDriver(self, handle, context_id, target_id)
+
+        try:
+            parser_cls.prepare_target(context)
+            if user_agent:
+                context.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+            context.get(parser_cls.URL)
+        except Exception:
+            self.close_context(context)
+            raise
+        return context
+
+    def parser(self, parser_cls: type[BaseParser], timeout: Optional[int | float] = None, **kwargs) -> BaseParser:
+        """
+        Создает парсер в новом контексте. Контекст закрывается вместе с парсером (parser.close()
+        или выход из with) либо при закрытии хоста.
+        """
+        context = self.new_driver(parser_cls)
+        try:
+            parser = parser_cls(timeout=timeout or self.timeout, headless=self.headless, driver=context, **kwargs)
+        except Exception:
+            self.close_context(context)
+            raise
+        # Браузер хоста не перезапускается парсером, но контекст принадлежит ему
+        parser._closes_driver = True
+        return parser
+
+    def close_context(self, context: ContextDriver) -> None:
+        """Закрывает вкладку и удаляет контекст."""
+        with self.lock:
+            if self._contexts.pop(context.handle, None) is None:
+                return
+            with suppress(WebDriverException):
+                self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": context.target_id})
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context.context_id})
+            self.driver.switch_to.window(self._home)
+            self._current = self._home
+
+    @property
+    def sessions(self) -> int:
+        """Количество открытых контекстов."""
+        return len(self._contexts)
+
+    def memory(self) -> dict[str, Optional[float]]:
+        """
+        Returns:
+            dict[str, Optional[float]]: rss_mb (память браузера со всеми процессами) и per_session_mb
+            (на контекст). None, если память не удалось измерить.
+        """
+        rss = get_driver_rss(self.driver)
+        if rss is None:
+            return {"rss_mb": None, "per_session_mb": None}
+        rss_mb = rss / 2 ** 20
+        return {"rss_mb": rss_mb, "per_session_mb": rss_mb / self.sessions if self.sessions else None}
+
+    def close(self) -> None:
+        """Закрывает все контексты и браузер."""
+        for context in list(self._contexts.values()):
+            self.close_context(context)
+        self.driver.quit()
+
+    def __enter__(self) -> 'BrowserHost':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+    from parser_rom import RomParser
+
+    with BrowserHost(timeout=30) as host:
+        npd_parsers = [host.parser(NpdParser) for _ in range(4)]
+        rom_parser = host.parser(RomParser)
+        print(npd_parsers[0].parse(inn="500100732259"), rom_parser.parse(inn="500100732259"))
+        print(host.memory())
+
+
+if __name__ == '__main__':
+    main()
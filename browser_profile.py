@@ -0,0 +1,282 @@
+import logging
+import statistics
+import threading
+from contextlib import suppress
+from fnmatch import fnmatchcase
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PATTERNS = ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*")
+MEDIA_PATTERNS = ("*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.wav*")
+FONT_PATTERNS = ("*.woff*", "*.ttf*", "*.otf*", "*.eot*")
+STYLESHEET_PATTERNS = ("*.css*",)
+TRACKER_PATTERNS = (
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*mc.yandex.ru*", "*an.yandex.ru*", "*top-fwz1.mail.ru*", "*counter.yadro.ru*", "*sputnik.ru*",
+)
+
+# Сводка загрузки текущей страницы по Navigation/Resource Timing API
+_LOAD_REPORT_JS = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    dom_content_loaded: navigation ? navigation.domContentLoadedEventEnd : null,
+    load: navigation ? navigation.loadEventEnd : null,
+    document_bytes: navigation ? navigation.transferSize : 0,
+    resource_bytes: resources.reduce((total, entry) => total + (entry.transferSize || 0), 0),
+    resources: resources.length,
+};
+"""
+
+
+class BrowserProfile:
+    """
+    Настройки запуска браузера: блокировка ресурсов через CDP, стратегия загрузки страницы и размер окна.
+    """
+
+    def __init__(
+            self,
+            block_images: bool = False,
+            block_media: bool = False,
+            block_fonts: bool = False,
+            block_stylesheets: bool = False,
+            block_trackers: bool = False,
+            blocked_patterns: Iterable[str] = (),
+            page_load_strategy: str = "normal",
+            window_size: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """
+        Args:
+            block_images (bool): Блокировать изображения.
+            block_media (bool): Блокировать аудио и видео.
+            block_fonts (bool): Блокировать веб-шрифты.
+            block_stylesheets (bool): Блокировать стили. Видимость блоков результата часто задается
+                стилями, поэтому для форм сайтов это обычно недопустимо.
+            block_trackers (bool): Блокировать сторонние счетчики и аналитику.
+            blocked_patterns (Iterable[str]): Дополнительные шаблоны URL для блокировки (с '*').
+            page_load_strategy (str): "normal", "eager" или "none". Ожидания парсеров компенсируют
+                незавершенную загрузку.
+            window_size (Optional[tuple[int, int]]): Размер окна. None — окно на весь экран.
+        """
+        if page_load_strategy not in ("normal", "eager", "none"):
+            raise ValueError(f"Неизвестная стратегия загрузки: {page_load_strategy}")
+        self.block_images = block_images
+        self.block_media = block_media
+        self.block_fonts = block_fonts
+        self.block_stylesheets = block_stylesheets
+        self.block_trackers = block_trackers
+        self.blocked_patterns = tuple(blocked_patterns)
+        self.page_load_strategy = page_load_strategy
+        self.window_size = window_size
+
+    def blocked_urls(self, allowlist: Iterable[str] = ()) -> list[str]:
+        """
+        Возвращает шаблоны URL для CDP Network.setBlockedURLs. Используется, когда исключения нельзя
+        применить к отдельным запросам (см. RequestInterceptor).
+
+        Args:
+            allowlist (Iterable[str]): Шаблоны URL, которые должны загружаться. Шаблоны блокировки,
+                под которые попадает хотя бы один из них, исключаются из блокировки целиком.
+        """
+        patterns = self.patterns()
+        allowed = tuple(allowlist)
+        return [pattern for pattern in patterns if not any(fnmatchcase(url, pattern) for url in allowed)]
+
+    def patterns(self) -> list[str]:
+        """Возвращает все шаблоны URL, блокируемые профилем."""
+        patterns = list(self.blocked_patterns)
+        for enabled, group in (
+                (self.block_images, IMAGE_PATTERNS),
+                (self.block_media, MEDIA_PATTERNS),
+                (self.block_fonts, FONT_PATTERNS),
+                (self.block_stylesheets, STYLESHEET_PATTERNS),
+                (self.block_trackers, TRACKER_PATTERNS),
+        ):
+            if enabled:
+                patterns.extend(group)
+        return patterns
+
+
+class RequestInterceptor:
+    """
+    Блокировка ресурсов с исключениями для отдельных URL через CDP Fetch: запросы, подходящие под
+    шаблоны блокировки, приостанавливаются браузером (Fetch.requestPaused) и продолжаются, если URL
+    подходит под шаблон allowlist, иначе отклоняются (BlockedByClient). Разрешенный URL не снимает
+    блокировку с остальных URL того же шаблона, в отличие от Network.setBlockedURLs.
+
+    События обрабатываются в фоновом потоке через отдельное CDP-соединение с вкладкой драйвера.
+    Поток завершается вместе с вкладкой или браузером.
+    """
+    # Период проверки, что вкладка еще открыта (в секундах)
+    TARGET_CHECK_INTERVAL = 5.0
+
+    def __init__(self, driver: Any, patterns: Iterable[str], allowlist: Iterable[str]) -> None:
+        """
+        Args:
+            driver (Any): Драйвер Chrome (или драйвер контекста BrowserHost), текущая вкладка которого
+                настраивается.
+            patterns (Iterable[str]): Шаблоны URL для блокировки (с '*').
+            allowlist (Iterable[str]): Шаблоны URL, которые должны загружаться.
+        """
+        self.patterns = tuple(patterns)
+        self.allowlist = tuple(allowlist)
+        self.blocked = 0
+        self.allowed = 0
+        self._handle = driver.current_window_handle
+        self._endpoint = _cdp_endpoint(driver)
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="RequestInterceptor", daemon=True)
+
+    def is_allowed(self, url: str) -> bool:
+        """Проверяет, подходит ли URL под шаблон allowlist."""
+        return any(fnmatchcase(url, pattern) for pattern in self.allowlist)
+
+    def start(self, timeout: int | float = 10) -> 'RequestInterceptor':
+        """
+        Запускает перехват и дожидается включения Fetch на вкладке.
+
+        Raises:
+            RuntimeError: Перехват не удалось включить за timeout секунд (исходная ошибка — в __cause__).
+        """
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._error is not None:
+            raise RuntimeError("Не удалось включить перехват запросов") from self._error
+        return self
+
+    def _run(self) -> None:
+        import trio
+
+        try:
+            trio.run(self._intercept)
+        except BaseException as ex:
+            if not self._ready.is_set():
+                self._error = ex
+                self._ready.set()
+            else:
+                logger.debug("Перехват запросов остановлен: %r", ex)
+
+    async def _intercept(self) -> None:
+        import trio
+        from selenium.webdriver.common.bidi import cdp
+
+        version, ws_url = self._endpoint
+        devtools = cdp.import_devtools(version)
+        async with cdp.open_cdp(ws_url) as connection:
+            targets = await connection.execute(devtools.target.get_targets())
+            target_id = next(target.target_id for target in targets if target.target_id in self._handle)
+            async with connection.open_session(target_id) as session:
+                events = session.listen(devtools.fetch.RequestPaused, buffer_size=256)
+                await session.execute(devtools.fetch.enable(
+                    patterns=[devtools.fetch.RequestPattern(url_pattern=pattern) for pattern in self.patterns]
+                ))
+                self._ready.set()
+
+                async def watch_target() -> None:
+                    while True:
+                        await trio.sleep(self.TARGET_CHECK_INTERVAL)
+                        targets = await connection.execute(devtools.target.get_targets())
+                        if all(target.target_id != target_id for target in targets):
+                            nursery.cancel_scope.cancel()
+
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(watch_target)
+                    async for event in events:
+                        if self.is_allowed(event.request.url):
+                            self.allowed += 1
+                            command = devtools.fetch.continue_request(event.request_id)
+                        else:
+                            self.blocked += 1
+                            command = devtools.fetch.fail_request(
+                                event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT
+                            )
+                        # Запрос мог быть отменен страницей, пока ждал решения
+                        with suppress(cdp.BrowserError):
+                            await session.execute(command)
+
+
+def _cdp_endpoint(driver: Any) -> tuple[str, str]:
+    """Возвращает версию протокола и адрес WebSocket CDP браузера драйвера."""
+    capabilities = driver.caps
+    if capabilities.get("se:cdp"):
+        return capabilities["se:cdpVersion"].split(".")[0], capabilities["se:cdp"]
+    return driver._get_cdp_details()
+
+
+# Профиль по-умолчанию: без блокировок, окно на весь экран
+DEFAULT_PROFILE = BrowserProfile()
+
+# Облегченный профиль: без изображений, медиа, шрифтов и счетчиков, маленькое окно, загрузка до DOMContentLoaded
+LEAN_PROFILE = BrowserProfile(
+    block_images=True,
+    block_media=True,
+    block_fonts=True,
+    block_trackers=True,
+    page_load_strategy="eager",
+    window_size=(1280, 800),
+)
+
+
+def page_load_report(driver: Any) -> dict[str, Any]:
+    """
+    Возвращает сводку загрузки текущей страницы.
+
+    Returns:
+        dict[str, Any]: dom_content_loaded и load (мс от начала навигации), document_bytes и resource_bytes
+        (переданные байты), resources (количество загруженных ресурсов).
+    """
+    return driver.execute_script(_LOAD_REPORT_JS)
+
+
+def measure_profile(parser_cls: type, profile: BrowserProfile, runs: int = 3, headless: bool = True) -> dict[str, float]:
+    """
+    Измеряет загрузку стартовой страницы парсера с указанным профилем.
+
+    Args:
+        parser_cls (type): Класс парсера.
+        profile (BrowserProfile): Проверяемый профиль.
+        runs (int): Количество загрузок страницы.
+        headless (bool): Если True, запускает браузер в фоновом режиме без GUI (по-умолчанию True).
+    Returns:
+        dict[str, float]: Медианы dom_content_loaded, load (мс) и bytes (документ и ресурсы).
+    """
+    driver = parser_cls.create_driver(timeout=60, headless=headless, profile=profile)
+    reports = []
+    try:
+        for _ in range(runs):
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get(parser_cls.URL)
+            driver.execute_script("return new Promise(resolve => document.readyState === 'complete' "
+                                  "? resolve() : window.addEventListener('load', () => resolve()))")
+            reports.append(page_load_report(driver))
+    finally:
+        driver.quit()
+
+    return {
+        "dom_content_loaded": statistics.median(report["dom_content_loaded"] or 0 for report in reports),
+        "load": statistics.median(report["load"] or 0 for report in reports),
+        "bytes": statistics.median(report["document_bytes"] + report["resource_bytes"] for report in reports),
+    }
+
+
+# Пример использования: сравнение профилей для всех парсеров
+def main():
+    from parser_arbitr import ArbitrParser
+    from parser_inn import InnParser
+    from parser_npd import NpdParser
+    from parser_rom import RomParser
+
+    for parser_cls in (ArbitrParser, InnParser, NpdParser, RomParser):
+        default = measure_profile(parser_cls, DEFAULT_PROFILE)
+        lean = measure_profile(parser_cls, LEAN_PROFILE)
+        print(
+            f"{parser_cls.__name__}: "
+            f"сэкономлено {(default['bytes'] - lean['bytes']) / 1024:.0f} КБ, "
+            f"загрузка {default['load']:.0f} -> {lean['load']:.0f} мс, "
+            f"DOMContentLoaded {default['dom_content_loaded']:.0f} -> {lean['dom_content_loaded']:.0f} мс"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import functools
+import inspect
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from base import BaseParser
+from exceptions import InnNotFoundError
+from validation import validate_arguments
+
+# Исключения, которые кэшируются как отрицательный результат. Временные ошибки
+# (ServiceUnavailableError, ServiceCaptchaError и т.п.) не кэшируются никогда.
+NEGATIVE_ERRORS: tuple[type[Exception], ...] = (InnNotFoundError,)
+
+_VALUE = 0
+_ERROR = 1
+
+
+def normalize_value(value: Any) -> Any:
+    """Нормализует входное значение: схлопывает пробелы и приводит строки к нижнему регистру."""
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    return value
+
+
+def make_key(parser_name: str, parse: Callable[..., Any], args: tuple, kwargs: dict[str, Any]) -> str:
+    """
+    Строит ключ вызова parse(): имя парсера и нормализованные аргументы, сопоставленные с сигнатурой,
+    так что позиционный и именованный вызовы дают один ключ.
+    """
+    bound = inspect.signature(parse).bind(*args, **kwargs)
+    arguments = {name: normalize_value(value) for name, value in bound.arguments.items()}
+    return f"{parser_name}:{json.dumps(arguments, ensure_ascii=False, sort_keys=True, default=str)}"
+
+
+def parse_key(parser_cls: type[BaseParser], args: tuple, kwargs: dict[str, Any]) -> str:
+    """
+    Ключ вызова parse(): имя класса парсера и аргументы, нормализованные validation.validate_arguments
+    и normalize_value, так что "7707 083 893" и "7707083893" дают один ключ. Используется кэшем
+    и объединением запросов (singleflight.py).
+
+    Raises:
+        FieldFormatError: Неверный формат данных.
+    """
+    parse = functools.partial(parser_cls.parse, None)
+    arguments = validate_arguments(inspect.signature(parse).bind(*args, **kwargs).arguments, parser_cls.INN_LENGTHS)
+    return make_key(parser_cls.__name__, parse, (), arguments)
+
+
+class ResultCache:
+    """
+    Кэш результатов parse() с временем жизни: LRU-уровень в памяти и общий для процессов
+    уровень на диске (SQLite в режиме WAL).
+
+    Время жизни берется из атрибутов парсера CACHE_TTL (успешный результат) и NEGATIVE_CACHE_TTL
+    (исключения из NEGATIVE_ERRORS).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_items: int = 10_000) -> None:
+        """
+        Args:
+            path (Optional[str]): Путь к файлу SQLite. Если не задан, используется только память.
+            max_items (int): Максимальное количество записей в памяти.
+        """
+        self.max_items = max_items
+        self._memory: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, expires REAL NOT NULL, kind INTEGER NOT NULL, payload BLOB NOT NULL)"
+            )
+
+    def parse(self, parser: BaseParser, *args, **kwargs) -> Any:
+        """
+        Возвращает результат parser.parse(*args, **kwargs) из кэша или выполняет запрос и кэширует его.
+
+        Raises:
+            FieldFormatError: Неверный формат данных (до обращения к кэшу и сайту).
+            Exception: Исключение parse() (закэшированное отрицательное или новое).
+        """
+        key = parse_key(type(parser), args, kwargs)
+        cached = self.get(key)
+        if cached is not None:
+            kind, payload = cached
+            if kind == _ERROR:
+                raise payload()
+            return payload
+
+        try:
+            result = parser.parse(*args, **kwargs)
+        except NEGATIVE_ERRORS as ex:
+            self.set(key, _ERROR, type(ex), parser.NEGATIVE_CACHE_TTL)
+            raise
+        self.set(key, _VALUE, result, parser.CACHE_TTL)
+        return result
+
+    def get(self, key: str) -> Optional[tuple[int, Any]]:
+        """Возвращает (тип записи, значение) по ключу или None, если записи нет или она устарела."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return entry[1], entry[2]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires, kind, payload FROM results WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    expires, kind, payload = row[0], row[1], pickle.loads(row[2])
+                    self._remember(key, expires, kind, payload)
+                    self._disk_hits += 1
+                    return kind, payload
+
+            self._misses += 1
+            return None
+
+    def set(self, key: str, kind: int, payload: Any, ttl: int | float) -> None:
+        """Сохраняет запись в памяти и на диске."""
+        if ttl <= 0:
+            return
+        expires = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires, kind, payload)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, expires, kind, payload) VALUES (?, ?, ?, ?)",
+                    (key, expires, kind, pickle.dumps(payload)),
+                )
+
+    def _remember(self, key: str, expires: float, kind: int, payload: Any) -> None:
+        """Помещает запись в LRU-уровень памяти. Вызывается под блокировкой."""
+        self._memory[key] = (expires, kind, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def purge(self) -> None:
+        """Удаляет устаревшие записи с диска."""
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+
+    def stats(self) -> dict[str, float]:
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict[str, float]: memory_hits, disk_hits, misses, hit_ratio, size (записей в памяти).
+        """
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": hits / total if total else 0.0,
+                "size": len(self._memory),
+            }
+
+    def close(self) -> None:
+        """Закрывает соединение с диском."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    cache = ResultCache(path="results_cache.sqlite3")
+    with NpdParser(timeout=30, engine="http") as npd_parser:
+        for _ in range(3):
+            print(cache.parse(npd_parser, inn="500100732259"))
+    print(cache.stats())
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
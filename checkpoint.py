@@ -0,0 +1,38 @@
+import json
+import os
+
+
+class BatchCheckpoint:
+    """
+    Файл контрольной точки пакетной обработки: хранит количество полностью обработанных элементов,
+    чтобы прерванный пакет можно было продолжить с места остановки.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Путь к JSON-файлу контрольной точки.
+        """
+        self.path = path
+
+    def load(self) -> int:
+        """Возвращает количество обработанных элементов (0, если файла нет)."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return int(json.load(file)["completed"])
+        except FileNotFoundError:
+            return 0
+
+    def save(self, completed: int) -> None:
+        """Атомарно сохраняет количество обработанных элементов."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"completed": completed}, file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Удаляет файл контрольной точки после завершения пакета."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,240 @@
+"""
+Пакетная обработка файлов из командной строки.
+
+    python -m cli run --parser npd --input inns.csv --output results.jsonl --workers 8
+
+Вход — CSV с заголовком или JSONL; колонки (ключи) совпадают с аргументами parse() парсера
+(для парсеров с одним аргументом колонку можно указать через --column). Результаты дописываются
+в JSONL по мере готовности в порядке входа. Повторяющиеся входные данные обрабатываются один раз,
+а при перезапуске пропускаются строки, уже записанные в выходной файл (кроме временных ошибок
+из RETRYABLE_ERRORS — они повторяются; актуальна последняя запись по ключу). Входные данные
+проверяются и нормализуются validation.py до отправки в рабочие процессы: строки с неверным форматом
+сразу записываются со статусом invalid_input.
+"""
+import argparse
+import csv
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Iterator, Optional, TextIO
+
+from concurrent.futures import Future
+
+from cache import normalize_value
+from exceptions import FieldFormatError
+from results import Status, status_of
+from validation import validate_arguments
+
+PARSERS = {
+    "arbitr": "parser_arbitr:ArbitrParser",
+    "inn": "parser_inn:InnParser",
+    "npd": "parser_npd:NpdParser",
+    "rom": "parser_rom:RomParser",
+}
+
+
+def load_parser(name: str) -> type:
+    """Возвращает класс парсера по имени из PARSERS или пути вида "модуль:Класс"."""
+    module_name, _, class_name = PARSERS.get(name, name).partition(":")
+    if not class_name:
+        raise ValueError(f"Неизвестный парсер: {name}")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def parse_arguments(parser_cls: type) -> list[str]:
+    """Возвращает имена аргументов parse() парсера."""
+    return [name for name in inspect.signature(parser_cls.parse).parameters if name != "self"]
+
+
+def engine_arguments(parser_cls: type, engine: Optional[str]) -> dict[str, Any]:
+    """
+    Возвращает аргументы конструктора парсера для выбранного движка (--engine).
+
+    Raises:
+        ValueError: Парсер не поддерживает выбор движка (например, ArbitrParser и InnParser).
+    """
+    if not engine:
+        return {}
+    if "engine" not in inspect.signature(parser_cls.__init__).parameters:
+        raise ValueError(f"{parser_cls.__name__} не поддерживает выбор движка (--engine)")
+    return {"engine": engine}
+
+
+def read_rows(path: str) -> Iterator[dict[str, Any]]:
+    """Лениво читает строки входного файла (CSV с заголовком или JSONL)."""
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def make_item(row: dict[str, Any], arguments: list[str], column: Optional[str]) -> dict[str, Any]:
+    """Выбирает из строки аргументы parse()."""
+    if len(arguments) == 1:
+        return {arguments[0]: row[column or arguments[0]]}
+    return {name: row[name] for name in arguments}
+
+
+def item_key(item: dict[str, Any]) -> str:
+    """Ключ входных данных для дедупликации и возобновления."""
+    return json.dumps({name: normalize_value(value) for name, value in item.items()},
+                      ensure_ascii=False, sort_keys=True)
+
+
+def load_done(path: str, retry_statuses: set[str]) -> set[str]:
+    """Возвращает ключи, уже записанные в выходной файл с окончательным статусом."""
+    done: set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Строка, недописанная при аварийной остановке
+                continue
+            if record.get("status") in retry_statuses:
+                done.discard(record["key"])
+            else:
+                done.add(record["key"])
+    return done
+
+
+def open_output(path: str) -> TextIO:
+    """Открывает выходной файл на дозапись, завершая недописанную последнюю строку."""
+    output = open(path, "a+", encoding="utf-8")
+    if output.tell():
+        output.seek(output.tell() - 1)
+        if output.read(1) != "\n":
+            output.write("\n")
+    return output
+
+
+class Progress:
+    """Счетчики обработки и периодический вывод статистики в stderr."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.started = time.monotonic()
+        self._printed = self.started
+        self.processed = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.statuses: dict[str, int] = {}
+
+    def record(self, status: str) -> None:
+        self.processed += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if time.monotonic() - self._printed >= self.interval:
+            self.print()
+
+    def print(self) -> None:
+        self._printed = time.monotonic()
+        elapsed = max(self._printed - self.started, 1e-9)
+        errors = self.processed - self.statuses.get(Status.OK.value, 0)
+        error_rate = errors / self.processed * 100 if self.processed else 0.0
+        print(
+            f"обработано {self.processed} ({self.processed / elapsed:.2f}/с), ошибок {error_rate:.1f}%, "
+            f"пропущено {self.skipped}, дубликатов {self.duplicates}, статусы {self.statuses}",
+            file=sys.stderr, flush=True,
+        )
+
+
+def run(args: argparse.Namespace) -> Progress:
+    """Обрабатывает входной файл и дописывает результаты в выходной."""
+    from executor import ParserExecutor
+    from ratelimit import RETRYABLE_ERRORS
+
+    parser_cls = load_parser(args.parser)
+    arguments = parse_arguments(parser_cls)
+    done = load_done(args.output, {status_of(error).value for error in RETRYABLE_ERRORS})
+    seen = set(done)
+    progress = Progress(args.stats_interval)
+    parser_kwargs = engine_arguments(parser_cls, args.engine)
+
+    def items() -> Iterator[tuple[str, dict[str, Any], Optional[Exception]]]:
+        for row in read_rows(args.input):
+            item = make_item(row, arguments, args.column)
+            error = None
+            try:
+                item = validate_arguments(item, parser_cls.INN_LENGTHS)
+            except FieldFormatError as ex:
+                error = ex
+            key = item_key(item)
+            if key in done:
+                progress.skipped += 1
+                continue
+            if key in seen:
+                progress.duplicates += 1
+                continue
+            seen.add(key)
+            yield key, item, error
+
+    with open_output(args.output) as output, \
+            ParserExecutor(parser_cls, workers=args.workers, timeout=args.timeout,
+                           headless=args.headless, **parser_kwargs) as executor:
+        in_flight = deque()
+
+        def write_next() -> None:
+            key, item, future = in_flight.popleft()
+            error = future.exception()
+            result = None if error is not None else future.result()
+            status = status_of(type(error) if error is not None else None).value
+            output.write(json.dumps({
+                "key": key, "input": item, "status": status, "result": result,
+                "error": str(error) if error is not None else None,
+            }, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            progress.record(status)
+
+        for key, item, error in items():
+            if error is not None:
+                # Неверный формат отсеивается до отправки в рабочие процессы
+                future = Future()
+                future.set_exception(error)
+            else:
+                future = executor.submit(**item)
+            in_flight.append((key, item, future))
+            if len(in_flight) >= args.workers * 2:
+                write_next()
+        while in_flight:
+            write_next()
+
+    progress.print()
+    return progress
+
+
+def main():
+    argparser = argparse.ArgumentParser(prog="python -m cli", description="Пакетная обработка файлов парсерами")
+    commands = argparser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Обработать входной файл")
+    run_parser.add_argument("--parser", required=True,
+                            help=f"{', '.join(PARSERS)} или путь к классу вида модуль:Класс")
+    run_parser.add_argument("--input", required=True, help="CSV с заголовком или JSONL")
+    run_parser.add_argument("--output", required=True, help="JSONL с результатами (дописывается)")
+    run_parser.add_argument("--workers", default=1, type=int, help="Количество рабочих процессов")
+    run_parser.add_argument("--column", help="Колонка входа для парсеров с одним аргументом")
+    run_parser.add_argument("--engine", choices=("selenium", "http"), help="Движок NpdParser и RomParser")
+    run_parser.add_argument("--timeout", default=30, type=float, help="Таймаут ожидания элементов (с)")
+    run_parser.add_argument("--no-headless", dest="headless", action="store_false")
+    run_parser.add_argument("--stats-interval", default=5.0, type=float, help="Период вывода статистики (с)")
+
+    args = argparser.parse_args()
+    if args.command == "run":
+        try:
+            engine_arguments(load_parser(args.parser), args.engine)
+        except ValueError as ex:
+            argparser.error(str(ex))
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from selenium.common import NoSuchElementException, TimeoutException
+
+from base import BaseParser
+from browser_profile import BrowserProfile
+from exceptions import FieldFormatError, ServiceUnavailableError, UndefinedError
+from parser_arbitr import ArbitrParser
+from parser_npd import NpdParser
+from parser_rom import RomParser
+from results import ParseResult, status_of
+from validation import validate_inn
+
+# Сервисы проверки ИНН: имя -> класс парсера
+SERVICES: dict[str, type[BaseParser]] = {
+    "npd": NpdParser,
+    "rom": RomParser,
+    "arbitr": ArbitrParser,
+}
+
+
+@dataclass(slots=True)
+class CompositeResult:
+    """Результаты проверок одного ИНН всеми сервисами."""
+    inn: str
+    checks: dict[str, ParseResult] = field(default_factory=dict)
+    duration: float = 0.0
+
+    def __getitem__(self, service: str) -> ParseResult:
+        return self.checks[service]
+
+
+def _map_error(ex: Exception) -> Exception:
+    """Приводит исключения Selenium к исключениям parse()."""
+    if isinstance(ex, NoSuchElementException):
+        return UndefinedError()
+    if isinstance(ex, TimeoutException):
+        return ServiceUnavailableError()
+    return ex
+
+
+class CompositeChecker:
+    """
+    Проверка ИНН несколькими сервисами (самозанятость, реестр обеспечительных мер, арбитражные дела)
+    в одном браузере: каждый сервис открыт в своей вкладке, формы отправляются во все вкладки подряд,
+    после чего ответы ожидаются одновременно — вкладки опрашиваются по очереди через find_outcome().
+    """
+
+    def __init__(
+            self,
+            timeout: int | float = 30,
+            headless: bool = True,
+            services: Iterable[str] = ("npd", "rom", "arbitr"),
+            profile: Optional[BrowserProfile] = None,
+    ) -> None:
+        """
+        Запускает браузер и открывает вкладку для каждого сервиса.
+
+        Args:
+            timeout (int | float): Таймаут ожидания ответа всех сервисов (в секундах).
+            headless (bool): Если True, запускает браузер в фоновом режиме без GUI (по-умолчанию True).
+            services (Iterable[str]): Имена сервисов из SERVICES.
+            profile (Optional[BrowserProfile]): Профиль браузера (по-умолчанию PROFILE первого сервиса).
+        """
+        self.timeout = timeout
+        services = list(services)
+        unknown = [service for service in services if service not in SERVICES]
+        if unknown:
+            raise ValueError(f"Неизвестные сервисы: {', '.join(unknown)}")
+
+        self.driver = SERVICES[services[0]].create_driver(timeout, headless, profile=profile)
+        self._parsers: dict[str, BaseParser] = {}
+        self._tabs: dict[str, str] = {}
+        self._failed: set[str] = set()
+        self._first = True
+        try:
+            for index, service in enumerate(services):
+                parser_cls = SERVICES[service]
+                if index:
+                    self.driver.switch_to.new_window("tab")
+                    parser_cls.prepare_target(self.driver, profile)
+                self.driver.get(parser_cls.URL)
+                self._tabs[service] = self.driver.current_window_handle
+                self._parsers[service] = parser_cls(timeout=timeout, headless=headless, driver=self.driver)
+        except Exception:
+            self.driver.quit()
+            raise
+
+    def check(self, inn: str) -> CompositeResult:
+        """
+        Проверяет ИНН всеми сервисами.
+
+        Args:
+            inn (str): ИНН физического лица.
+        Returns:
+            CompositeResult: Результат и время каждой проверки. Ошибки сервисов не возбуждаются,
+            а возвращаются статусом ParseResult; ИНН, неверный для сервиса, получает статус
+            INVALID_INPUT без обращения к его вкладке.
+        """
+        started = time.perf_counter()
+        result = CompositeResult(inn)
+        pending: dict[str, float] = {}
+
+        for service, parser in self._parsers.items():
+            service_started = time.perf_counter()
+            try:
+                service_inn = validate_inn(inn, parser.INN_LENGTHS)
+            except FieldFormatError as ex:
+                self._record(result, service, service_started, error=ex)
+                continue
+            try:
+                self._switch(service)
+                self._prepare(service, parser)
+                parser.begin(service_inn)
+                pending[service] = service_started
+            except Exception as ex:
+                self._finish(result, service, service_started, error=_map_error(ex))
+
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            for service in list(pending):
+                parser = self._parsers[service]
+                try:
+                    self._switch(service)
+                    outcome = parser.find_outcome(parser.RESULTS, parser.ERRORS)
+                    if outcome is None:
+                        continue
+                    value = parser.resolve(outcome)
+                except Exception as ex:
+                    self._finish(result, service, pending.pop(service), error=_map_error(ex))
+                else:
+                    self._finish(result, service, pending.pop(service), value=value)
+
+            if pending and time.monotonic() >= deadline:
+                for service, service_started in pending.items():
+                    self._finish(result, service, service_started, error=ServiceUnavailableError())
+                pending.clear()
+            elif pending:
+                time.sleep(0.1)
+
+        self._first = False
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _switch(self, service: str) -> None:
+        """Переключает драйвер на вкладку сервиса."""
+        if self.driver.current_window_handle != self._tabs[service]:
+            self.driver.switch_to.window(self._tabs[service])
+
+    def _prepare(self, service: str, parser: BaseParser) -> None:
+        """Сбрасывает вкладку после предыдущей проверки (после ошибки — перезагружает страницу)."""
+        if service in self._failed:
+            parser._reload()
+        elif not self._first:
+            parser._reset_form()
+
+    def _finish(self, result: CompositeResult, service: str, started: float,
+                value: Any = None, error: Optional[Exception] = None) -> None:
+        """Записывает результат проверки сервисом и отмечает вкладку для сброса после ошибки."""
+        if error is None:
+            self._failed.discard(service)
+        else:
+            self._failed.add(service)
+        self._record(result, service, started, value, error)
+
+    def _record(self, result: CompositeResult, service: str, started: float,
+                value: Any = None, error: Optional[Exception] = None) -> None:
+        """Записывает результат проверки сервисом."""
+        result.checks[service] = ParseResult(
+            status_of(type(error) if error is not None else None), value,
+            time.perf_counter() - started, type(self._parsers[service]).__name__,
+        )
+
+    def close(self) -> None:
+        """Закрывает браузер со всеми вкладками."""
+        self.driver.quit()
+
+    def __enter__(self) -> 'CompositeChecker':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# Пример использования
+def main():
+    with CompositeChecker(timeout=30, headless=False) as checker:
+        result = checker.check("500100732259")
+        for service, check in result.checks.items():
+            print(f"{service}: {check.status.value} {check.value} ({check.duration:.1f} с)")
+        print(f"Всего: {result.duration:.1f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,3 +21,18 @@ class DataVerificationError(Exception):
 class ServiceCaptchaError(Exception):
     def __str__(self) -> str:
         return "Превышен лимит запросов. Повторите запрос позднее."
+
+class LayoutDriftError(Exception):
+    def __init__(self, parser: str = "", elements: tuple[str, ...] = ()) -> None:
+        super().__init__(parser, elements)
+        self.parser = parser
+        self.elements = elements
+
+    def __str__(self) -> str:
+        if not self.elements:
+            return "Разметка страницы сервиса изменилась."
+        return f"Разметка страницы сервиса изменилась: не найдены элементы {', '.join(self.elements)} ({self.parser})."
+
+class DeadlineExceededError(Exception):
+    def __str__(self) -> str:
+        return "Запрос не может быть выполнен до истечения срока."
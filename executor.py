@@ -0,0 +1,392 @@
+import itertools
+import multiprocessing
+import os
+import pickle
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from multiprocessing.connection import Connection, wait as wait_connections
+from typing import Any, Iterable, Iterator, Optional
+
+from base import BaseParser
+from exceptions import UndefinedError
+
+_DONE = "done"
+_STARTED = "started"
+_FAILED_TO_START = "failed_to_start"
+
+
+def _picklable(ex: BaseException) -> BaseException:
+    """Возвращает исключение, пригодное для передачи между процессами."""
+    try:
+        pickle.dumps(ex)
+        return ex
+    except Exception:
+        return UndefinedError()
+
+
+def _worker_main(parser_cls: type[BaseParser], parser_kwargs: dict[str, Any], conn: Connection) -> None:
+    """Точка входа рабочего процесса: держит один парсер и обрабатывает задания из своего канала."""
+    try:
+        parser = parser_cls(**parser_kwargs)
+    except Exception as ex:
+        conn.send((_FAILED_TO_START, None, _picklable(ex), 0.0))
+        return
+    conn.send((_STARTED, None, None, 0.0))
+
+    current: deque[tuple[int, float]] = deque()
+
+    def job_items() -> Iterator[Any]:
+        while True:
+            job = conn.recv()
+            if job is None:
+                return
+            job_id, item = job
+            current.append((job_id, time.perf_counter()))
+            yield item
+
+    with parser:
+        for _, result in parser.parse_many(job_items()):
+            job_id, started = current.popleft()
+            if isinstance(result, BaseException):
+                result = _picklable(result)
+            conn.send((_DONE, job_id, result, time.perf_counter() - started))
+
+
+class _Worker:
+    """
+    Рабочий процесс, его канал связи и текущее задание. После неудачного запуска парсера процесс
+    завершен, а новый запускается не раньше retry_at.
+    """
+    __slots__ = ("process", "conn", "job_id", "start_failures", "retry_at")
+
+    def __init__(self, process: multiprocessing.Process, conn: Connection, start_failures: int = 0) -> None:
+        self.process = process
+        self.conn = conn
+        self.job_id: Optional[int] = None
+        self.start_failures = start_failures  # Неудачных запусков подряд
+        self.retry_at: Optional[float] = None
+
+
+class ParserExecutor:
+    """
+    Пул рабочих процессов, каждый из которых держит долгоживущий парсер (и свой браузер).
+
+    Задания выдаются свободным рабочим по одному, результаты и исключения (в том числе из exceptions.py)
+    возвращаются вызывающему через Future. Упавший рабочий процесс перезапускается, а его текущее
+    задание повторяется один раз. Если парсер не удалось создать (например, не запустился chromedriver),
+    текущее задание рабочего завершается этой ошибкой, а рабочий запускается заново с экспоненциальной
+    задержкой; исполнитель закрывается, только если каждый рабочий не запустился START_ATTEMPTS раз подряд.
+
+    Класс парсера должен быть импортируемым на уровне модуля. Для проверки на локальной копии страницы
+    достаточно подкласса с переопределенным URL.
+    """
+    START_ATTEMPTS = 5         # Неудачных запусков подряд у каждого рабочего до закрытия исполнителя
+    START_BACKOFF = 1.0        # Задержка перед повторным запуском рабочего (с), удваивается
+    MAX_START_BACKOFF = 30.0
+
+    def __init__(
+            self,
+            parser_cls: type[BaseParser],
+            workers: Optional[int] = None,
+            timeout: int | float = 30,
+            headless: bool = True,
+            **parser_kwargs,
+    ) -> None:
+        """
+        Инициализация и запуск рабочих процессов.
+
+        Args:
+            parser_cls (type[BaseParser]): Класс парсера (ArbitrParser, InnParser, NpdParser, RomParser).
+            workers (Optional[int]): Количество рабочих процессов (по-умолчанию — число ядер CPU).
+            timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
+            headless (bool): Если True, запускает браузеры в фоновом режиме без GUI (по-умолчанию True).
+            **parser_kwargs: Дополнительные аргументы конструктора парсера (например, engine="http").
+        """
+        self.parser_cls = parser_cls
+        self.workers = workers or os.cpu_count() or 1
+        self._parser_kwargs = {"timeout": timeout, "headless": headless, **parser_kwargs}
+        self._context = multiprocessing.get_context("spawn")
+
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._pending: dict[int, tuple[Any, Future]] = {}
+        self._queue: deque[int] = deque()
+        self._retried: set[int] = set()
+        self._workers: dict[int, _Worker] = {}
+        self._closed = False
+
+        self._started_at = time.monotonic()
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._latencies: deque[float] = deque(maxlen=1000)
+
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+
+        self._collector = threading.Thread(target=self._collect_loop, name="ParserExecutorCollector", daemon=True)
+        self._collector.start()
+
+    def _spawn(self, worker_id: int, start_failures: int = 0) -> None:
+        """Запускает рабочий процесс с указанным номером."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.parser_cls, self._parser_kwargs, child_conn),
+            name=f"{self.parser_cls.__name__}-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._workers[worker_id] = _Worker(process, parent_conn, start_failures)
+
+    def submit(self, *args, **kwargs) -> Future:
+        """
+        Ставит задание в очередь. Аргументы передаются в parse() парсера.
+
+        Returns:
+            Future: Результат parse() или исключение.
+        """
+        if args and kwargs:
+            raise TypeError("Используйте либо позиционные, либо именованные аргументы")
+        item = kwargs if kwargs else (args[0] if len(args) == 1 else args)
+        return self._submit_item(item)
+
+    def _submit_item(self, item: Any) -> Future:
+        """Ставит в очередь элемент в формате BaseParser.parse_many."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Исполнитель закрыт")
+            job_id = next(self._job_ids)
+            self._pending[job_id] = (item, future)
+            self._queue.append(job_id)
+            self._dispatch()
+        return future
+
+    def map(self, items: Iterable[Any]) -> Iterator[tuple[Any, Any]]:
+        """
+        Обрабатывает элементы параллельно и возвращает пары (элемент, результат или исключение)
+        в порядке поступления элементов.
+        """
+        submitted = [(item, self._submit_item(item)) for item in items]
+        for item, future in submitted:
+            exception = future.exception()
+            yield item, exception if exception is not None else future.result()
+
+    def _dispatch(self) -> None:
+        """Выдает задания из очереди свободным рабочим. Вызывается под блокировкой."""
+        for worker in self._workers.values():
+            if not self._queue:
+                return
+            if worker.job_id is None and worker.retry_at is None and worker.process.is_alive():
+                job_id = self._queue.popleft()
+                worker.job_id = job_id
+                worker.conn.send((job_id, self._pending[job_id][0]))
+
+    def _collect_loop(self) -> None:
+        """Фоновый поток: принимает результаты от рабочих и перезапускает упавшие процессы."""
+        while not self._closed:
+            with self._lock:
+                self._respawn_due()
+                running = {worker_id: worker for worker_id, worker in self._workers.items() if worker.retry_at is None}
+                handles = {worker.conn: (worker_id, worker) for worker_id, worker in running.items()}
+                handles.update({worker.process.sentinel: (worker_id, worker) for worker_id, worker in running.items()})
+                retry_at = [worker.retry_at for worker in self._workers.values() if worker.retry_at is not None]
+            timeout = min([0.5] + [max(at - time.monotonic(), 0.0) for at in retry_at])
+
+            for ready in wait_connections(list(handles), timeout=timeout):
+                worker_id, worker = handles[ready]
+                # Рабочий мог быть перезапущен при разборе предыдущего события
+                if self._workers.get(worker_id) is not worker or worker.retry_at is not None:
+                    continue
+                if isinstance(ready, Connection):
+                    try:
+                        message = ready.recv()
+                    except (EOFError, OSError):
+                        continue
+                    self._receive(worker_id, message)
+                    if self._closed:
+                        return
+                elif not self._closed:
+                    self._restart(worker_id)
+                    if self._closed:
+                        return
+
+    def _receive(self, worker_id: int, message: tuple[str, Optional[int], Any, float]) -> None:
+        """Разбирает сообщение рабочего."""
+        kind, job_id, value, elapsed = message
+        if kind == _STARTED:
+            with self._lock:
+                self._workers[worker_id].start_failures = 0
+        elif kind == _FAILED_TO_START:
+            self._start_failed(worker_id, value)
+        else:
+            self._resolve(worker_id, job_id, value, elapsed)
+
+    def _resolve(self, worker_id: int, job_id: int, value: Any, elapsed: float) -> None:
+        """Передает результат задания в его Future и обновляет статистику."""
+        with self._lock:
+            self._workers[worker_id].job_id = None
+            _, future = self._pending.pop(job_id)
+            self._latencies.append(elapsed)
+            if isinstance(value, BaseException):
+                self._failed += 1
+            else:
+                self._completed += 1
+            self._dispatch()
+
+        if isinstance(value, BaseException):
+            future.set_exception(value)
+        else:
+            future.set_result(value)
+
+    def _restart(self, worker_id: int) -> None:
+        """Перезапускает завершившийся рабочий процесс и повторяет его незавершенное задание."""
+        worker = self._workers[worker_id]
+        # Сообщения, отправленные процессом перед завершением (в том числе об ошибке запуска)
+        while True:
+            try:
+                if not worker.conn.poll():
+                    break
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            self._receive(worker_id, message)
+            if worker.retry_at is not None:
+                return
+
+        failed: Optional[Future] = None
+        with self._lock:
+            if worker.process.is_alive():
+                return
+            worker.conn.close()
+            self._restarts += 1
+
+            job_id = worker.job_id
+            if job_id is not None and job_id in self._retried:
+                _, failed = self._pending.pop(job_id)
+                self._failed += 1
+            elif job_id is not None:
+                self._retried.add(job_id)
+                self._queue.appendleft(job_id)
+
+            self._spawn(worker_id, worker.start_failures)
+            self._dispatch()
+
+        if failed is not None:
+            failed.set_exception(UndefinedError())
+
+    def _start_failed(self, worker_id: int, ex: BaseException) -> None:
+        """
+        Рабочий не создал парсер: его текущее задание завершается ошибкой запуска, повторный запуск
+        откладывается. Если не запускается ни один рабочий, завершает все задания (см. _fail_all).
+        """
+        failed: Optional[Future] = None
+        with self._lock:
+            worker = self._workers[worker_id]
+            worker.conn.close()
+            worker.start_failures += 1
+            backoff = min(self.START_BACKOFF * 2 ** (worker.start_failures - 1), self.MAX_START_BACKOFF)
+            worker.retry_at = time.monotonic() + backoff
+            if worker.job_id is not None:
+                _, failed = self._pending.pop(worker.job_id)
+                self._failed += 1
+                worker.job_id = None
+            give_up = all(other.start_failures >= self.START_ATTEMPTS for other in self._workers.values())
+            self._dispatch()
+
+        if failed is not None:
+            failed.set_exception(ex)
+        if give_up:
+            self._fail_all(ex)
+
+    def _respawn_due(self) -> None:
+        """Запускает рабочих, у которых истекла задержка после неудачного запуска. Вызывается под блокировкой."""
+        now = time.monotonic()
+        for worker_id, worker in list(self._workers.items()):
+            if worker.retry_at is not None and worker.retry_at <= now:
+                worker.process.join()
+                self._restarts += 1
+                self._spawn(worker_id, worker.start_failures)
+        self._dispatch()
+
+    def _fail_all(self, ex: BaseException) -> None:
+        """Закрывает исполнитель и завершает все ожидающие задания ошибкой запуска парсера."""
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._queue.clear()
+        for _, future in pending:
+            future.set_exception(ex)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Возвращает счетчики производительности.
+
+        Returns:
+            dict[str, float]: completed, failed, pending, restarts, throughput (заданий в секунду),
+            latency_mean, latency_p50, latency_p95 (в секундах, по последним 1000 заданиям).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            done = self._completed + self._failed
+            stats = {
+                "completed": self._completed,
+                "failed": self._failed,
+                "pending": len(self._pending),
+                "restarts": self._restarts,
+                "throughput": done / max(time.monotonic() - self._started_at, 1e-9),
+            }
+        stats["latency_mean"] = statistics.fmean(latencies) if latencies else 0.0
+        stats["latency_p50"] = latencies[int(len(latencies) * 0.50)] if latencies else 0.0
+        stats["latency_p95"] = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Останавливает рабочие процессы после завершения всех поставленных заданий."""
+        with self._lock:
+            futures = [future for _, future in self._pending.values()]
+        wait(futures)
+
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+        self._collector.join()
+
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in workers:
+            worker.process.join()
+            worker.conn.close()
+
+    def __enter__(self) -> 'ParserExecutor':
+        """Поддержка менеджера контекста для безопасной остановки рабочих процессов."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Остановка рабочих процессов при выходе из контекста."""
+        self.close()
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    inns = ["500100732259", "773605003662", "771412345602", "772500481155"]
+    with ParserExecutor(NpdParser, workers=2, timeout=30) as executor:
+        for inn, result in executor.map(inns):
+            print(inn, result)
+        print(executor.stats())
+
+
+if __name__ == '__main__':
+    main()
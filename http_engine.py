@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+from urllib.parse import urljoin
+
+from exceptions import FieldFormatError, ServiceUnavailableError
+
+if TYPE_CHECKING:
+    import urllib3
+
+# Общий для всех движков процесса пул keep-alive соединений (urllib3 импортируется при первом запросе)
+_http: Optional[urllib3.PoolManager] = None
+_http_lock = threading.Lock()
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_XPATH_ROOT = re.compile(r'^//\*\[@id="([^"]+)"\]')
+_XPATH_STEP = re.compile(r'^/(\w+)(?:\[(\d+)\])?')
+# Простые CSS-селекторы: составные селекторы из тега, #id, .class, [attr], [attr=v], [attr$=v],
+# :first-of-type и :nth-of-type(n), соединенные пробелом или >
+_CSS_COMBINATOR = re.compile(r"(\s*>\s*|\s+)")
+_CSS_TAG = re.compile(r"[a-zA-Z][\w-]*|\*")
+_CSS_PART = re.compile(
+    r"#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)"
+    r"|\[(?P<attr>[\w-]+)(?:(?P<op>[$^*]?=)(?:'(?P<q1>[^']*)'|\"(?P<q2>[^\"]*)\"|(?P<raw>[\w-]+)))?\]"
+    r"|:first-of-type|:nth-of-type\((?P<nth>\d+)\)"
+)
+
+
+def _pool_manager() -> urllib3.PoolManager:
+    global _http
+    if _http is None:
+        with _http_lock:
+            if _http is None:
+                import urllib3
+
+                _http = urllib3.PoolManager(num_pools=8, maxsize=8, retries=False)
+    return _http
+
+
+@dataclass(slots=True, frozen=True)
+class HttpResponse:
+    """Ответ сервера: статус, декодированное тело и заголовки Set-Cookie."""
+    status: int
+    body: str
+    cookies: tuple[str, ...] = ()
+
+
+def send_request(method: str, url: str, fields: Optional[dict[str, str]], headers: dict[str, str],
+                 timeout: int | float) -> HttpResponse:
+    """
+    Отправляет запрос через общий пул соединений (поля GET — в строке запроса, иначе — в теле
+    application/x-www-form-urlencoded).
+
+    Raises:
+        ServiceUnavailableError: Сетевая ошибка.
+    """
+    from urllib3.exceptions import HTTPError
+
+    http = _pool_manager()
+    try:
+        if fields is None or method == "GET":
+            response = http.request(method, url, fields=fields, headers=headers, timeout=timeout)
+        else:
+            response = http.request_encode_body(
+                method, url, fields=fields, headers=headers, encode_multipart=False, timeout=timeout,
+            )
+    except HTTPError:
+        raise ServiceUnavailableError
+    body = response.data.decode(_charset(response.headers.get("Content-Type", "")), errors="replace")
+    return HttpResponse(response.status, body, tuple(response.headers.getlist("Set-Cookie")))
+
+
+class EngineFallback(Exception):
+    """Ответ сайта не удалось обработать без браузера (капча или неожиданная разметка)."""
+
+
+class HtmlNode:
+    """
+    Узел упрощенного DOM-дерева, достаточного для поиска элементов по id, простым XPath и CSS-селекторам.
+    """
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict[str, str], parent: Optional['HtmlNode'] = None) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list[HtmlNode | str] = []
+        self.parent = parent
+
+    def iter(self) -> Iterator['HtmlNode']:
+        """Обходит узел и всех потомков в порядке документа."""
+        yield self
+        for child in self.children:
+            if isinstance(child, HtmlNode):
+                yield from child.iter()
+
+    def find_by_id(self, element_id: str) -> Optional['HtmlNode']:
+        """Возвращает первый узел с указанным id."""
+        return next((node for node in self.iter() if node.attrs.get("id") == element_id), None)
+
+    def xpath(self, path: str) -> Optional['HtmlNode']:
+        """
+        Находит первый узел по XPath вида //*[@id="..."]/tag/tag[n].
+
+        Raises:
+            EngineFallback: Выражение не поддерживается.
+        """
+        match = _XPATH_ROOT.match(path)
+        if not match:
+            raise EngineFallback(f"Неподдерживаемый XPath: {path}")
+        nodes = [node for node in [self.find_by_id(match.group(1))] if node is not None]
+        rest = path[match.end():]
+
+        while rest and nodes:
+            step = _XPATH_STEP.match(rest)
+            if not step:
+                raise EngineFallback(f"Неподдерживаемый XPath: {path}")
+            tag, index = step.group(1), step.group(2)
+            selected = []
+            for node in nodes:
+                children = [child for child in node.children if isinstance(child, HtmlNode) and child.tag == tag]
+                if index is None:
+                    selected.extend(children)
+                elif len(children) >= int(index):
+                    selected.append(children[int(index) - 1])
+            nodes = selected
+            rest = rest[step.end():]
+
+        return nodes[0] if nodes else None
+
+    def select(self, selector: str) -> list['HtmlNode']:
+        """
+        Находит потомков по простому CSS-селектору (см. _CSS_PART) в порядке документа.
+
+        Raises:
+            EngineFallback: Селектор не поддерживается.
+        """
+        tokens = _CSS_COMBINATOR.split(selector.strip())
+        # Нечетные элементы — комбинаторы между составными селекторами
+        combinators = [" "] + [token.strip() or " " for token in tokens[1::2]]
+        steps = [(combinator, _compile_compound(compound, selector))
+                 for combinator, compound in zip(combinators, tokens[::2])]
+        if not selector.strip():
+            raise EngineFallback(f"Неподдерживаемый CSS-селектор: {selector}")
+        return [node for node in self.iter() if node is not self and _matches(node, steps, len(steps) - 1)]
+
+    def text(self) -> str:
+        """Текст узла с нормализованными пробелами (без содержимого script и style)."""
+        parts = []
+        stack: list[HtmlNode | str] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif item.tag not in ("script", "style"):
+                stack.extend(reversed(item.children))
+        return " ".join("".join(parts).split())
+
+    def is_displayed(self) -> bool:
+        """Проверяет, не скрыт ли узел или его предки inline-стилем или атрибутом hidden."""
+        node: Optional[HtmlNode] = self
+        while node is not None:
+            style = node.attrs.get("style", "").replace(" ", "").lower()
+            if "display:none" in style or "visibility:hidden" in style or "hidden" in node.attrs:
+                return False
+            node = node.parent
+        return True
+
+
+def _compile_compound(compound: str, selector: str) -> Callable[[HtmlNode], bool]:
+    """Возвращает проверку узла на соответствие составному селектору."""
+    tag_match = _CSS_TAG.match(compound)
+    tag = tag_match.group() if tag_match else "*"
+    position = tag_match.end() if tag_match else 0
+    tests: list[Callable[[HtmlNode], bool]] = []
+    while position < len(compound):
+        part = _CSS_PART.match(compound, position)
+        if not part:
+            raise EngineFallback(f"Неподдерживаемый CSS-селектор: {selector}")
+        position = part.end()
+        if part.group("id"):
+            tests.append(lambda node, value=part.group("id"): node.attrs.get("id") == value)
+        elif part.group("cls"):
+            tests.append(lambda node, value=part.group("cls"): value in node.attrs.get("class", "").split())
+        elif part.group("attr"):
+            name, op = part.group("attr"), part.group("op")
+            value = next((group for group in part.group("q1", "q2", "raw") if group is not None), "")
+            compare = {
+                None: lambda actual: True,
+                "=": lambda actual, value=value: actual == value,
+                "^=": lambda actual, value=value: actual.startswith(value),
+                "$=": lambda actual, value=value: actual.endswith(value),
+                "*=": lambda actual, value=value: value in actual,
+            }[op]
+            tests.append(lambda node, name=name, compare=compare: name in node.attrs and compare(node.attrs[name]))
+        else:
+            nth = int(part.group("nth") or 1)
+            tests.append(lambda node, nth=nth: _position_of_type(node) == nth)
+    if tag != "*":
+        tests.insert(0, lambda node, tag=tag.lower(): node.tag == tag)
+    return lambda node: all(test(node) for test in tests)
+
+
+def _position_of_type(node: HtmlNode) -> int:
+    """Номер узла среди соседей с тем же тегом (с 1)."""
+    if node.parent is None:
+        return 1
+    siblings = [child for child in node.parent.children if isinstance(child, HtmlNode) and child.tag == node.tag]
+    return siblings.index(node) + 1
+
+
+def _matches(node: HtmlNode, steps: list[tuple[str, Callable[[HtmlNode], bool]]], index: int) -> bool:
+    """Проверяет узел по шагу index селектора и предков по предыдущим шагам (справа налево)."""
+    combinator, test = steps[index]
+    if not test(node):
+        return False
+    if index == 0:
+        return True
+    if combinator == ">":
+        return node.parent is not None and _matches(node.parent, steps, index - 1)
+    ancestor = node.parent
+    while ancestor is not None:
+        if _matches(ancestor, steps, index - 1):
+            return True
+        ancestor = ancestor.parent
+    return False
+
+
+class _TreeBuilder(HTMLParser):
+    """Строит упрощенное DOM-дерево из HTML."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = HtmlNode("#document", {})
+        self._current = self.root
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        node = HtmlNode(tag, {name: value or "" for name, value in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._current = node
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        self._current.children.append(HtmlNode(tag, {name: value or "" for name, value in attrs}, self._current))
+
+    def handle_endtag(self, tag: str) -> None:
+        node = self._current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self._current = node.parent
+
+    def handle_data(self, data: str) -> None:
+        self._current.children.append(data)
+
+
+def parse_html(html: str) -> HtmlNode:
+    """Разбирает HTML в упрощенное DOM-дерево."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+class HttpEngine:
+    """
+    Базовый движок, воспроизводящий запросы формы без браузера через общий пул keep-alive соединений.
+    Каждый экземпляр хранит собственные cookies.
+    """
+
+    def __init__(self, url: str, timeout: int | float, user_agent: Optional[str] = None) -> None:
+        """
+        Args:
+            url (str): URL страницы формы.
+            timeout (int | float): Таймаут HTTP-запросов (в секундах).
+            user_agent (Optional[str]): Пользовательский агент запросов.
+        """
+        self.url = url
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.cookies: dict[str, str] = {}
+        # Отправка запроса (заменяется при записи и воспроизведении, см. replay.py)
+        self.transport: Callable[..., HttpResponse] = send_request
+
+    def _request(self, method: str, url: str, fields: Optional[dict[str, str]] = None,
+                 headers: Optional[dict[str, str]] = None) -> str:
+        """
+        Выполняет запрос с cookies сессии и возвращает тело ответа.
+
+        Raises:
+            ServiceUnavailableError: Сетевая ошибка или ответ 5xx.
+            EngineFallback: Неожиданный статус ответа.
+        """
+        request_headers = {"Accept-Language": "ru-RU,ru;q=0.9"}
+        if self.user_agent:
+            request_headers["User-Agent"] = self.user_agent
+        if self.cookies:
+            request_headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        request_headers.update(headers or {})
+
+        response = self.transport(method, url, fields, request_headers, self.timeout)
+        for header in response.cookies:
+            cookie = SimpleCookie()
+            cookie.load(header)
+            self.cookies.update({name: morsel.value for name, morsel in cookie.items()})
+
+        if response.status >= 500:
+            raise ServiceUnavailableError
+        if response.status != 200:
+            raise EngineFallback(f"HTTP {response.status}")
+        return response.body
+
+    @staticmethod
+    def _check_captcha(body: str) -> None:
+        """Переключает на браузер, если в ответе есть капча."""
+        if "captcha" in body.lower():
+            raise EngineFallback("Капча")
+
+
+def _charset(content_type: str) -> str:
+    """Извлекает кодировку из заголовка Content-Type."""
+    match = re.search(r"charset=([\w-]+)", content_type)
+    return match.group(1) if match else "utf-8"
+
+
+def _form_fields(form: HtmlNode) -> dict[str, str]:
+    """Собирает скрытые поля формы (в том числе __VIEWSTATE и __EVENTVALIDATION)."""
+    return {
+        node.attrs["name"]: node.attrs.get("value", "")
+        for node in form.iter()
+        if node.tag == "input" and node.attrs.get("type", "").lower() == "hidden" and "name" in node.attrs
+    }
+
+
+class NpdHttpEngine(HttpEngine):
+    """
+    Движок проверки статуса самозанятости без браузера: воспроизводит ASP.NET postback формы
+    npd.nalog.ru/check-status с __VIEWSTATE страницы.
+    """
+    INN_ID = "ctl00_ctl00_tbINN"
+    DATE_ID = "ctl00_ctl00_tbDate"
+    SUBMIT_ID = "ctl00_ctl00_btSend"
+    VALIDATOR_IDS = (
+        "ctl00_ctl00_RequiredFieldValidator1", "ctl00_ctl00_cv_Inn",
+        "ctl00_ctl00_RequiredFieldValidator2", "ctl00_ctl00_CustomValidator1",
+    )
+    RESULT_XPATH = '//*[@id="content"]/div/div/div[1]/div[5]'
+
+    def get_result_text(self, inn: str, current_date: str) -> str:
+        """
+        Отправляет форму и возвращает текст блока результата (как NpdParser._get_result_text).
+
+        Raises:
+            FieldFormatError: Сервер отклонил формат полей.
+            ServiceUnavailableError: Сервис недоступен.
+            EngineFallback: Капча или неожиданная разметка.
+        """
+        page = self._request("GET", self.url)
+        self._check_captcha(page)
+        document = parse_html(page)
+
+        inn_field = document.find_by_id(self.INN_ID)
+        date_field = document.find_by_id(self.DATE_ID)
+        submit = document.find_by_id(self.SUBMIT_ID)
+        form = _closest(inn_field, "form")
+        if inn_field is None or date_field is None or submit is None or form is None:
+            raise EngineFallback("Форма не найдена")
+
+        fields = _form_fields(form)
+        fields[inn_field.attrs["name"]] = inn
+        fields[date_field.attrs["name"]] = current_date
+        fields[submit.attrs["name"]] = submit.attrs.get("value", "")
+
+        response = self._request(
+            "POST", urljoin(self.url, form.attrs.get("action", "")), fields,
+            headers={"Referer": self.url},
+        )
+        self._check_captcha(response)
+        result_document = parse_html(response)
+
+        for validator_id in self.VALIDATOR_IDS:
+            validator = result_document.find_by_id(validator_id)
+            if validator is not None and validator.is_displayed() and validator.text():
+                raise FieldFormatError("Ошибка в формате введенных данных.")
+
+        result = result_document.xpath(self.RESULT_XPATH)
+        if result is None:
+            raise EngineFallback("Блок результата не найден")
+        return result.text()
+
+
+class RomHttpEngine(HttpEngine):
+    """
+    Движок поиска в реестре обеспечительных мер без браузера: отправляет форму поиска на адрес
+    из атрибута action страницы и разбирает JSON- или HTML-ответ.
+    """
+    QUERY_ID = "query"
+    JSON_ROWS_KEYS = ("rows", "data", "items")
+
+    def search(self, inn: str) -> bool:
+        """
+        Выполняет поиск по ИНН.
+
+        Returns:
+            bool: True — данные найдены, False — данные не найдены.
+        Raises:
+            FieldFormatError: Сервер отклонил формат полей.
+            ServiceUnavailableError: Сервис недоступен.
+            EngineFallback: Капча или неожиданный ответ.
+        """
+        page = self._request("GET", self.url)
+        document = parse_html(page)
+        query = document.find_by_id(self.QUERY_ID)
+        form = _closest(query, "form")
+        if query is None or form is None or not form.attrs.get("action"):
+            raise EngineFallback("Форма поиска не найдена")
+
+        fields = _form_fields(form)
+        fields[query.attrs.get("name", self.QUERY_ID)] = inn
+        response = self._request(
+            form.attrs.get("method", "post").upper(), urljoin(self.url, form.attrs["action"]), fields,
+            headers={"Referer": self.url, "X-Requested-With": "XMLHttpRequest"},
+        )
+
+        try:
+            payload = json.loads(response)
+        except ValueError:
+            return self._analyze_html(response)
+        return self._analyze_json(payload)
+
+    def _analyze_json(self, payload: Any) -> bool:
+        """Разбирает JSON-ответ сервиса."""
+        if not isinstance(payload, dict):
+            raise EngineFallback("Неожиданный JSON")
+        if payload.get("captchaRequired"):
+            raise EngineFallback("Капча")
+        errors = payload.get("ERRORS")
+        if errors:
+            if any("captcha" in str(key).lower() for key in errors):
+                raise EngineFallback("Капча")
+            raise FieldFormatError
+        for key in self.JSON_ROWS_KEYS:
+            if isinstance(payload.get(key), list):
+                return bool(payload[key])
+        raise EngineFallback("Неожиданный JSON")
+
+    def _analyze_html(self, html: str) -> bool:
+        """Разбирает HTML-ответ по панелям pnlNoData/pnlData, как RomParser.resolve()."""
+        self._check_captcha(html)
+        document = parse_html(html)
+        errors = [node for node in document.iter() if "field-errors" in node.attrs.get("class", "").split()]
+        if any(node.is_displayed() for node in errors):
+            raise FieldFormatError
+
+        no_data = document.find_by_id("pnlNoData")
+        data = document.find_by_id("pnlData")
+        if no_data is not None and no_data.is_displayed():
+            return False
+        if data is not None and data.is_displayed():
+            return True
+        raise EngineFallback("Панель результата не найдена")
+
+
+def _closest(node: Optional[HtmlNode], tag: str) -> Optional[HtmlNode]:
+    """Возвращает ближайшего предка узла с указанным тегом."""
+    while node is not None and node.tag != tag:
+        node = node.parent
+    return node
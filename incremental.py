@@ -0,0 +1,457 @@
+"""
+Инкрементальная перепроверка портфеля ИНН: повторно запрашиваются только ИНН, статус которых устарел
+или, судя по истории, вероятно изменился.
+
+    python -m incremental run --parser npd --engine http --input portfolio.csv --history npd.sqlite3 --diff changes.jsonl
+    python -m incremental stats --history npd.sqlite3
+
+StatusHistory хранит последний наблюдаемый статус каждого ИНН по каждому парсеру, число проверок
+и изменений и журнал изменений. RecheckPolicy оценивает частоту изменений статуса ИНН по истории
+(для ИНН без изменений — по априорной частоте) и перепроверяет ИНН, если вероятность изменения с
+последней проверки достигла порога; чаще min_age ИНН не проверяется, реже max_age — тоже. В файл
+изменений дописываются только новые ИНН и ИНН с изменившимся статусом или значением.
+
+Наблюдением считаются статусы OBSERVED_STATUSES. Капча, недоступность сервиса и прочие неудачи не
+меняют историю: ИНН останется к перепроверке и в следующем запуске.
+"""
+import argparse
+import json
+import math
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, TextIO
+
+from exceptions import FieldFormatError
+from results import Status, status_of
+from validation import validate_arguments
+
+DAY = 24 * 60 * 60
+
+# Статусы, описывающие состояние ИНН на сайте и сохраняемые в истории
+OBSERVED_STATUSES = frozenset({Status.OK, Status.NOT_FOUND, Status.UNVERIFIED, Status.INVALID_INPUT})
+
+
+@dataclass(slots=True, frozen=True)
+class RecheckPolicy:
+    """
+    Правило выбора ИНН для перепроверки. Частота изменений статуса оценивается как
+    (изменений + 1) / (период наблюдений + prior_days), вероятность изменения за время с последней
+    проверки — как 1 - exp(-частота * возраст).
+    """
+    min_age: float = 12 * 60 * 60   # Не перепроверять чаще (с)
+    max_age: float = 30 * DAY       # Перепроверять не реже (с)
+    threshold: float = 0.1          # Порог вероятности изменения
+    prior_days: float = 90.0        # Априорно одно изменение за prior_days дней
+
+    def change_rate(self, subject: dict[str, Any]) -> float:
+        """Оценка частоты изменений статуса ИНН (изменений в секунду)."""
+        observed = max(subject["checked_at"] - subject["first_checked"], 0.0)
+        return (subject["changes"] + 1) / (observed + self.prior_days * DAY)
+
+    def score(self, subject: Optional[dict[str, Any]], now: float) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: Вероятность изменения статуса, если ИНН пора перепроверять (новые ИНН и
+            ИНН старше max_age — 1.0), иначе None.
+        """
+        if subject is None:
+            return 1.0
+        age = now - subject["checked_at"]
+        if age >= self.max_age:
+            return 1.0
+        if age < self.min_age:
+            return None
+        probability = 1.0 - math.exp(-self.change_rate(subject) * age)
+        return probability if probability >= self.threshold else None
+
+
+def default_min_age(parser_cls: type) -> float:
+    """
+    min_age по-умолчанию — половина CACHE_TTL парсера. Запуск с периодом CACHE_TTL (например, ночная
+    перепроверка NPD) застает ИНН прошлого запуска чуть моложе CACHE_TTL: они проверены позже его
+    начала, и при min_age, равном CACHE_TTL, перепроверялись бы только через запуск.
+    """
+    return parser_cls.CACHE_TTL / 2
+
+
+class StatusHistory:
+    """
+    История статусов в файле SQLite (режим WAL): последний наблюдаемый статус по парсеру и ключу
+    входных данных (cli.item_key), журнал изменений и итоги запусков.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS subjects ("
+            "parser TEXT NOT NULL, key TEXT NOT NULL, input TEXT NOT NULL, status TEXT NOT NULL, value TEXT, "
+            "first_checked REAL NOT NULL, checked_at REAL NOT NULL, changed_at REAL NOT NULL, "
+            "checks INTEGER NOT NULL, changes INTEGER NOT NULL, PRIMARY KEY (parser, key))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            "parser TEXT NOT NULL, key TEXT NOT NULL, changed_at REAL NOT NULL, "
+            "old_status TEXT, old_value TEXT, status TEXT NOT NULL, value TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS changes_subject ON changes (parser, key, changed_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "parser TEXT NOT NULL, started_at REAL NOT NULL, finished_at REAL NOT NULL, total INTEGER NOT NULL, "
+            "checked INTEGER NOT NULL, saved INTEGER NOT NULL, changed INTEGER NOT NULL, failed INTEGER NOT NULL)"
+        )
+
+    @staticmethod
+    def _subject(row: Optional[sqlite3.Row]) -> Optional[dict[str, Any]]:
+        if row is None:
+            return None
+        subject = dict(row)
+        subject["input"] = json.loads(subject["input"])
+        subject["value"] = json.loads(subject["value"])
+        return subject
+
+    def get(self, parser: str, key: str) -> Optional[dict[str, Any]]:
+        """Возвращает запись ИНН (input, status, value, first_checked, checked_at, changed_at, checks, changes)."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM subjects WHERE parser = ? AND key = ?", (parser, key)).fetchone()
+        return self._subject(row)
+
+    def observe(
+            self, parser: str, key: str, item: dict[str, Any], status: Status, value: Any,
+            at: Optional[float] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Сохраняет наблюдение статуса.
+
+        Returns:
+            Optional[dict[str, Any]]: Предыдущая запись ИНН, если статус или значение изменились
+            ({} для нового ИНН), иначе None.
+        """
+        at = time.time() if at is None else at
+        encoded = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM subjects WHERE parser = ? AND key = ?", (parser, key)
+                ).fetchone()
+                if row is None:
+                    self._db.execute(
+                        "INSERT INTO subjects VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, 0)",
+                        (parser, key, json.dumps(item, ensure_ascii=False), status.value, encoded, at, at, at),
+                    )
+                    previous = {}
+                elif row["status"] == status.value and row["value"] == encoded:
+                    self._db.execute(
+                        "UPDATE subjects SET checked_at = ?, checks = checks + 1 WHERE parser = ? AND key = ?",
+                        (at, parser, key),
+                    )
+                    previous = None
+                else:
+                    self._db.execute(
+                        "UPDATE subjects SET status = ?, value = ?, checked_at = ?, changed_at = ?, "
+                        "checks = checks + 1, changes = changes + 1 WHERE parser = ? AND key = ?",
+                        (status.value, encoded, at, at, parser, key),
+                    )
+                    self._db.execute(
+                        "INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (parser, key, at, row["status"], row["value"], status.value, encoded),
+                    )
+                    previous = self._subject(row)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return previous
+
+    def changes(self, parser: str, key: str) -> list[dict[str, Any]]:
+        """Журнал изменений статуса ИНН: changed_at, old_status, old_value, status, value."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT changed_at, old_status, old_value, status, value FROM changes "
+                "WHERE parser = ? AND key = ? ORDER BY changed_at", (parser, key)
+            ).fetchall()
+        return [{**dict(row), "old_value": json.loads(row["old_value"]), "value": json.loads(row["value"])}
+                for row in rows]
+
+    def record_run(self, parser: str, report: dict[str, Any]) -> None:
+        """Сохраняет итоги запуска IncrementalChecker.run."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (parser, report["started_at"], report["finished_at"], report["total"], report["checked"],
+                 report["saved"], report["changed"], report["failed"]),
+            )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns:
+            dict[str, dict[str, Any]]: По парсерам: subjects (ИНН в истории), statuses, changes
+            (изменений за все время), runs, lookups (выполнено запросов), saved (сэкономлено запросов).
+        """
+        stats: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            for parser, status, count, changes in self._db.execute(
+                    "SELECT parser, status, COUNT(*), SUM(changes) FROM subjects GROUP BY parser, status"):
+                entry = stats.setdefault(parser, {"subjects": 0, "statuses": {}, "changes": 0,
+                                                  "runs": 0, "lookups": 0, "saved": 0})
+                entry["subjects"] += count
+                entry["statuses"][status] = count
+                entry["changes"] += changes
+            for parser, runs, lookups, saved in self._db.execute(
+                    "SELECT parser, COUNT(*), SUM(checked + failed), SUM(saved) FROM runs GROUP BY parser"):
+                entry = stats.setdefault(parser, {"subjects": 0, "statuses": {}, "changes": 0,
+                                                  "runs": 0, "lookups": 0, "saved": 0})
+                entry.update(runs=runs, lookups=lookups, saved=saved)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> 'StatusHistory':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class IncrementalChecker:
+    """
+    Инкрементальная перепроверка портфеля одним классом парсера: выбор ИНН по RecheckPolicy,
+    выполнение запросов через переданную функцию submit и запись изменений.
+    """
+
+    def __init__(
+            self,
+            history: StatusHistory,
+            parser_cls: type,
+            policy: Optional[RecheckPolicy] = None,
+    ) -> None:
+        """
+        Args:
+            history (StatusHistory): История статусов.
+            parser_cls (type): Класс парсера (ключ истории — имя класса).
+            policy (Optional[RecheckPolicy]): Правило перепроверки (по-умолчанию min_age —
+                default_min_age(parser_cls)).
+        """
+        self.history = history
+        self.parser_cls = parser_cls
+        self.parser = parser_cls.__name__
+        self.policy = policy or RecheckPolicy(min_age=default_min_age(parser_cls))
+
+    def plan(
+            self, items: Iterable[dict[str, Any]], now: Optional[float] = None, budget: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        Выбирает ИНН для перепроверки. Входные данные проверяются validate_arguments, повторы отбрасываются.
+
+        Args:
+            items (Iterable[dict[str, Any]]): Именованные аргументы parse().
+            now (Optional[float]): Время планирования (по-умолчанию текущее).
+            budget (Optional[int]): Наибольшее число запросов: при превышении выбираются ИНН с
+                наибольшей вероятностью изменения, остальные откладываются.
+        Returns:
+            dict[str, Any]: due (список (ключ, аргументы) в порядке убывания вероятности изменения),
+            total (уникальных корректных ИНН), fresh (не требуют проверки), deferred (отложены
+            бюджетом), invalid (список (ключ, аргументы, ошибка)), duplicates.
+        """
+        from cli import item_key
+
+        now = time.time() if now is None else now
+        due: list[tuple[float, int, str, dict[str, Any]]] = []
+        invalid: list[tuple[str, dict[str, Any], FieldFormatError]] = []
+        seen: set[str] = set()
+        total = fresh = duplicates = 0
+        for item in items:
+            try:
+                item = validate_arguments(item, self.parser_cls.INN_LENGTHS)
+            except FieldFormatError as ex:
+                invalid.append((item_key(item), item, ex))
+                continue
+            key = item_key(item)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            total += 1
+            score = self.policy.score(self.history.get(self.parser, key), now)
+            if score is None:
+                fresh += 1
+            else:
+                due.append((-score, len(due), key, item))
+        due.sort()
+        deferred = max(len(due) - budget, 0) if budget is not None else 0
+        return {
+            "due": [(key, item) for _, _, key, item in due[:len(due) - deferred]],
+            "total": total, "fresh": fresh, "deferred": deferred, "invalid": invalid, "duplicates": duplicates,
+        }
+
+    def record(self, key: str, item: dict[str, Any], future: Future) -> Optional[dict[str, Any]]:
+        """
+        Сохраняет результат запроса в истории.
+
+        Returns:
+            Optional[dict[str, Any]]: Запись изменения для файла изменений или None (статус не изменился
+            или проверка не удалась).
+        """
+        error = future.exception()
+        status = status_of(type(error) if error is not None else None)
+        if status not in OBSERVED_STATUSES:
+            return None
+        value = future.result() if error is None else None
+        at = time.time()
+        previous = self.history.observe(self.parser, key, item, status, value, at)
+        if previous is None:
+            return None
+        return {
+            "key": key, "input": item, "status": status.value, "result": value, "checked_at": at,
+            "previous": {"status": previous["status"], "result": previous["value"],
+                         "checked_at": previous["checked_at"]} if previous else None,
+        }
+
+    def run(
+            self,
+            items: Iterable[dict[str, Any]],
+            submit: Callable[..., Future],
+            diff: Optional[TextIO] = None,
+            budget: Optional[int] = None,
+            in_flight: int = 16,
+    ) -> dict[str, Any]:
+        """
+        Перепроверяет ИНН, которые пора проверять, и дописывает изменения в diff (JSONL).
+
+        Args:
+            items (Iterable[dict[str, Any]]): Именованные аргументы parse() портфеля.
+            submit (Callable[..., Future]): Функция постановки запроса с аргументами parse(), например
+                ParserExecutor.submit или functools.partial(PriorityScheduler.submit, NpdParser, lane=Lane.BULK).
+            diff (Optional[TextIO]): Файл изменений (только новые и изменившиеся статусы).
+            budget (Optional[int]): Наибольшее число запросов (см. plan).
+            in_flight (int): Наибольшее число одновременно поставленных запросов.
+        Returns:
+            dict[str, Any]: Итоги запуска: total, checked, failed (неудачные проверки), changed (в том
+            числе new — впервые проверенные), saved (сэкономлено запросов против полной перепроверки),
+            deferred, invalid, duplicates, statuses, started_at, finished_at.
+        """
+        started_at = time.time()
+        plan = self.plan(items, started_at, budget)
+        report = {
+            "total": plan["total"], "checked": 0, "failed": 0, "changed": 0, "new": 0,
+            "saved": plan["fresh"] + plan["deferred"], "deferred": plan["deferred"],
+            "invalid": len(plan["invalid"]), "duplicates": plan["duplicates"], "statuses": {},
+        }
+        pending: deque[tuple[str, dict[str, Any], Future]] = deque()
+
+        def finish_next() -> None:
+            key, item, future = pending.popleft()
+            error = future.exception()
+            status = status_of(type(error) if error is not None else None)
+            report["statuses"][status.value] = report["statuses"].get(status.value, 0) + 1
+            if status not in OBSERVED_STATUSES:
+                report["failed"] += 1
+                return
+            change = self.record(key, item, future)
+            report["checked"] += 1
+            if change is None:
+                return
+            report["changed"] += 1
+            report["new"] += change["previous"] is None
+            if diff is not None:
+                diff.write(json.dumps(change, ensure_ascii=False, default=str) + "\n")
+                diff.flush()
+
+        for key, item in plan["due"]:
+            pending.append((key, item, submit(**item)))
+            if len(pending) >= in_flight:
+                finish_next()
+        while pending:
+            finish_next()
+
+        report["finished_at"] = time.time()
+        report["started_at"] = started_at
+        self.history.record_run(self.parser, report)
+        return report
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Перепроверяет портфель из входного файла и дописывает изменения в файл изменений."""
+    from cli import engine_arguments, load_parser, make_item, open_output, parse_arguments, read_rows
+    from executor import ParserExecutor
+
+    parser_cls = load_parser(args.parser)
+    arguments = parse_arguments(parser_cls)
+    policy = RecheckPolicy(
+        min_age=args.min_age * 60 * 60 if args.min_age is not None else default_min_age(parser_cls),
+        max_age=args.max_age * DAY,
+        threshold=args.threshold,
+        prior_days=args.prior_days,
+    )
+    parser_kwargs = engine_arguments(parser_cls, args.engine)
+    items = (make_item(row, arguments, args.column) for row in read_rows(args.input))
+
+    with StatusHistory(args.history) as history, open_output(args.diff) as diff, \
+            ParserExecutor(parser_cls, workers=args.workers, timeout=args.timeout,
+                           headless=args.headless, **parser_kwargs) as executor:
+        checker = IncrementalChecker(history, parser_cls, policy)
+        report = checker.run(items, executor.submit, diff, budget=args.budget, in_flight=args.workers * 2)
+
+    lookups = report["checked"] + report["failed"]
+    print(
+        f"ИНН {report['total']}: проверено {lookups}, сэкономлено запросов {report['saved']} "
+        f"({report['saved'] / report['total'] * 100 if report['total'] else 0.0:.1f}%), "
+        f"изменилось {report['changed']} (новых {report['new']}), неудачных проверок {report['failed']}, "
+        f"отложено {report['deferred']}, неверный формат {report['invalid']}, статусы {report['statuses']}",
+        file=sys.stderr, flush=True,
+    )
+    return report
+
+
+def main():
+    from cli import PARSERS, engine_arguments, load_parser
+
+    argparser = argparse.ArgumentParser(prog="python -m incremental", description="Инкрементальная перепроверка ИНН")
+    commands = argparser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Перепроверить ИНН, статус которых устарел")
+    run_parser.add_argument("--parser", required=True,
+                            help=f"{', '.join(PARSERS)} или путь к классу вида модуль:Класс")
+    run_parser.add_argument("--input", required=True, help="CSV с заголовком или JSONL")
+    run_parser.add_argument("--history", required=True, help="Файл истории статусов SQLite")
+    run_parser.add_argument("--diff", required=True, help="JSONL изменений статусов (дописывается)")
+    run_parser.add_argument("--workers", default=1, type=int, help="Количество рабочих процессов")
+    run_parser.add_argument("--column", help="Колонка входа для парсеров с одним аргументом")
+    run_parser.add_argument("--engine", choices=("selenium", "http"), help="Движок NpdParser и RomParser")
+    run_parser.add_argument("--timeout", default=30, type=float, help="Таймаут ожидания элементов (с)")
+    run_parser.add_argument("--no-headless", dest="headless", action="store_false")
+    run_parser.add_argument("--budget", type=int, help="Наибольшее число запросов за запуск")
+    run_parser.add_argument("--min-age", type=float,
+                            help="Не перепроверять чаще, ч (по-умолчанию половина CACHE_TTL парсера)")
+    run_parser.add_argument("--max-age", default=30.0, type=float, help="Перепроверять не реже, дней")
+    run_parser.add_argument("--threshold", default=0.1, type=float, help="Порог вероятности изменения статуса")
+    run_parser.add_argument("--prior-days", default=90.0, type=float,
+                            help="Априорная частота: одно изменение за столько дней")
+
+    stats_parser = commands.add_parser("stats", help="Статистика истории статусов")
+    stats_parser.add_argument("--history", required=True, help="Файл истории статусов SQLite")
+
+    args = argparser.parse_args()
+    if args.command == "run":
+        try:
+            engine_arguments(load_parser(args.parser), args.engine)
+        except ValueError as ex:
+            argparser.error(str(ex))
+        run(args)
+    else:
+        with StatusHistory(args.history) as history:
+            print(json.dumps(history.stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,655 @@
+"""
+Распределенная очередь заданий: рабочие на разных машинах забирают задания из общего хранилища.
+
+    python -m jobqueue --backend redis://queue-host:6379/0 --parser npd submit --input inns.csv
+    python -m jobqueue --backend redis://queue-host:6379/0 --parser npd work --engine http
+    python -m jobqueue --backend redis://queue-host:6379/0 --parser npd results --output results.jsonl
+
+Задание резервируется рабочим на время visibility_timeout и подтверждается (ack) вместе с результатом.
+Если рабочий умер, резерв истекает и задание снова становится доступным. Временные ошибки
+(ratelimit.RETRYABLE_ERRORS) возвращаются в очередь с экспоненциальной задержкой, пока не исчерпано
+max_attempts. Идентификатор задания строится из нормализованных входных данных, поэтому повторная
+отправка того же файла не создает дубликатов.
+
+Хранилища: SqliteQueue (один файл — для тестов и одной машины) и RedisQueue (любой клиент
+с интерфейсом redis-py и поддержкой EVAL; LocalRedis — заменитель в памяти процесса для тестов).
+Часы рабочих должны быть синхронизированы (NTP): сроки резерва сравниваются с их локальным временем.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from exceptions import FieldFormatError
+from results import ParseResult, Status, status_of
+from validation import validate_arguments
+
+
+@dataclass(slots=True, frozen=True)
+class Job:
+    """
+    Зарезервированное задание: идентификатор, очередь (имя парсера), аргументы parse(), номер попытки
+    (с единицы, считаются резервирования) и токен резерва, без которого ack/retry не принимаются.
+    """
+    id: str
+    queue: str
+    arguments: dict[str, Any]
+    attempt: int
+    lease: str
+
+
+class QueueBackend(ABC):
+    """Хранилище заданий и результатов."""
+
+    @abstractmethod
+    def put(self, queue: str, job_id: str, arguments: dict[str, Any], delay: float = 0.0) -> bool:
+        """
+        Добавляет задание, если задания с таким идентификатором еще нет.
+
+        Returns:
+            bool: True, если задание добавлено.
+        """
+
+    @abstractmethod
+    def reserve(self, queue: str, visibility_timeout: float) -> Optional[Job]:
+        """Резервирует первое доступное задание на visibility_timeout секунд или возвращает None."""
+
+    @abstractmethod
+    def ack(self, job: Job, result: ParseResult) -> bool:
+        """
+        Сохраняет результат и удаляет задание из очереди.
+
+        Returns:
+            bool: False, если резерв уже истек и задание взял другой рабочий (результат не сохраняется).
+        """
+
+    @abstractmethod
+    def retry(self, job: Job, delay: float) -> bool:
+        """
+        Снимает резерв и возвращает задание в очередь через delay секунд.
+
+        Returns:
+            bool: False, если резерв уже истек.
+        """
+
+    @abstractmethod
+    def results(self, queue: str) -> Iterator[tuple[str, ParseResult]]:
+        """Возвращает (идентификатор задания, результат) выполненных заданий очереди."""
+
+    @abstractmethod
+    def stats(self, queue: str) -> dict[str, int]:
+        """
+        Returns:
+            dict[str, int]: ready (доступны сейчас), delayed (отложены или зарезервированы), done.
+        """
+
+    def close(self) -> None:
+        """Закрывает соединение с хранилищем."""
+
+
+class SqliteQueue(QueueBackend):
+    """
+    Очередь в файле SQLite (режим WAL). Подходит для тестов и рабочих одной машины: резервирование
+    выполняется в транзакции BEGIN IMMEDIATE, поэтому задание достается одному процессу.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "queue TEXT NOT NULL, id TEXT NOT NULL, arguments TEXT NOT NULL, available REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, lease TEXT, result TEXT, PRIMARY KEY (queue, id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (queue, available) WHERE result IS NULL")
+
+    def put(self, queue: str, job_id: str, arguments: dict[str, Any], delay: float = 0.0) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO jobs (id, queue, arguments, available) VALUES (?, ?, ?, ?)",
+                (job_id, queue, json.dumps(arguments, ensure_ascii=False), time.time() + delay),
+            )
+            return cursor.rowcount == 1
+
+    def reserve(self, queue: str, visibility_timeout: float) -> Optional[Job]:
+        now = time.time()
+        lease = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "UPDATE jobs SET available = ?, attempts = attempts + 1, lease = ? WHERE queue = ? AND id = ("
+                    "SELECT id FROM jobs WHERE queue = ? AND result IS NULL AND available <= ? "
+                    "ORDER BY available LIMIT 1) RETURNING id, arguments, attempts",
+                    (now + visibility_timeout, lease, queue, queue, now),
+                ).fetchone()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return Job(row[0], queue, json.loads(row[1]), row[2], lease)
+
+    def ack(self, job: Job, result: ParseResult) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET result = ?, lease = NULL WHERE queue = ? AND id = ? AND lease = ? AND result IS NULL",
+                (json.dumps(result.to_dict(), ensure_ascii=False, default=str), job.queue, job.id, job.lease),
+            )
+            return cursor.rowcount == 1
+
+    def retry(self, job: Job, delay: float) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET available = ?, lease = NULL WHERE queue = ? AND id = ? AND lease = ? AND result IS NULL",
+                (time.time() + delay, job.queue, job.id, job.lease),
+            )
+            return cursor.rowcount == 1
+
+    def results(self, queue: str) -> Iterator[tuple[str, ParseResult]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, result FROM jobs WHERE queue = ? AND result IS NOT NULL ORDER BY id", (queue,)
+            ).fetchall()
+        for job_id, result in rows:
+            yield job_id, ParseResult.from_dict(json.loads(result))
+
+    def stats(self, queue: str) -> dict[str, int]:
+        with self._lock:
+            ready, delayed, done = self._db.execute(
+                "SELECT COALESCE(SUM(result IS NULL AND available <= ?), 0), "
+                "COALESCE(SUM(result IS NULL AND available > ?), 0), COUNT(result) FROM jobs WHERE queue = ?",
+                (time.time(), time.time(), queue),
+            ).fetchone()
+        return {"ready": ready, "delayed": delayed, "done": done}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# Скрипты RedisQueue. Ключи очереди: {prefix}:{{queue}}:ready — ZSET (задание -> время доступности),
+# :args, :attempts, :lease, :results — HASH по идентификатору задания.
+_REDIS_PUT = """
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 1 or redis.call('HEXISTS', KEYS[3], ARGV[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+_REDIS_RESERVE = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+if #ids == 0 then
+    return false
+end
+local id = ids[1]
+redis.call('ZADD', KEYS[1], ARGV[2], id)
+redis.call('HSET', KEYS[4], id, ARGV[3])
+local attempts = redis.call('HINCRBY', KEYS[3], id, 1)
+return {id, redis.call('HGET', KEYS[2], id), attempts}
+"""
+
+_REDIS_ACK = """
+if redis.call('HGET', KEYS[4], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('HSET', KEYS[5], ARGV[1], ARGV[3])
+return 1
+"""
+
+_REDIS_RETRY = """
+if redis.call('HGET', KEYS[4], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+
+class RedisQueue(QueueBackend):
+    """
+    Очередь в Redis (или совместимом сервере). Каждая операция — один Lua-скрипт, поэтому резерв,
+    подтверждение и возврат атомарны при любом числе рабочих. Резерв — это перенос времени доступности
+    задания на now + visibility_timeout: если рабочий умер, задание снова попадает в выборку.
+    """
+
+    def __init__(self, client: Any, prefix: str = "nalog") -> None:
+        """
+        Args:
+            client (Any): Клиент с интерфейсом redis-py (redis.Redis или заменитель для тестов).
+            prefix (str): Префикс ключей.
+        """
+        self.client = client
+        self.prefix = prefix
+        self._put = client.register_script(_REDIS_PUT)
+        self._reserve = client.register_script(_REDIS_RESERVE)
+        self._ack = client.register_script(_REDIS_ACK)
+        self._retry = client.register_script(_REDIS_RETRY)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "nalog") -> 'RedisQueue':
+        """Подключается к серверу по URL вида redis://host:port/db (нужен пакет redis)."""
+        import redis
+
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def _keys(self, queue: str) -> list[str]:
+        # Имя очереди в фигурных скобках — ключи очереди попадают в один слот Redis Cluster
+        base = f"{self.prefix}:{{{queue}}}"
+        return [f"{base}:ready", f"{base}:args", f"{base}:attempts", f"{base}:lease", f"{base}:results"]
+
+    def put(self, queue: str, job_id: str, arguments: dict[str, Any], delay: float = 0.0) -> bool:
+        keys = self._keys(queue)
+        return bool(self._put(
+            keys=[keys[0], keys[1], keys[4]],
+            args=[job_id, json.dumps(arguments, ensure_ascii=False), time.time() + delay],
+        ))
+
+    def reserve(self, queue: str, visibility_timeout: float) -> Optional[Job]:
+        now = time.time()
+        lease = uuid.uuid4().hex
+        reply = self._reserve(keys=self._keys(queue)[:4], args=[now, now + visibility_timeout, lease])
+        if not reply:
+            return None
+        job_id, arguments, attempts = reply
+        return Job(_text(job_id), queue, json.loads(_text(arguments)), int(attempts), lease)
+
+    def ack(self, job: Job, result: ParseResult) -> bool:
+        payload = json.dumps(result.to_dict(), ensure_ascii=False, default=str)
+        return bool(self._ack(keys=self._keys(job.queue), args=[job.id, job.lease, payload]))
+
+    def retry(self, job: Job, delay: float) -> bool:
+        keys = self._keys(job.queue)
+        return bool(self._retry(keys=keys[:4], args=[job.id, job.lease, time.time() + delay]))
+
+    def results(self, queue: str) -> Iterator[tuple[str, ParseResult]]:
+        for job_id, result in self.client.hscan_iter(self._keys(queue)[4]):
+            yield _text(job_id), ParseResult.from_dict(json.loads(_text(result)))
+
+    def stats(self, queue: str) -> dict[str, int]:
+        keys = self._keys(queue)
+        ready = self.client.zcount(keys[0], "-inf", time.time())
+        return {
+            "ready": ready,
+            "delayed": self.client.zcard(keys[0]) - ready,
+            "done": self.client.hlen(keys[4]),
+        }
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class LocalRedis:
+    """
+    Заменитель клиента redis-py в памяти процесса для тестов и отладки RedisQueue без сервера.
+    Поддерживает только команды RedisQueue; register_script принимает скрипты этого модуля и
+    выполняет их Python-аналоги под блокировкой, так что они атомарны, как Lua-скрипты на сервере.
+    Сами Lua-скрипты проверяются на сервере или в fakeredis с lupa (см. tests/test_jobqueue.py).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._zsets: dict[str, dict[str, float]] = {}
+        self._hashes: dict[str, dict[str, str]] = {}
+        self._scripts = {
+            _REDIS_PUT: self._script_put,
+            _REDIS_RESERVE: self._script_reserve,
+            _REDIS_ACK: self._script_ack,
+            _REDIS_RETRY: self._script_retry,
+        }
+
+    def register_script(self, source: str) -> Any:
+        if source not in self._scripts:
+            raise NotImplementedError("LocalRedis выполняет только скрипты RedisQueue")
+        script = self._scripts[source]
+
+        def call(keys: list[str], args: list[Any]) -> Any:
+            with self._lock:
+                return script(keys, [str(arg) for arg in args])
+
+        return call
+
+    def _script_put(self, keys: list[str], args: list[str]) -> int:
+        job_id, arguments, available = args
+        if self.hexists(keys[1], job_id) or self.hexists(keys[2], job_id):
+            return 0
+        self.hset(keys[1], job_id, arguments)
+        self.zadd(keys[0], {job_id: float(available)})
+        return 1
+
+    def _script_reserve(self, keys: list[str], args: list[str]) -> Optional[list[Any]]:
+        now, until, lease = args
+        ready = sorted((score, member) for member, score in self._zsets.get(keys[0], {}).items()
+                       if score <= float(now))
+        if not ready:
+            return None
+        job_id = ready[0][1]
+        self.zadd(keys[0], {job_id: float(until)})
+        self.hset(keys[3], job_id, lease)
+        attempts = self.hincrby(keys[2], job_id, 1)
+        return [job_id, self.hget(keys[1], job_id), attempts]
+
+    def _script_ack(self, keys: list[str], args: list[str]) -> int:
+        job_id, lease, payload = args
+        if self.hget(keys[3], job_id) != lease:
+            return 0
+        self.zrem(keys[0], job_id)
+        for key in keys[1:4]:
+            self.hdel(key, job_id)
+        self.hset(keys[4], job_id, payload)
+        return 1
+
+    def _script_retry(self, keys: list[str], args: list[str]) -> int:
+        job_id, lease, available = args
+        if self.hget(keys[3], job_id) != lease:
+            return 0
+        self.hdel(keys[3], job_id)
+        self.zadd(keys[0], {job_id: float(available)})
+        return 1
+
+    def zadd(self, name: str, mapping: dict[str, float]) -> int:
+        with self._lock:
+            zset = self._zsets.setdefault(name, {})
+            added = len(mapping.keys() - zset.keys())
+            zset.update(mapping)
+            return added
+
+    def zrem(self, name: str, *members: str) -> int:
+        with self._lock:
+            zset = self._zsets.get(name, {})
+            return sum(zset.pop(member, None) is not None for member in members)
+
+    def zcount(self, name: str, minimum: float | str, maximum: float | str) -> int:
+        with self._lock:
+            return sum(float(minimum) <= score <= float(maximum) for score in self._zsets.get(name, {}).values())
+
+    def zcard(self, name: str) -> int:
+        with self._lock:
+            return len(self._zsets.get(name, {}))
+
+    def hset(self, name: str, key: str, value: Any) -> int:
+        with self._lock:
+            values = self._hashes.setdefault(name, {})
+            added = key not in values
+            values[key] = str(value)
+            return int(added)
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self._lock:
+            return self._hashes.get(name, {}).get(key)
+
+    def hexists(self, name: str, key: str) -> bool:
+        with self._lock:
+            return key in self._hashes.get(name, {})
+
+    def hdel(self, name: str, *keys: str) -> int:
+        with self._lock:
+            values = self._hashes.get(name, {})
+            return sum(values.pop(key, None) is not None for key in keys)
+
+    def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        with self._lock:
+            values = self._hashes.setdefault(name, {})
+            values[key] = str(int(values.get(key, 0)) + amount)
+            return int(values[key])
+
+    def hlen(self, name: str) -> int:
+        with self._lock:
+            return len(self._hashes.get(name, {}))
+
+    def hscan_iter(self, name: str) -> Iterator[tuple[str, str]]:
+        with self._lock:
+            items = list(self._hashes.get(name, {}).items())
+        yield from items
+
+    def close(self) -> None:
+        pass
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def open_backend(url: str) -> QueueBackend:
+    """Открывает хранилище по адресу: redis://... или rediss://... — RedisQueue, иначе путь к файлу SqliteQueue."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisQueue.from_url(url)
+    return SqliteQueue(url.removeprefix("sqlite://"))
+
+
+def job_id(arguments: dict[str, Any]) -> str:
+    """Идентификатор задания по нормализованным аргументам parse() (см. cli.item_key)."""
+    from cli import item_key
+
+    return item_key(arguments)
+
+
+def submit(backend: QueueBackend, queue: str, items: Iterator[dict[str, Any]],
+           inn_lengths: tuple[int, ...] = (10, 12)) -> dict[str, int]:
+    """
+    Проверяет и нормализует входные данные и добавляет задания в очередь. Данные с неверным форматом
+    в очередь не попадают.
+
+    Returns:
+        dict[str, int]: added, duplicates (уже в очереди или выполнены), invalid.
+    """
+    counts = {"added": 0, "duplicates": 0, "invalid": 0}
+    for item in items:
+        try:
+            arguments = validate_arguments(item, inn_lengths)
+        except FieldFormatError:
+            counts["invalid"] += 1
+            continue
+        if backend.put(queue, job_id(arguments), arguments):
+            counts["added"] += 1
+        else:
+            counts["duplicates"] += 1
+    return counts
+
+
+class QueueWorker:
+    """
+    Рабочий очереди: один экземпляр парсера (создается при первом задании) последовательно выполняет
+    задания очереди. Для масштабирования запускается по рабочему на процесс и машину.
+
+    Скорость запросов к сайту ограничивается RateLimiter процесса; RETRYABLE_ERRORS снижают ее
+    и возвращают задание в очередь с задержкой RateLimiter.backoff(), а не повторяются на месте,
+    так что повтор может достаться другому рабочему.
+    """
+
+    def __init__(
+            self,
+            backend: QueueBackend,
+            parser_cls: type,
+            queue: str,
+            timeout: int | float = 30,
+            headless: bool = True,
+            visibility_timeout: float = 300.0,
+            max_attempts: int = 5,
+            poll_interval: float = 1.0,
+            limiter: Optional[Any] = None,
+            **parser_kwargs,
+    ) -> None:
+        """
+        Args:
+            backend (QueueBackend): Хранилище заданий.
+            parser_cls (type): Класс парсера.
+            queue (str): Имя очереди.
+            timeout (int | float): Таймаут парсера (в секундах).
+            headless (bool): Запуск браузера без GUI.
+            visibility_timeout (float): Время резерва задания (в секундах). Должно превышать время
+                запуска браузера и одного запроса, иначе задание успеет достаться другому рабочему.
+            max_attempts (int): Максимальное число резервов задания. Последний результат с временной
+                ошибкой подтверждается как есть; задание, резерв которого истекал max_attempts раз
+                (рабочие умирали на нем), подтверждается со статусом error.
+            poll_interval (float): Пауза при пустой очереди (в секундах).
+            limiter (Optional[RateLimiter]): Планировщик запросов (по-умолчанию ratelimit.LIMITER).
+            **parser_kwargs: Дополнительные аргументы конструктора парсера (например, engine).
+        """
+        from ratelimit import ANSWERED_ERRORS, LIMITER, RETRYABLE_ERRORS
+
+        self.backend = backend
+        self.parser_cls = parser_cls
+        self.queue = queue
+        self.timeout = timeout
+        self.headless = headless
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.limiter = limiter or LIMITER
+        self.parser_kwargs = parser_kwargs
+        self.retry_statuses = {status_of(error) for error in RETRYABLE_ERRORS}
+        self.answered_statuses = {Status.OK} | {status_of(error) for error in ANSWERED_ERRORS}
+        self.counts = {"acked": 0, "retried": 0, "lost": 0}
+        self._parser = None
+
+    @property
+    def parser(self) -> Any:
+        if self._parser is None:
+            self._parser = self.parser_cls(timeout=self.timeout, headless=self.headless, **self.parser_kwargs)
+        return self._parser
+
+    def process(self, job: Job) -> None:
+        """Выполняет задание и подтверждает его или возвращает в очередь."""
+        if job.attempt > self.max_attempts:
+            self._ack(job, ParseResult(Status.ERROR, source=self.parser_cls.__name__))
+            return
+
+        parser = self.parser
+        host = self.limiter.for_url(parser.url)
+        host.acquire()
+        result = parser.parse_result(**job.arguments)
+        if result.status not in self.retry_statuses:
+            # Скорость растет только от ответов сайта, а не от ошибок браузера
+            if result.status in self.answered_statuses:
+                host.on_success()
+            self._ack(job, result)
+            return
+
+        host.on_throttle()
+        if job.attempt >= self.max_attempts:
+            self._ack(job, result)
+            return
+        # Форма могла остаться в промежуточном состоянии — следующее задание начинается с чистой страницы
+        parser.reset()
+        if self.backend.retry(job, self.limiter.backoff(job.attempt - 1)):
+            self.counts["retried"] += 1
+        else:
+            self.counts["lost"] += 1
+
+    def _ack(self, job: Job, result: ParseResult) -> None:
+        if self.backend.ack(job, result):
+            self.counts["acked"] += 1
+        else:
+            # Резерв истек, задание выполняет другой рабочий
+            self.counts["lost"] += 1
+
+    def run(self, stop: Optional[threading.Event] = None, max_jobs: Optional[int] = None,
+            exit_when_empty: bool = False) -> dict[str, int]:
+        """
+        Выполняет задания до stop, max_jobs заданий или (exit_when_empty) опустошения очереди.
+        При прерывании (KeyboardInterrupt и т.п.) текущее задание сразу возвращается в очередь.
+
+        Returns:
+            dict[str, int]: acked, retried, lost (резерв истек до подтверждения).
+        """
+        processed = 0
+        try:
+            while (stop is None or not stop.is_set()) and (max_jobs is None or processed < max_jobs):
+                job = self.backend.reserve(self.queue, self.visibility_timeout)
+                if job is None:
+                    if exit_when_empty and not self.backend.stats(self.queue)["delayed"]:
+                        break
+                    if stop is not None:
+                        stop.wait(self.poll_interval)
+                    else:
+                        time.sleep(self.poll_interval)
+                    continue
+                try:
+                    self.process(job)
+                except BaseException:
+                    self.backend.retry(job, 0.0)
+                    raise
+                processed += 1
+        finally:
+            self.close()
+        return dict(self.counts)
+
+    def close(self) -> None:
+        """Закрывает парсер."""
+        if self._parser is not None:
+            self._parser.close()
+            self._parser = None
+
+
+def main():
+    from cli import PARSERS, engine_arguments, load_parser, make_item, parse_arguments, read_rows
+
+    argparser = argparse.ArgumentParser(prog="python -m jobqueue", description="Распределенная очередь заданий")
+    argparser.add_argument("--backend", required=True, help="redis://host:port/db или путь к файлу SQLite")
+    argparser.add_argument("--parser", required=True, help=f"{', '.join(PARSERS)} или путь к классу вида модуль:Класс")
+    argparser.add_argument("--queue", help="Имя очереди (по-умолчанию имя парсера)")
+    commands = argparser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Добавить задания из входного файла")
+    submit_parser.add_argument("--input", required=True, help="CSV с заголовком или JSONL")
+    submit_parser.add_argument("--column", help="Колонка входа для парсеров с одним аргументом")
+
+    work_parser = commands.add_parser("work", help="Выполнять задания")
+    work_parser.add_argument("--engine", choices=("selenium", "http"), help="Движок NpdParser и RomParser")
+    work_parser.add_argument("--timeout", default=30, type=float, help="Таймаут ожидания элементов (с)")
+    work_parser.add_argument("--visibility-timeout", default=300, type=float, help="Время резерва задания (с)")
+    work_parser.add_argument("--max-attempts", default=5, type=int)
+    work_parser.add_argument("--exit-when-empty", action="store_true", help="Завершиться, когда очередь опустеет")
+    work_parser.add_argument("--no-headless", dest="headless", action="store_false")
+
+    results_parser = commands.add_parser("results", help="Выгрузить результаты в JSONL")
+    results_parser.add_argument("--output", required=True)
+
+    commands.add_parser("stats", help="Показать состояние очереди")
+
+    args = argparser.parse_args()
+    parser_cls = load_parser(args.parser)
+    queue = args.queue or args.parser
+    backend = open_backend(args.backend)
+    try:
+        if args.command == "submit":
+            arguments = parse_arguments(parser_cls)
+            items = (make_item(row, arguments, args.column) for row in read_rows(args.input))
+            print(submit(backend, queue, items, parser_cls.INN_LENGTHS), file=sys.stderr)
+        elif args.command == "work":
+            try:
+                parser_kwargs = engine_arguments(parser_cls, args.engine)
+            except ValueError as ex:
+                argparser.error(str(ex))
+            worker = QueueWorker(
+                backend, parser_cls, queue, timeout=args.timeout, headless=args.headless,
+                visibility_timeout=args.visibility_timeout, max_attempts=args.max_attempts, **parser_kwargs,
+            )
+            print(worker.run(exit_when_empty=args.exit_when_empty), file=sys.stderr)
+        elif args.command == "results":
+            with open(args.output, "w", encoding="utf-8") as output:
+                for identifier, result in backend.results(queue):
+                    output.write(json.dumps({"key": identifier, **result.to_dict()}, ensure_ascii=False) + "\n")
+        else:
+            print(backend.stats(queue))
+    finally:
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Реестр локаторов парсеров: каждому элементу страницы соответствует имя и упорядоченный список
+вариантов поиска. Основной вариант — быстрый ID или CSS-селектор, запасные (обычно прежний
+абсолютный XPath) используются, если основной перестал находить элемент.
+
+    LOCATORS = {
+        "inn_field": (
+            (By.CSS_SELECTOR, "#sug-participants textarea"),
+            (By.XPATH, '//*[@id="sug-participants"]/div/textarea'),
+        ),
+        "submit": (By.ID, "btn_send"),
+    }
+
+Какой вариант сработал, учитывается в LOCATOR_STATS: срабатывание запасного варианта означает,
+что разметка сайта изменилась и основной локатор пора обновить.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Локатор элемента: (стратегия By, значение)
+Locator = tuple[str, str]
+# Варианты поиска элемента в порядке предпочтения
+Selector = tuple[Locator, ...]
+
+# Стратегии, которые поддерживает пакетный поиск в браузере (base._FIND_JS)
+SUPPORTED_STRATEGIES = frozenset({"id", "css selector", "class name", "name", "tag name", "xpath"})
+
+
+def selector(entry: Locator | Iterable[Locator]) -> Selector:
+    """
+    Приводит элемент реестра (один локатор или последовательность вариантов) к кортежу вариантов.
+
+    Raises:
+        ValueError: Пустой список вариантов или неподдерживаемая стратегия поиска.
+    """
+    candidates = (tuple(entry),) if isinstance(entry[0], str) else tuple(tuple(item) for item in entry)
+    if not candidates:
+        raise ValueError("Пустой список вариантов локатора")
+    for by, _ in candidates:
+        if by not in SUPPORTED_STRATEGIES:
+            raise ValueError(f"Неподдерживаемая стратегия поиска: {by}")
+    return candidates
+
+
+def compile_registry(registry: dict[str, Any]) -> dict[str, Selector]:
+    """Приводит все элементы реестра к кортежам вариантов (см. selector)."""
+    return {name: selector(entry) for name, entry in registry.items()}
+
+
+def script_arguments(registry: dict[str, Selector], names: Iterable[str]) -> list[list[Any]]:
+    """Аргумент пакетного поиска в браузере: [[имя, [[стратегия, значение], ...]], ...]."""
+    return [[name, [list(candidate) for candidate in registry[name]]] for name in names]
+
+
+class LocatorStats:
+    """
+    Счетчики совпадений локаторов по вариантам и обнаруженных изменений разметки. Первое
+    срабатывание запасного варианта каждого локатора записывается в журнал предупреждением.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits: Counter[tuple[str, str, int]] = Counter()
+        self._drifts: Counter[tuple[str, str]] = Counter()
+
+    def record(self, parser: str, name: str, index: int) -> None:
+        """Учитывает, что локатор name парсера parser нашел элемент вариантом index."""
+        with self._lock:
+            key = (parser, name, index)
+            first = key not in self._hits
+            self._hits[key] += 1
+        if index and first:
+            logger.warning("%s: элемент %r найден запасным локатором №%d, основной локатор устарел",
+                           parser, name, index)
+
+    def record_drift(self, parser: str, names: Iterable[str]) -> None:
+        """Учитывает элементы, которые не нашел ни один вариант при загруженной странице."""
+        with self._lock:
+            for name in names:
+                self._drifts[(parser, name)] += 1
+
+    def fallbacks(self) -> list[tuple[str, str, int]]:
+        """Возвращает (парсер, имя, вариант) локаторов, сработавших не основным вариантом."""
+        with self._lock:
+            return sorted(key for key in self._hits if key[2])
+
+    def report(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """
+        Returns:
+            dict[str, dict[str, dict[str, Any]]]: {парсер: {имя: {"hits": {вариант: совпадений},
+            "drifts": обнаруженных изменений разметки}}}.
+        """
+        report: dict[str, dict[str, dict[str, Any]]] = {}
+        with self._lock:
+            for (parser, name, index), count in sorted(self._hits.items()):
+                entry = report.setdefault(parser, {}).setdefault(name, {"hits": {}, "drifts": 0})
+                entry["hits"][index] = count
+            for (parser, name), count in sorted(self._drifts.items()):
+                report.setdefault(parser, {}).setdefault(name, {"hits": {}, "drifts": 0})["drifts"] = count
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._drifts.clear()
+
+
+# Общие счетчики процесса
+LOCATOR_STATS = LocatorStats()
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    with NpdParser(timeout=30) as npd_parser:
+        print(npd_parser.parse(inn="500100732259"))
+    print(LOCATOR_STATS.report())
+    print(LOCATOR_STATS.fallbacks())
+
+
+if __name__ == '__main__':
+    main()
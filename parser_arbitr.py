@@ -1,14 +1,75 @@
-import time
+from __future__ import annotations
+
 from contextlib import suppress
-from random import uniform
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+from urllib.parse import urljoin
 
 from selenium.common import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-from base import BaseParser
-from exceptions import UndefinedError, ServiceUnavailableError
+from base import BaseParser, By, supervised
+from exceptions import UndefinedError, ServiceUnavailableError, FieldFormatError
+from tracing import traced
+from validation import validate_inn
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+# Запрос страницы списка дел тем же XHR, что и форма поиска (с cookies текущей сессии), и разбор
+# HTML-фрагмента ответа через DOMParser. JSON-ответ возвращается как есть.
+_SEARCH_CASES_JS = """
+const [url, body, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+const text = node => node ? node.textContent.replace(/\\s+/g, ' ').trim() : null;
+fetch(url, {
+    method: 'POST',
+    credentials: 'include',
+    headers: {'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest'},
+    body: JSON.stringify(body),
+}).then(async response => {
+    const content = await response.text();
+    if (!response.ok) return done({error: response.status});
+    if ((response.headers.get('Content-Type') || '').includes('json')) return done({json: JSON.parse(content)});
+
+    const doc = new DOMParser().parseFromString(content, 'text/html');
+    const number = id => {
+        const node = doc.getElementById(id);
+        return node ? parseInt(node.value, 10) : null;
+    };
+    const sides = (row, cls) => {
+        const rollovers = row.querySelectorAll(`td.${cls} .js-rolloverHtml`);
+        const nodes = rollovers.length ? rollovers : row.querySelectorAll(`td.${cls} .one, td.${cls} li`);
+        return Array.from(nodes).map(text).filter(Boolean);
+    };
+    const cases = Array.from(doc.querySelectorAll('tr')).filter(row => row.querySelector('a.num_case')).map(row => {
+        const court = row.querySelector('td.court');
+        const courtName = court ? Array.from(court.querySelectorAll('div')).filter(div => !div.children.length
+            && !div.classList.contains('judge')).map(text).pop() : null;
+        return {
+            number: text(row.querySelector('a.num_case')),
+            url: row.querySelector('a.num_case').getAttribute('href'),
+            date: text(row.querySelector('td.num span')),
+            court: courtName || null,
+            judge: text(row.querySelector('td.court .judge')),
+            plaintiffs: sides(row, 'plaintiff'),
+            respondents: sides(row, 'respondent'),
+        };
+    });
+    done({cases: cases, pages: number('documentsPagesCount'), total: number('documentsTotalCount')});
+}).catch(error => done({error: String(error)}));
+"""
+
+
+@dataclass(slots=True)
+class ArbitrCase:
+    """Карточка дела из списка результатов поиска."""
+    number: str
+    url: Optional[str] = None
+    date: Optional[str] = None
+    court: Optional[str] = None
+    judge: Optional[str] = None
+    plaintiffs: list[str] = field(default_factory=list)
+    respondents: list[str] = field(default_factory=list)
+    role: str = "other"
 
 
 class ArbitrParser(BaseParser):
@@ -16,17 +77,45 @@ class ArbitrParser(BaseParser):
     Парсер для проверки наличия судебных производств на сайте kad.arbitr.
     """
     URL = r"https://kad.arbitr.ru/"
+    # Запросы поиска и списка дел и скрипты страницы
+    RESOURCE_ALLOWLIST = ("*://kad.arbitr.ru/Kad/*", "*://kad.arbitr.ru/*.js*")
+    CACHE_TTL = 60 * 60
 
-    def __init__(self, timeout: int | float, headless: bool = True) -> None:
+    SEARCH_PATH = "Kad/SearchInstances"
+    RESULTS = {
+        "no_results": (By.CLASS_NAME, "b-noResults"),
+        "results": (By.CLASS_NAME, "b-results"),
+    }
+    LOCATORS = {
+        "notification_close": (
+            (By.CSS_SELECTOR, "a.js-promo_notification-popup-close"),
+            (By.CSS_SELECTOR, "a[class*='notification'][class*='close']"),
+            (By.XPATH, '//*[@id="js"]/div[13]/div[2]/div/div/div/div/a[1]'),
+        ),
+        "inn_field": (
+            (By.CSS_SELECTOR, "#sug-participants textarea"),
+            (By.XPATH, '//*[@id="sug-participants"]/div/textarea'),
+        ),
+        "submit": (
+            (By.CSS_SELECTOR, "#b-form-submit button"),
+            (By.XPATH, '//*[@id="b-form-submit"]/div/button'),
+        ),
+    }
+    PAGE_ANCHOR = "inn_field"
+
+    def __init__(self, timeout: int | float, headless: bool = True, driver: Optional[WebDriver] = None) -> None:
         """
         Инициализация парсера судебных производств.
 
         Args:
             timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
             headless (bool): Если True, запускает браузер в фоновом режиме без GUI (по-умолчанию True).
+            driver (Optional[WebDriver]): Готовый драйвер, открытый на странице URL (например, из DriverPool).
         """
-        super().__init__(self.URL, timeout, headless)
+        super().__init__(self.URL, timeout, headless, driver)
 
+    @traced
+    @supervised
     def parse(self, inn: str) -> bool:
         """
         Выполняет поиск судебных производств по ИНН.
@@ -36,74 +125,157 @@ class ArbitrParser(BaseParser):
         Returns:
             bool: True — данные найдены, False — данные не найдены.
         Raises:
+            FieldFormatError: Неверный ИНН (проверяется до обращения к сайту).
             ServiceUnavailableError: Сервис недоступен.
             UndefinedError: Неопределенная ошибка.
         """
+        inn = validate_inn(inn, self.INN_LENGTHS)
         try:
-            self._close_notification()
-            self._input_inn(inn)
-            self._submit_search()
-            result = self._check_result()
-            return result
+            self.begin(inn)
+            return self.resolve(self._wait_for_response())
         except NoSuchElementException:
             raise UndefinedError
         except TimeoutException:
             raise ServiceUnavailableError
 
+    def begin(self, inn: str) -> None:
+        """Закрывает уведомление, вводит ИНН и отправляет поиск, не дожидаясь ответа."""
+        self._close_notification()
+        self._input_inn(inn)
+        self._submit_search()
+
+    @traced
     def _close_notification(self) -> None:
         """Закрывает начальное уведомление, если оно есть"""
-        with suppress(TimeoutException):
-            close_btn = self.wait_for_element_clickable(By.XPATH, '//*[@id="js"]/div[13]/div[2]/div/div/div/div/a[1]', timeout=5)
+        self.wait_for_network_idle()
+        close_btn = self.locate("notification_close").get("notification_close")
+        if close_btn is not None:
             close_btn.click()
-            time.sleep(uniform(1, 1.5))
+            with suppress(TimeoutException):
+                self.wait_for_locator_invisibility("notification_close", timeout=5)
 
+    @traced
     def _input_inn(self, inn: str) -> None:
         """Вводит ИНН в поле поиска."""
-        inn_field = self.wait_for_element_visibility(By.XPATH, '//*[@id="sug-participants"]/div/textarea')
+        inn_field = self.wait_for_locator("inn_field")
         inn_field.send_keys(inn)
-        time.sleep(uniform(1, 1.5))
+        self.wait_for_network_idle()
 
+    @traced
     def _submit_search(self) -> None:
         """Кликает по кнопке для отправки запроса поиска."""
-        submit_button = self.wait_for_element_clickable(By.XPATH, '//*[@id="b-form-submit"]/div/button')
+        submit_button = self.wait_for_locator("submit")
+        self.mark_page()
         submit_button.click()
-        time.sleep(uniform(1, 1.5))
-
-    def _check_result(self) -> bool:
-        """Проверяет результат поиска и возвращает статус."""
-        self._wait_for_result_display()
 
-        if self._is_element_displayed(By.CLASS_NAME, 'b-noResults'):
+    def resolve(self, outcome: str) -> bool:
+        """Возвращает статус поиска по отображаемому блоку результата."""
+        if outcome == "no_results":
             return False
-        elif self._is_element_displayed(By.CLASS_NAME, 'b-results'):
+        elif outcome == "results":
             return True
         else:
             raise UndefinedError
 
-    def _wait_for_result_display(self) -> None:
-        """Ожидает завершения поиска и отображения результатов."""
-        WebDriverWait(self.driver, self.timeout).until(
-            EC.any_of(
-                EC.visibility_of_element_located((By.CLASS_NAME, "b-noResults")),
-                EC.visibility_of_element_located((By.CLASS_NAME, "b-results")),
-            )
-        )
+    def iter_cases(self, inn: str, page_size: int = 25, max_pages: Optional[int] = None) -> Iterator[ArbitrCase]:
+        """
+        Возвращает список дел по ИНН постранично, вызывая из открытой страницы тот же запрос поиска,
+        что и форма (с cookies текущей сессии), без переходов по страницам результатов.
 
-    def _is_element_displayed(self, by: By, value: str) -> bool:
-        """Проверяет отображение элемента на странице."""
-        with suppress(NoSuchElementException):
-            element = self.driver.find_element(by, value)
-            return element.is_displayed()
-        return False
+        Args:
+            inn (str): ИНН участника дела.
+            page_size (int): Количество дел на странице запроса.
+            max_pages (Optional[int]): Максимальное количество страниц (по-умолчанию — все).
+        Yields:
+            ArbitrCase: Дело; role — "plaintiff", "respondent" или "other" по вхождению ИНН в стороны.
+        Raises:
+            FieldFormatError: Неверный ИНН (проверяется до обращения к сайту).
+            ServiceUnavailableError: Сервис недоступен или вернул ошибку.
+        """
+        inn = validate_inn(inn, self.INN_LENGTHS)
+        url = urljoin(self.url, self.SEARCH_PATH)
+        page = 1
+        while max_pages is None or page <= max_pages:
+            try:
+                response = self._fetch_cases_page(url, inn, page, page_size)
+            except TimeoutException:
+                raise ServiceUnavailableError
+            if not response or "error" in response:
+                raise ServiceUnavailableError
+
+            if "json" in response:
+                cases = self._json_cases(response["json"])
+                pages = self._json_pages(response["json"], page_size)
+            else:
+                cases = response["cases"]
+                pages = response.get("pages") or 1
+            for case in cases:
+                yield self._make_case(case, inn)
+
+            if not cases or page >= pages:
+                return
+            page += 1
+
+    @traced
+    def _fetch_cases_page(self, url: str, inn: str, page: int, page_size: int) -> dict[str, Any]:
+        """Запрашивает одну страницу списка дел."""
+        body = {
+            "Page": page, "Count": page_size, "Courts": [], "DateFrom": None, "DateTo": None,
+            "Sides": [{"Name": inn, "Type": -1, "ExactMatch": False}],
+            "Judges": [], "CaseNumbers": [], "WithVKSInstances": False,
+        }
+        return self.driver.execute_async_script(_SEARCH_CASES_JS, url, body)
+
+    @staticmethod
+    def _json_cases(payload: dict[str, Any]) -> list[dict[str, Any]]:
+        """Приводит JSON-ответ (Result.Items) к полям HTML-ответа."""
+        items = (payload.get("Result") or {}).get("Items") or []
+        return [
+            {
+                "number": item.get("CaseNumber"), "url": item.get("CaseId"), "date": item.get("Date"),
+                "court": item.get("CourtName"), "judge": item.get("Judge"),
+                "plaintiffs": [side.get("Name") for side in item.get("Plaintiffs") or []],
+                "respondents": [side.get("Name") for side in item.get("Respondents") or []],
+            }
+            for item in items
+        ]
+
+    @staticmethod
+    def _json_pages(payload: dict[str, Any], page_size: int) -> int:
+        """Количество страниц JSON-ответа: Result.PagesCount или Result.TotalCount / page_size."""
+        result = payload.get("Result") or {}
+        if result.get("PagesCount"):
+            return int(result["PagesCount"])
+        if result.get("TotalCount"):
+            return -(-int(result["TotalCount"]) // page_size)
+        return 1
+
+    @staticmethod
+    def _make_case(case: dict[str, Any], inn: str) -> ArbitrCase:
+        """Создает ArbitrCase и определяет роль участника по вхождению ИНН."""
+        plaintiffs = case.get("plaintiffs") or []
+        respondents = case.get("respondents") or []
+        if any(inn in side for side in plaintiffs):
+            role = "plaintiff"
+        elif any(inn in side for side in respondents):
+            role = "respondent"
+        else:
+            role = "other"
+        return ArbitrCase(
+            number=case["number"], url=case.get("url"), date=case.get("date"), court=case.get("court"),
+            judge=case.get("judge"), plaintiffs=plaintiffs, respondents=respondents, role=role,
+        )
 
 
 # Пример использования
 def main():
     with ArbitrParser(timeout=30, headless=False) as arbitr_parser:
         try:
-            data = arbitr_parser.parse(inn="1234567890")
+            data = arbitr_parser.parse(inn="7707083893")
             print("Данные найдены" if data else "Данные не найдены")
-        except (ServiceUnavailableError, UndefinedError) as ex:
+            for case in arbitr_parser.iter_cases(inn="7707083893", max_pages=2):
+                print(case.number, case.date, case.court, case.role)
+        except (FieldFormatError, ServiceUnavailableError, UndefinedError) as ex:
             print(ex)
 
 
@@ -1,14 +1,20 @@
-from contextlib import suppress
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
 from selenium.common import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-from base import BaseParser
+from base import BaseParser, By, supervised
 from exceptions import (
     UndefinedError, ServiceUnavailableError, FieldFormatError,
     DataVerificationError, InnNotFoundError, ServiceCaptchaError
 )
+from tracing import traced
+from validation import validate_arguments
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
 
 
 class InnParser(BaseParser):
@@ -16,17 +22,50 @@ class InnParser(BaseParser):
     Парсер для получения информации об ИНН по личным данным.
     """
     URL = r"https://service.nalog.ru/inn.do"
-
-    def __init__(self, timeout: int | float, headless: bool = True) -> None:
+    # Запрос проверки, скрипты формы и изображение капчи
+    RESOURCE_ALLOWLIST = (
+        "*://service.nalog.ru/inn-proc.do*", "*://service.nalog.ru/static/*.js*",
+        "*://service.nalog.ru/static/captcha*",
+    )
+    CACHE_TTL = 30 * 24 * 60 * 60
+    NEGATIVE_CACHE_TTL = 24 * 60 * 60
+
+    ERRORS = {
+        "field_errors": (By.CLASS_NAME, "field-errors"),
+        "captcha": (By.ID, "uniDialogData"),
+    }
+    RESULTS = {
+        "not_found": (By.ID, "result_0"),
+        "found": (By.ID, "result_1"),
+        "unverified": (By.ID, "result_3"),
+        "error": (By.ID, "result_err"),
+    }
+    LOCATORS = {
+        "personal_data": (By.ID, "unichk_0"),
+        "continue": (By.ID, "btnContinue"),
+        "surname": ((By.ID, "fam"), (By.NAME, "fam")),
+        "name": ((By.ID, "nam"), (By.NAME, "nam")),
+        "lastname": ((By.ID, "otch"), (By.NAME, "otch")),
+        "birthdate": ((By.ID, "bdate"), (By.NAME, "bdate")),
+        "passport": ((By.ID, "docno"), (By.NAME, "docno")),
+        "submit": ((By.ID, "btn_send"), (By.CSS_SELECTOR, "#frm button[type='button']")),
+        "result_inn": (By.ID, "resultInn"),
+    }
+    PAGE_ANCHOR = "submit"
+
+    def __init__(self, timeout: int | float, headless: bool = True, driver: Optional[WebDriver] = None) -> None:
         """
         Инициализация парсера ИНН.
 
         Args:
             timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
             headless (bool): Если True, запускает браузер в фоновом режиме без GUI (по-умолчанию True).
+            driver (Optional[WebDriver]): Готовый драйвер, открытый на странице URL (например, из DriverPool).
         """
-        super().__init__(self.URL, timeout, headless)
+        super().__init__(self.URL, timeout, headless, driver)
 
+    @traced
+    @supervised
     def parse(self, surname: str, name: str, lastname: str, birthdate: str, passport: str) -> str:
         """
         Выполняет проверку и получение ИНН на сайте https://service.nalog.ru/inn.do.
@@ -34,7 +73,7 @@ class InnParser(BaseParser):
         Args:
             surname (str): Фамилия.
             name (str): Имя.
-            lastname (str): Отчество.
+            lastname (str): Отчество (пустая строка — отчества нет).
             birthdate (str): Дата рождения в формате ДД.ММ.ГГГГ.
             passport (str): Паспорт в формате "xx xx xxxxxx".
         Returns:
@@ -46,101 +85,85 @@ class InnParser(BaseParser):
             ServiceUnavailableError: Сервис недоступен.
             UndefinedError: Неопределенная ошибка.
         """
+        arguments = validate_arguments({
+            "surname": surname, "name": name, "lastname": lastname, "birthdate": birthdate, "passport": passport,
+        })
         try:
-            self._bypass_personal_data_block()
-            self._fill_personal_info(surname, name, lastname, birthdate, passport)
-            self._submit_form()
-            self._validate_input()
-            return self._parse_result()
+            self.begin(**arguments)
+            return self.resolve(self._wait_for_response())
         except NoSuchElementException:
             raise UndefinedError
         except TimeoutException:
             raise ServiceUnavailableError
 
+    def begin(self, surname: str, name: str, lastname: str, birthdate: str, passport: str) -> None:
+        """Заполняет и отправляет форму, не дожидаясь ответа."""
+        self._bypass_personal_data_block()
+        self._fill_personal_info(surname, name, lastname, birthdate, passport)
+        self._submit_form()
+
+    @traced
     def _bypass_personal_data_block(self) -> None:
         """Пропускает блок с подтверждением использования личных данных, если он присутствует."""
-        personal_data = self._find_and_click(By.XPATH, '//*[@id="unichk_0"]')
-        if personal_data:
-            self._find_and_click(By.XPATH, '//*[@id="btnContinue"]')
+        personal_data = self.locate("personal_data").get("personal_data")
+        if personal_data is not None:
+            self._click(personal_data)
+            self._click(self.wait_for_locator("continue"))
 
+    @traced
     def _fill_personal_info(self, surname: str, name: str, lastname: str, birthdate: str, passport: str) -> None:
-        """Заполняет поля формы личными данными."""
-        self._fill_field(By.XPATH, '//*[@id="fam"]', surname)
-        self._fill_field(By.XPATH, '//*[@id="nam"]', name)
-        self._fill_field(By.XPATH, '//*[@id="otch"]', lastname)
-        self._fill_field(By.XPATH, '//*[@id="bdate"]', birthdate)
-        self._fill_field(By.XPATH, '//*[@id="docno"]', passport)
-
-    def _fill_field(self, by: By, locator: str, value: str) -> None:
-        """Заполняет одно поле значением."""
-        field = self.wait_for_element_visibility(by, locator)
-        self.driver.execute_script("arguments[0].value = arguments[1]", field, value)
+        """Заполняет поля формы личными данными (поля находятся и заполняются одним запросом к странице)."""
+        values = {"surname": surname, "name": name, "lastname": lastname, "birthdate": birthdate, "passport": passport}
+        fields = self.wait_for_locators(*values)
+        self.driver.execute_script(
+            "for (const [field, value] of arguments[0]) field.value = value;",
+            [[fields[field], value] for field, value in values.items()],
+        )
 
+    @traced
     def _submit_form(self) -> None:
         """Отправляет форму на сервер."""
-        self._find_and_click(By.XPATH, '//*[@id="btn_send"]')
+        self.mark_page()
+        self._click(self.wait_for_locator("submit"))
 
-    def _validate_input(self) -> None:
-        """Проверяет валидность данных и отсутствие капчи."""
-        try:
-            self.driver.implicitly_wait(0)
-            self._check_for_errors()
-            self._check_for_captcha()
-        finally:
-            self.driver.implicitly_wait(self.timeout)
+    def resolve(self, outcome: str) -> str:
+        """
+        Проверяет валидность данных и отсутствие капчи (ошибки и капча ожидаются вместе с блоками
+        результата) и возвращает найденный ИНН.
+        """
+        self._check_for_errors(outcome)
+        self._check_for_captcha(outcome)
+        return self._parse_result(outcome)
 
-    def _check_for_errors(self) -> None:
+    @staticmethod
+    def _check_for_errors(outcome: str) -> None:
         """Проверяет наличие ошибок в формате данных."""
-        with suppress(TimeoutException):
-            if self.wait_for_element_visibility(By.CLASS_NAME, 'field-errors', timeout=2):
-                raise FieldFormatError
+        if outcome == "field_errors":
+            raise FieldFormatError
 
-    def _check_for_captcha(self) -> None:
+    @staticmethod
+    def _check_for_captcha(outcome: str) -> None:
         """Проверяет наличие капчи и возбуждает исключение, если капча найдена."""
-        with suppress(TimeoutException):
-            if self.wait_for_element_visibility(By.XPATH, '//*[@id="uniDialogData"]', timeout=3):
-                raise ServiceCaptchaError
+        if outcome == "captcha":
+            raise ServiceCaptchaError
 
-    def _parse_result(self) -> str:
+    @traced
+    def _parse_result(self, outcome: str) -> str:
         """Обрабатывает и возвращает результат поиска ИНН."""
-        self._wait_for_result_display()
-
-        if self._is_element_displayed(By.ID, 'result_0'):
+        if outcome == "not_found":
             raise InnNotFoundError
-        elif self._is_element_displayed(By.ID, 'result_1'):
-            return self.driver.find_element(By.XPATH, '//*[@id="resultInn"]').text
-        elif self._is_element_displayed(By.ID, 'result_3'):
+        elif outcome == "found":
+            return self.find_locator("result_inn").text
+        elif outcome == "unverified":
             raise DataVerificationError
-        elif self._is_element_displayed(By.ID, 'result_err'):
+        elif outcome == "error":
             raise ServiceUnavailableError
         else:
             raise UndefinedError
 
-    def _wait_for_result_display(self) -> None:
-        """Ожидает отображения результата поиска."""
-        WebDriverWait(self.driver, self.timeout).until(
-            EC.any_of(
-                EC.visibility_of_element_located((By.ID, "result_0")),
-                EC.visibility_of_element_located((By.ID, "result_1")),
-                EC.visibility_of_element_located((By.ID, "result_3")),
-                EC.visibility_of_element_located((By.ID, "result_err")),
-            )
-        )
-
-    def _is_element_displayed(self, by: By, value: str) -> bool:
-        """Проверяет, отображен ли элемент на странице."""
-        with suppress(NoSuchElementException):
-            element = self.driver.find_element(by, value)
-            return element.is_displayed()
-        return False
-
-    def _find_and_click(self, by: By, locator: str) -> bool:
-        """Находит и кликает на элемент, если он существует."""
-        with suppress(NoSuchElementException):
-            element = self.driver.find_element(by, locator)
-            self.driver.execute_script("arguments[0].click()", element)
-            return True
-        return False
+    def _click(self, element: WebElement) -> None:
+        """Кликает по элементу скриптом."""
+        self.driver.execute_script("arguments[0].click()", element)
 
 
 # Пример использования
@@ -1,13 +1,20 @@
+from __future__ import annotations
+
 import re
 from contextlib import suppress
 from datetime import date
+from typing import TYPE_CHECKING, Optional
+
 from selenium.common import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-from base import BaseParser
+from base import BaseParser, By, supervised
 from exceptions import UndefinedError, ServiceUnavailableError, FieldFormatError
+from http_engine import EngineFallback, NpdHttpEngine
+from tracing import traced
+from validation import validate_inn
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
 
 
 class NpdParser(BaseParser):
@@ -16,17 +23,57 @@ class NpdParser(BaseParser):
     """
 
     URL = r"https://npd.nalog.ru/check-status/"
-
-    def __init__(self, timeout: int | float, headless: bool = True) -> None:
+    # Скрипты ASP.NET (валидаторы формы) и капча
+    RESOURCE_ALLOWLIST = (
+        "*://npd.nalog.ru/WebResource.axd*", "*://npd.nalog.ru/ScriptResource.axd*", "*://npd.nalog.ru/*captcha*",
+    )
+    CACHE_TTL = 24 * 60 * 60
+    INN_LENGTHS = (12,)
+
+    VALIDATORS = {
+        "required_inn": (By.ID, "ctl00_ctl00_RequiredFieldValidator1"),
+        "invalid_inn": (By.ID, "ctl00_ctl00_cv_Inn"),
+        "required_date": (By.ID, "ctl00_ctl00_RequiredFieldValidator2"),
+        "invalid_date": (By.ID, "ctl00_ctl00_CustomValidator1"),
+    }
+    ERRORS = VALIDATORS
+    RESULTS = {
+        "result": (
+            (By.CSS_SELECTOR, "#content > div > div > div:first-of-type > div:nth-of-type(5)"),
+            (By.XPATH, '//*[@id="content"]/div/div/div[1]/div[5]'),
+        ),
+    }
+    LOCATORS = {
+        "inn_field": ((By.ID, "ctl00_ctl00_tbINN"), (By.CSS_SELECTOR, "input[name$='tbINN']")),
+        "date_field": ((By.ID, "ctl00_ctl00_tbDate"), (By.CSS_SELECTOR, "input[name$='tbDate']")),
+        "submit": ((By.ID, "ctl00_ctl00_btSend"), (By.CSS_SELECTOR, "input[type='submit'][name$='btSend']")),
+    }
+    PAGE_ANCHOR = "inn_field"
+
+    def __init__(
+            self,
+            timeout: int | float,
+            headless: bool = True,
+            driver: Optional[WebDriver] = None,
+            engine: str = "selenium",
+    ) -> None:
         """
         Инициализация парсера самозанятости.
 
         Args:
             timeout (int | float): Таймаут ожидания элементов на странице (в секундах).
             headless (bool): Если True, запускает браузер в фоновом режиме без GUI (по-умолчанию True).
+            driver (Optional[WebDriver]): Готовый драйвер, открытый на странице URL (например, из DriverPool).
+            engine (str): "selenium" — проверка в браузере, "http" — прямые HTTP-запросы с переходом
+                на браузер только при капче или неожиданной разметке (браузер запускается лениво).
         """
-        super().__init__(url=self.URL, timeout=timeout, headless=headless)
+        if engine not in ("selenium", "http"):
+            raise ValueError(f"Неизвестный движок: {engine}")
+        self._http_engine = NpdHttpEngine(self.URL, timeout) if engine == "http" else None
+        super().__init__(url=self.URL, timeout=timeout, headless=headless, driver=driver, lazy=engine == "http")
 
+    @traced
+    @supervised
     def parse(self, inn: str) -> bool:
         """
         Проверяет регистрацию человека как плательщика налога на профессиональный доход (самозанятости).
@@ -40,13 +87,14 @@ class NpdParser(BaseParser):
             FieldFormatError: Ошибка формата заполняемых данных.
             UndefinedError: Неопределенная ошибка.
         """
+        inn = validate_inn(inn, self.INN_LENGTHS)
+        if self._http_engine is not None:
+            with suppress(EngineFallback):
+                return self._analyze_result(self._http_engine.get_result_text(inn, self._current_date()))
+
         try:
-            self._fill_inn_field(inn)
-            self._fill_date_field()
-            self._submit_form()
-            self._check_entry_validation()
-            result_text = self._get_result_text()
-            return self._analyze_result(result_text)
+            self.begin(inn)
+            return self.resolve(self._wait_for_response())
 
         except NoSuchElementException:
             raise UndefinedError
@@ -54,40 +102,56 @@ class NpdParser(BaseParser):
         except TimeoutException:
             raise ServiceUnavailableError
 
-    def _fill_inn_field(self, inn: str) -> None:
-        """Заполняет поле ИНН."""
-        inn_field = self.wait_for_element_visibility(By.XPATH, '//*[@id="ctl00_ctl00_tbINN"]')
-        self.driver.execute_script("arguments[0].value = arguments[1]", inn_field, inn)
+    def begin(self, inn: str) -> None:
+        """Заполняет и отправляет форму проверки, не дожидаясь ответа."""
+        self._fill_form(inn)
+        self._submit_form()
+
+    @traced
+    def _fill_form(self, inn: str) -> None:
+        """Заполняет поле ИНН и поле даты текущей датой (поля находятся одним запросом к странице)."""
+        fields = self.wait_for_locators("inn_field", "date_field")
+        self.driver.execute_script(
+            "arguments[0].value = arguments[1]; arguments[2].value = arguments[3];",
+            fields["inn_field"], inn, fields["date_field"], self._current_date(),
+        )
 
-    def _fill_date_field(self) -> None:
-        """Заполняет поле даты текущей датой."""
-        current_date = date.today().strftime("%d-%m-%Y")
-        date_field = self.wait_for_element_visibility(By.XPATH, '//*[@id="ctl00_ctl00_tbDate"]')
-        self.driver.execute_script("arguments[0].value = arguments[1]", date_field, current_date)
+    @staticmethod
+    def _current_date() -> str:
+        """Возвращает текущую дату в формате поля формы."""
+        return date.today().strftime("%d-%m-%Y")
 
+    @traced
     def _submit_form(self) -> None:
         """Нажимает кнопку отправки формы."""
-        submit_button = self.wait_for_element_clickable(By.XPATH, '//*[@id="ctl00_ctl00_btSend"]')
+        submit_button = self.wait_for_locator("submit")
+        self.mark_page()
         self.driver.execute_script("arguments[0].click()", submit_button)
 
-    def _check_entry_validation(self) -> None:
+    @traced
+    def _reset_form(self) -> None:
+        """Убирает предыдущий результат со страницы, не перезагружая ее (форма остается после postback)."""
+        result = self.locate("result").get("result")
+        if result is not None:
+            self.driver.execute_script("arguments[0].remove()", result)
+
+    def resolve(self, outcome: str) -> bool:
+        """
+        Проверяет ошибки заполнения формы (валидаторы ожидаются вместе с блоком результата)
+        и разбирает текст результата.
+        """
+        self._check_entry_validation(outcome)
+        return self._analyze_result(self._get_result_text())
+
+    def _check_entry_validation(self, outcome: str) -> None:
         """Проверяет наличие ошибок в заполнении формы."""
-        with suppress(TimeoutException):
-            WebDriverWait(self.driver, 2).until(
-                EC.any_of(
-                    EC.visibility_of_element_located((By.XPATH, '//*[@id="ctl00_ctl00_RequiredFieldValidator1"]')),
-                    EC.visibility_of_element_located((By.XPATH, '//*[@id="ctl00_ctl00_cv_Inn"]')),
-                    EC.visibility_of_element_located((By.XPATH, '//*[@id="ctl00_ctl00_RequiredFieldValidator2"]')),
-                    EC.visibility_of_element_located((By.XPATH, '//*[@id="ctl00_ctl00_CustomValidator1"]'))
-                )
-            )
+        if outcome in self.VALIDATORS:
             raise FieldFormatError("Ошибка в формате введенных данных.")
 
+    @traced
     def _get_result_text(self) -> str:
         """Получает текст результата проверки статуса самозанятости."""
-        result_element = WebDriverWait(self.driver, self.timeout).until(
-            EC.visibility_of_element_located((By.XPATH, '//*[@id="content"]/div/div/div[1]/div[5]'))
-        )
+        result_element = self.find_locator("result")
         return result_element.text.strip()
 
     @staticmethod
@@ -113,7 +177,7 @@ class NpdParser(BaseParser):
 def main():
     with NpdParser(timeout=30, headless=False) as npd_parser:
         try:
-            is_self_employed = npd_parser.parse(inn="123123123123")
+            is_self_employed = npd_parser.parse(inn="500100732259")
             print("Является самозанятым" if is_self_employed else "Не является самозанятым")
         except (FieldFormatError, ServiceUnavailableError, UndefinedError) as ex:
             print(ex)
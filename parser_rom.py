@@ -1,12 +1,18 @@
+from __future__ import annotations
+
 from contextlib import suppress
+from typing import TYPE_CHECKING, Optional
 
 from selenium.common import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-from base import BaseParser
+from base import BaseParser, By, supervised
 from exceptions import UndefinedError, ServiceUnavailableError, FieldFormatError
+from http_engine import EngineFallback, RomHttpEngine
+from tracing import traced
+from validation import validate_inn
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
 
 
 class RomParser(BaseParser):
@@ -14,17 +20,51 @@ class RomParser(BaseParser):
     Парсер для получения данных из реестра обеспечительных мер.
     """
     URL = r"https://service.nalog.ru/rom/"
-
-    def __init__(self, timeout: int | float, headless: bool = True) -> None:
+    # Запрос поиска, скрипты формы и изображение капчи
+    RESOURCE_ALLOWLIST = (
+        "*://service.nalog.ru/rom/*", "*://service.nalog.ru/static/*.js*", "*://service.nalog.ru/static/captcha*",
+    )
+    CACHE_TTL = 6 * 60 * 60
+
+    ERRORS = {"field_errors": (By.CLASS_NAME, "field-errors")}
+    RESULTS = {
+        "no_data": (By.ID, "pnlNoData"),
+        "data": (By.ID, "pnlData"),
+    }
+    LOCATORS = {
+        "inn_field": ((By.ID, "query"), (By.CSS_SELECTOR, "#frmSearch input[name='query']")),
+        "submit": (
+            (By.CSS_SELECTOR, "#pnlSearch button"),
+            (By.CSS_SELECTOR, "#frmSearch button"),
+            (By.XPATH, '//*[@id="pnlSearch"]/div[4]/div[2]/button'),
+        ),
+    }
+    PAGE_ANCHOR = "inn_field"
+
+    def __init__(
+            self,
+            timeout: int | float,
+            headless: bool = True,
+            driver: Optional[WebDriver] = None,
+            engine: str = "selenium",
+    ) -> None:
         """
         Инициализация парсера реестра обеспечительных мер.
 
         Args:
             timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
             headless (bool): Если True, запускает браузер в фоновом режиме без GUI (по-умолчанию True).
+            driver (Optional[WebDriver]): Готовый драйвер, открытый на странице URL (например, из DriverPool).
+            engine (str): "selenium" — поиск в браузере, "http" — прямые HTTP-запросы с переходом
+                на браузер только при капче или неожиданном ответе (браузер запускается лениво).
         """
-        super().__init__(self.URL, timeout, headless)
+        if engine not in ("selenium", "http"):
+            raise ValueError(f"Неизвестный движок: {engine}")
+        self._http_engine = RomHttpEngine(self.URL, timeout) if engine == "http" else None
+        super().__init__(self.URL, timeout, headless, driver, lazy=engine == "http")
 
+    @traced
+    @supervised
     def parse(self, inn: str) -> bool:
         """
         Выполняет поиск в реестре обеспечительных мер по ИНН.
@@ -38,66 +78,63 @@ class RomParser(BaseParser):
             FieldFormatError: Ошибка формата заполняемых данных.
             UndefinedError: Неопределенная ошибка.
         """
+        inn = validate_inn(inn, self.INN_LENGTHS)
+        if self._http_engine is not None:
+            with suppress(EngineFallback):
+                return self._http_engine.search(inn)
+
         try:
-            self._input_inn(inn)
-            self._submit_search()
-            self._check_entry_validation()
-            result = self._check_result()
-            return result
+            self.begin(inn)
+            return self.resolve(self._wait_for_response())
         except NoSuchElementException:
             raise UndefinedError
         except TimeoutException:
             raise ServiceUnavailableError
 
+    def begin(self, inn: str) -> None:
+        """Вводит ИНН и отправляет поиск, не дожидаясь ответа."""
+        self._input_inn(inn)
+        self._submit_search()
+
+    @traced
     def _input_inn(self, inn: str) -> None:
         """Вводит ИНН в поле поиска."""
-        inn_field = self.wait_for_element_visibility(By.XPATH, '//*[@id="query"]')
+        inn_field = self.wait_for_locator("inn_field")
         self.driver.execute_script("arguments[0].value = arguments[1]", inn_field, inn)
 
+    @traced
     def _submit_search(self) -> None:
         """Кликает по кнопке для отправки запроса поиска."""
-        submit_button = self.wait_for_element_clickable(By.XPATH, '//*[@id="pnlSearch"]/div[4]/div[2]/button')
+        submit_button = self.wait_for_locator("submit")
+        self.mark_page()
         self.driver.execute_script("arguments[0].click()", submit_button)
 
-    def _check_entry_validation(self) -> None:
-        """Проверяет наличие ошибок в формате полей ввода."""
-        with suppress(TimeoutException):
-            if self.wait_for_element_visibility(By.CLASS_NAME, 'field-errors', timeout=2):
-                raise FieldFormatError
-
-    def _check_result(self) -> bool:
-        """Проверяет результат поиска и возвращает статус."""
-        self._wait_for_result_display()
+    @traced
+    def _reset_form(self) -> None:
+        """Скрывает панели предыдущего результата, не перезагружая страницу."""
+        self.driver.execute_script(
+            "document.querySelectorAll('#pnlData, #pnlNoData').forEach(node => node.style.display = 'none');"
+        )
 
-        if self._is_element_displayed(By.ID, 'pnlNoData'):
+    def resolve(self, outcome: str) -> bool:
+        """
+        Возвращает статус поиска. Ошибки формата полей ожидаются вместе с панелями результата.
+        """
+        if outcome == "field_errors":
+            raise FieldFormatError
+        elif outcome == "no_data":
             return False
-        elif self._is_element_displayed(By.ID, 'pnlData'):
+        elif outcome == "data":
             return True
         else:
             raise UndefinedError
 
-    def _wait_for_result_display(self) -> None:
-        """Ожидает завершения поиска и отображения результатов."""
-        WebDriverWait(self.driver, self.timeout).until(
-            EC.any_of(
-                EC.visibility_of_element_located((By.ID, "pnlData")),
-                EC.visibility_of_element_located((By.ID, "pnlNoData")),
-            )
-        )
-
-    def _is_element_displayed(self, by: By, value: str) -> bool:
-        """Проверяет отображение элемента на странице."""
-        with suppress(NoSuchElementException):
-            element = self.driver.find_element(by, value)
-            return element.is_displayed()
-        return False
-
 
 # Пример использования
 def main():
     with RomParser(timeout=30, headless=False) as rom_parser:
         try:
-            data = rom_parser.parse(inn="1234567890")
+            data = rom_parser.parse(inn="7707083893")
             print("Данные найдены" if data else "Данные не найдены")
         except (FieldFormatError, ServiceUnavailableError, UndefinedError) as ex:
             print(ex)
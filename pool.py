@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from selenium.common import WebDriverException
+
+from base import BaseParser, get_driver_rss
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """
+    Драйвер, принадлежащий пулу, со счетчиком выполненных заданий.
+    """
+    __slots__ = ("driver", "url", "jobs")
+
+    def __init__(self, driver: WebDriver, url: str) -> None:
+        self.driver = driver
+        self.url = url
+        self.jobs = 0
+
+
+class _LaunchFailure:
+    """Отметка в очереди свободных драйверов: запуск драйвера не удался после всех попыток."""
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+class DriverPool:
+    """
+    Пул заранее запущенных и открытых на нужной странице драйверов.
+
+    Для каждого URL держит size драйверов. Драйвер выдается парсеру на время задания, после возврата
+    очищается (cookies, localStorage, sessionStorage) и снова открывает URL. Драйвер пересоздается
+    после max_jobs заданий, при превышении max_memory_mb или при падении сессии; новые драйверы
+    запускаются в фоновом потоке.
+
+    Неудачный запуск повторяется с экспоненциальной задержкой не более launch_attempts раз; затем
+    ожидающий acquire() получает ошибку запуска, а запуск драйвера начинается заново.
+    """
+    LAUNCH_BACKOFF = 1.0
+    MAX_LAUNCH_BACKOFF = 30.0
+
+    def __init__(
+            self,
+            parsers: Iterable[type[BaseParser]],
+            size: int = 2,
+            timeout: int | float = 30,
+            headless: bool = True,
+            max_jobs: int = 100,
+            max_memory_mb: Optional[int | float] = None,
+            launch_attempts: int = 5,
+    ) -> None:
+        """
+        Инициализация пула и запуск прогрева драйверов.
+
+        Args:
+            parsers (Iterable[type[BaseParser]]): Классы парсеров, для URL которых создаются драйверы.
+            size (int): Количество драйверов на каждый URL.
+            timeout (int | float): Таймаут ожидания элементов, передаваемый парсерам и драйверам (в секундах).
+            headless (bool): Если True, запускает браузеры в фоновом режиме без GUI (по-умолчанию True).
+            max_jobs (int): Количество заданий, после которого драйвер пересоздается.
+            max_memory_mb (Optional[int | float]): Предел памяти процесса браузера (в МБ), после которого
+                драйвер пересоздается. None — без ограничения.
+            launch_attempts (int): Количество попыток запуска драйвера, после которого ошибка
+                передается ожидающему acquire().
+        """
+        self.size = size
+        self.timeout = timeout
+        self.headless = headless
+        self.max_jobs = max_jobs
+        self.max_memory_mb = max_memory_mb
+        self.launch_attempts = launch_attempts
+
+        self._driver_cls: dict[str, type[BaseParser]] = {}
+        self._idle: dict[str, queue.Queue[PooledDriver | _LaunchFailure]] = {}
+        self._launch_queue: queue.Queue[Optional[tuple[str, int]]] = queue.Queue()
+        self._closed = False
+        self._all: set[PooledDriver] = set()
+        self._lock = threading.Lock()
+
+        self._launcher = threading.Thread(target=self._launch_loop, name="DriverPoolLauncher", daemon=True)
+        self._launcher.start()
+
+        for parser_cls in parsers:
+            self._register(parser_cls)
+
+    def _register(self, parser_cls: type[BaseParser]) -> None:
+        """Регистрирует URL парсера и ставит в очередь запуск драйверов для него."""
+        url = parser_cls.URL
+        if url in self._idle:
+            return
+        self._driver_cls[url] = parser_cls
+        self._idle[url] = queue.Queue()
+        for _ in range(self.size):
+            self._launch_queue.put((url, 1))
+
+    def _launch_loop(self) -> None:
+        """Фоновый поток: запускает драйверы для URL из очереди запуска."""
+        while True:
+            task = self._launch_queue.get()
+            if task is None or self._closed:
+                return
+            url, attempt = task
+            try:
+                driver = self._driver_cls[url].create_driver(self.timeout, self.headless)
+                driver.get(url)
+            except Exception as ex:
+                if attempt >= self.launch_attempts:
+                    logger.error("Не удалось запустить драйвер для %s за %d попыток: %s", url, attempt, ex)
+                    self._idle[url].put(_LaunchFailure(ex))
+                    continue
+                delay = min(self.LAUNCH_BACKOFF * 2 ** (attempt - 1), self.MAX_LAUNCH_BACKOFF)
+                logger.warning("Не удалось запустить драйвер для %s, повтор через %.1f с: %s", url, delay, ex)
+                timer = threading.Timer(delay, self._launch_queue.put, ((url, attempt + 1),))
+                timer.daemon = True
+                timer.start()
+                continue
+
+            pooled = PooledDriver(driver, url)
+            with self._lock:
+                if self._closed:
+                    driver.quit()
+                    return
+                self._all.add(pooled)
+            self._idle[url].put(pooled)
+
+    def acquire(self, parser_cls: type[BaseParser], wait: Optional[int | float] = 120) -> PooledDriver:
+        """
+        Выдает свободный драйвер для URL парсера.
+
+        Args:
+            parser_cls (type[BaseParser]): Класс парсера, для которого нужен драйвер.
+            wait (Optional[int | float]): Максимальное время ожидания свободного драйвера (в секундах,
+                None — без ограничения).
+        Returns:
+            PooledDriver: Драйвер, открытый на странице parser_cls.URL.
+        Raises:
+            TimeoutError: Свободный драйвер не появился за время wait.
+            WebDriverException: Драйвер не удалось запустить за launch_attempts попыток.
+        """
+        if self._closed:
+            raise RuntimeError("Пул драйверов закрыт")
+        self._register(parser_cls)
+        try:
+            pooled = self._idle[parser_cls.URL].get(timeout=wait)
+        except queue.Empty:
+            raise TimeoutError(f"Нет свободного драйвера для {parser_cls.URL}")
+        if isinstance(pooled, _LaunchFailure):
+            # Место драйвера не пропадает: следующий acquire() дождется новой серии попыток
+            if not self._closed:
+                self._launch_queue.put((parser_cls.URL, 1))
+            raise WebDriverException(f"Не удалось запустить драйвер для {parser_cls.URL}") from pooled.error
+        return pooled
+
+    def release(self, pooled: PooledDriver, broken: bool = False) -> None:
+        """
+        Возвращает драйвер в пул, очищая состояние сессии.
+
+        Args:
+            pooled (PooledDriver): Ранее выданный драйвер.
+            broken (bool): Если True, драйвер считается неисправным и заменяется новым.
+        """
+        pooled.jobs += 1
+        if not broken and not self._needs_recycle(pooled):
+            try:
+                self._reset(pooled)
+            except WebDriverException:
+                logger.warning("Сессия драйвера для %s не отвечает, драйвер будет заменен", pooled.url)
+            else:
+                self._idle[pooled.url].put(pooled)
+                return
+        self._replace(pooled)
+
+    @contextmanager
+    def checkout(self, parser_cls: type[BaseParser], wait: Optional[int | float] = 120) -> Iterator[BaseParser]:
+        """
+        Выдает парсер, работающий на драйвере из пула, и возвращает драйвер после выхода из контекста.
+
+        Args:
+            parser_cls (type[BaseParser]): Класс парсера.
+            wait (Optional[int | float]): Максимальное время ожидания свободного драйвера (в секундах).
+        """
+        pooled = self.acquire(parser_cls, wait)
+        broken = False
+        try:
+            yield parser_cls(timeout=self.timeout, headless=self.headless, driver=pooled.driver)
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken)
+
+    def _needs_recycle(self, pooled: PooledDriver) -> bool:
+        """Проверяет, исчерпал ли драйвер лимит заданий или памяти."""
+        if pooled.jobs >= self.max_jobs:
+            return True
+        if self.max_memory_mb is not None:
+            rss = get_driver_rss(pooled.driver)
+            if rss is not None and rss > self.max_memory_mb * 1024 * 1024:
+                return True
+        return False
+
+    @staticmethod
+    def _reset(pooled: PooledDriver) -> None:
+        """Очищает cookies и хранилища и возвращает драйвер на исходную страницу."""
+        driver = pooled.driver
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get(pooled.url)
+
+    def _replace(self, pooled: PooledDriver) -> None:
+        """Закрывает драйвер и ставит в очередь запуск замены."""
+        with self._lock:
+            self._all.discard(pooled)
+        try:
+            pooled.driver.quit()
+        except WebDriverException:
+            pass
+        if not self._closed:
+            self._launch_queue.put((pooled.url, 1))
+
+    def close(self) -> None:
+        """Останавливает фоновый запуск и закрывает все драйверы пула."""
+        with self._lock:
+            self._closed = True
+            drivers = list(self._all)
+            self._all.clear()
+        self._launch_queue.put(None)
+        for pooled in drivers:
+            try:
+                pooled.driver.quit()
+            except WebDriverException:
+                pass
+
+    def __enter__(self) -> 'DriverPool':
+        """Поддержка менеджера контекста для безопасного закрытия драйверов."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Закрытие всех драйверов при выходе из контекста."""
+        self.close()
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+    from parser_rom import RomParser
+
+    with DriverPool(parsers=(NpdParser, RomParser), size=2, timeout=30) as pool:
+        for inn in ("500100732259", "7707083893"):
+            with pool.checkout(NpdParser) as npd_parser:
+                print(inn, npd_parser.parse(inn=inn))
+            with pool.checkout(RomParser) as rom_parser:
+                print(inn, rom_parser.parse(inn=inn))
+
+
+if __name__ == '__main__':
+    main()
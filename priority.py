@@ -0,0 +1,385 @@
+"""
+Планировщик запросов к парсерам для смешанной нагрузки: интерактивные одиночные проверки
+(пользователь ждет ответа) и массовые перепроверки выполняются одними и теми же парсерами.
+
+    with PriorityScheduler({NpdParser: 4, RomParser: 2}, reserved=1, timeout=30, engine="http") as scheduler:
+        futures = [scheduler.submit(NpdParser, inn, lane=Lane.BULK) for inn in portfolio]
+        print(scheduler.parse(NpdParser, "500100732259", lane=Lane.INTERACTIVE, deadline=10))
+
+Запросы ставятся в полосы приоритета (Lane): свободный рабочий берет запрос из самой приоритетной
+непустой полосы, внутри полосы — с ближайшим сроком. Часть рабочих каждого класса парсера
+(reserved) обслуживает только полосу INTERACTIVE, поэтому интерактивный запрос не ждет окончания
+массовых, даже если ими заняты все остальные рабочие.
+
+Срок запроса (deadline) сверяется с наблюдаемым временем выполнения parse() класса парсера
+(90-й перцентиль последних вызовов): запрос, который заведомо не успеет выполниться, завершается
+DeadlineExceededError при постановке в очередь, при выдаче рабочему или пока ожидает в очереди —
+не занимая браузер. Уже начатый вызов parse() не прерывается. Future запроса можно отменить
+(cancel()), пока он ожидает в очереди.
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Optional
+
+from base import BaseParser
+from exceptions import DeadlineExceededError
+
+
+class Lane(IntEnum):
+    """Полоса приоритета: полосы с меньшим значением обслуживаются раньше."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+@dataclass(slots=True, order=True)
+class _Request:
+    """Запрос в очереди полосы; порядок — по сроку (math.inf — без срока), затем по поступлению."""
+    deadline: float
+    sequence: int
+    lane: Lane = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: dict[str, Any] = field(compare=False)
+    future: Future = field(compare=False)
+    submitted: float = field(compare=False)
+
+
+class _LaneStats:
+    """Счетчики полосы одного класса парсера."""
+    __slots__ = ("completed", "failed", "skipped", "waits")
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.waits: deque[float] = deque(maxlen=1000)
+
+
+class _ParserLanes:
+    """Очереди полос, рабочие и оценка времени выполнения одного класса парсера."""
+
+    # Оценка времени выполнения: перцентиль последних WINDOW вызовов; до MIN_SAMPLES вызовов
+    # оценка нулевая и сроки не проверяются заранее
+    QUANTILE = 0.9
+    WINDOW = 200
+    MIN_SAMPLES = 5
+
+    def __init__(self, parser_cls: type[BaseParser], workers: int, reserved: int) -> None:
+        self.parser_cls = parser_cls
+        self.workers = workers
+        self.reserved = reserved
+        self.queues: dict[Lane, list[_Request]] = {lane: [] for lane in Lane}
+        self.stats = {lane: _LaneStats() for lane in Lane}
+        self.busy_shared = 0
+        self.busy_reserved = 0
+        self._durations: deque[float] = deque(maxlen=self.WINDOW)
+        self._estimate = 0.0
+
+    def observe(self, duration: float) -> None:
+        self._durations.append(duration)
+        if len(self._durations) >= self.MIN_SAMPLES:
+            durations = sorted(self._durations)
+            self._estimate = durations[int(self.QUANTILE * (len(durations) - 1))]
+
+    @property
+    def estimate(self) -> float:
+        """Ожидаемое время выполнения parse() (в секундах)."""
+        return self._estimate
+
+    def expected_wait(self, lane: Lane) -> float:
+        """
+        Грубая оценка ожидания в очереди нового запроса полосы lane: количество «волн» запросов
+        впереди (более приоритетные полосы, эта полоса и выполняющиеся) на доступных полосе рабочих.
+        """
+        if lane is Lane.INTERACTIVE:
+            capacity, running = self.workers, self.busy_shared + self.busy_reserved
+        else:
+            capacity, running = self.workers - self.reserved, self.busy_shared
+        ahead = sum(len(self.queues[other]) for other in Lane if other <= lane)
+        return (ahead + running) // capacity * self.estimate
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+
+class PriorityScheduler:
+    """
+    Планировщик запросов к парсерам с полосами приоритета, сроками выполнения и резервом рабочих
+    для интерактивных запросов. Каждый рабочий — поток с собственным долгоживущим парсером,
+    который создается при первом запросе (см. parser_factory).
+
+    Результаты возвращаются через concurrent.futures.Future (в asyncio — asyncio.wrap_future).
+    """
+
+    def __init__(
+            self,
+            parsers: dict[type[BaseParser], int],
+            reserved: int = 1,
+            timeout: int | float = 30,
+            headless: bool = True,
+            parser_factory: Optional[Callable[[type[BaseParser]], BaseParser]] = None,
+            **parser_kwargs,
+    ) -> None:
+        """
+        Args:
+            parsers (dict[type[BaseParser], int]): Классы парсеров и количество рабочих каждого класса.
+            reserved (int): Количество рабочих каждого класса, обслуживающих только полосу INTERACTIVE.
+                Должно быть меньше количества рабочих класса.
+            timeout (int | float): Таймаут для ожидания элементов на странице (в секундах).
+            headless (bool): Если True, запускает браузеры в фоновом режиме без GUI (по-умолчанию True).
+            parser_factory (Optional[Callable[[type[BaseParser]], BaseParser]]): Создание парсера рабочего
+                (например, BrowserHost.parser); по-умолчанию parser_cls(timeout, headless, **parser_kwargs).
+            **parser_kwargs: Дополнительные аргументы конструктора парсера (например, engine="http").
+        Raises:
+            ValueError: Резерв не оставляет рабочих для остальных полос.
+        """
+        for parser_cls, workers in parsers.items():
+            if not 0 <= reserved < workers:
+                raise ValueError(f"{parser_cls.__name__}: резерв {reserved} из {workers} рабочих не оставляет "
+                                 f"рабочих для остальных полос")
+        self._factory = parser_factory or (
+            lambda parser_cls: parser_cls(timeout=timeout, headless=headless, **parser_kwargs)
+        )
+        self._lanes = {
+            parser_cls: _ParserLanes(parser_cls, workers, reserved) for parser_cls, workers in parsers.items()
+        }
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._closed = False
+
+        self._threads = []
+        for lanes in self._lanes.values():
+            for index in range(lanes.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(lanes, index < lanes.reserved),
+                    name=f"{lanes.parser_cls.__name__}-scheduler-{index}", daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        self._expirer = threading.Thread(target=self._expire_loop, name="PrioritySchedulerExpirer", daemon=True)
+        self._expirer.start()
+
+    def submit(self, parser_cls: type[BaseParser], *args, lane: Lane = Lane.BULK,
+               deadline: Optional[int | float] = None, **kwargs) -> Future:
+        """
+        Ставит вызов parser.parse(*args, **kwargs) в очередь полосы lane.
+
+        Args:
+            parser_cls (type[BaseParser]): Класс парсера из parsers конструктора.
+            lane (Lane): Полоса приоритета (по-умолчанию BULK).
+            deadline (Optional[int | float]): Срок выполнения от текущего момента (в секундах).
+        Returns:
+            Future: Результат parse(), исключение parse() или DeadlineExceededError.
+        """
+        lanes = self._lanes.get(parser_cls)
+        if lanes is None:
+            raise ValueError(f"Для {parser_cls.__name__} нет рабочих планировщика")
+        future: Future = Future()
+        now = time.monotonic()
+        request = _Request(
+            now + deadline if deadline is not None else math.inf, next(self._sequence),
+            lane, args, kwargs, future, now,
+        )
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Планировщик закрыт")
+            hopeless = now + lanes.expected_wait(lane) + lanes.estimate > request.deadline
+            if hopeless:
+                lanes.stats[lane].skipped += 1
+            else:
+                heapq.heappush(lanes.queues[lane], request)
+                self._condition.notify_all()
+        if hopeless:
+            future.set_exception(DeadlineExceededError())
+        return future
+
+    def parse(self, parser_cls: type[BaseParser], *args, lane: Lane = Lane.INTERACTIVE,
+              deadline: Optional[int | float] = None, **kwargs) -> Any:
+        """
+        Выполняет вызов через очередь (по-умолчанию в полосе INTERACTIVE) и возвращает результат parse().
+
+        Raises:
+            DeadlineExceededError: Вызов не может быть выполнен до истечения срока.
+            Exception: Исключение parse().
+        """
+        return self.submit(parser_cls, *args, lane=lane, deadline=deadline, **kwargs).result()
+
+    def _next(self, lanes: _ParserLanes, reserved: bool) -> Optional[_Request]:
+        """Ожидает и возвращает следующий запрос рабочего (None — планировщик закрыт и очереди пусты)."""
+        skipped = []
+        try:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    for lane in ((Lane.INTERACTIVE,) if reserved else Lane):
+                        queue = lanes.queues[lane]
+                        while queue:
+                            request = heapq.heappop(queue)
+                            if not request.future.set_running_or_notify_cancel():
+                                continue
+                            if now + lanes.estimate > request.deadline:
+                                lanes.stats[lane].skipped += 1
+                                skipped.append(request)
+                                continue
+                            lanes.stats[lane].waits.append(now - request.submitted)
+                            if reserved:
+                                lanes.busy_reserved += 1
+                            else:
+                                lanes.busy_shared += 1
+                            return request
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+        finally:
+            for request in skipped:
+                request.future.set_exception(DeadlineExceededError())
+
+    def _work(self, lanes: _ParserLanes, reserved: bool) -> None:
+        """Цикл рабочего: создает парсер при первом запросе и выполняет запросы по одному."""
+        parser = None
+        try:
+            while True:
+                request = self._next(lanes, reserved)
+                if request is None:
+                    return
+                started = time.monotonic()
+                try:
+                    if parser is None:
+                        parser = self._factory(lanes.parser_cls)
+                        started = time.monotonic()
+                    value = parser.parse(*request.args, **request.kwargs)
+                except Exception as ex:
+                    self._finish(lanes, reserved, request, time.monotonic() - started, True, parser is not None)
+                    request.future.set_exception(ex)
+                else:
+                    self._finish(lanes, reserved, request, time.monotonic() - started, False, True)
+                    request.future.set_result(value)
+        finally:
+            if parser is not None:
+                parser.close()
+
+    def _finish(self, lanes: _ParserLanes, reserved: bool, request: _Request, duration: float,
+                failed: bool, observed: bool) -> None:
+        """Освобождает рабочего и учитывает исход и время выполнения (observed — парсер был создан)."""
+        with self._condition:
+            if reserved:
+                lanes.busy_reserved -= 1
+            else:
+                lanes.busy_shared -= 1
+            if failed:
+                lanes.stats[request.lane].failed += 1
+            else:
+                lanes.stats[request.lane].completed += 1
+            if observed:
+                lanes.observe(duration)
+
+    def _expire_loop(self) -> None:
+        """Фоновый поток: завершает ожидающие запросы, которые уже не успеют выполниться до срока."""
+        while True:
+            expired = []
+            with self._condition:
+                if self._closed and not any(lanes.queued() for lanes in self._lanes.values()):
+                    return
+                now = time.monotonic()
+                for lanes in self._lanes.values():
+                    for lane, queue in lanes.queues.items():
+                        keep, dropped = [], []
+                        for request in queue:
+                            (keep if now + lanes.estimate <= request.deadline else dropped).append(request)
+                        if dropped:
+                            heapq.heapify(keep)
+                            lanes.queues[lane] = keep
+                            lanes.stats[lane].skipped += len(dropped)
+                            expired.extend(dropped)
+                self._condition.wait(0.1)
+            for request in expired:
+                if request.future.set_running_or_notify_cancel():
+                    request.future.set_exception(DeadlineExceededError())
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns:
+            dict[str, dict[str, Any]]: По имени класса парсера: workers, reserved, busy, estimate
+            (ожидаемое время parse() в секундах) и lanes — по полосам: queued, completed, failed,
+            skipped (завершены DeadlineExceededError), wait_p50 и wait_p95 (ожидание в очереди, с).
+        """
+        report = {}
+        with self._condition:
+            for parser_cls, lanes in self._lanes.items():
+                lane_report = {}
+                for lane in Lane:
+                    stats = lanes.stats[lane]
+                    waits = sorted(stats.waits)
+                    lane_report[lane.name.lower()] = {
+                        "queued": len(lanes.queues[lane]),
+                        "completed": stats.completed,
+                        "failed": stats.failed,
+                        "skipped": stats.skipped,
+                        "wait_p50": waits[int(len(waits) * 0.50)] if waits else 0.0,
+                        "wait_p95": waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else 0.0,
+                    }
+                report[parser_cls.__name__] = {
+                    "workers": lanes.workers,
+                    "reserved": lanes.reserved,
+                    "busy": lanes.busy_shared + lanes.busy_reserved,
+                    "estimate": lanes.estimate,
+                    "lanes": lane_report,
+                }
+        return report
+
+    def close(self, cancel_pending: bool = False) -> None:
+        """
+        Останавливает рабочих после выполнения поставленных запросов и закрывает парсеры.
+
+        Args:
+            cancel_pending (bool): Отменить запросы, ожидающие в очереди, вместо их выполнения.
+        """
+        with self._condition:
+            self._closed = True
+            pending = [request for lanes in self._lanes.values() for queue in lanes.queues.values()
+                       for request in queue]
+            if cancel_pending:
+                for lanes in self._lanes.values():
+                    for queue in lanes.queues.values():
+                        queue.clear()
+            self._condition.notify_all()
+        if cancel_pending:
+            for request in pending:
+                request.future.cancel()
+        else:
+            wait([request.future for request in pending])
+        for thread in self._threads:
+            thread.join()
+        self._expirer.join()
+
+    def __enter__(self) -> 'PriorityScheduler':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    portfolio = ["773605003662", "771412345602", "772500481155", "500100732259"] * 5
+    with PriorityScheduler({NpdParser: 3}, reserved=1, timeout=30, engine="http") as scheduler:
+        bulk = [scheduler.submit(NpdParser, inn, lane=Lane.BULK, deadline=600) for inn in portfolio]
+        try:
+            print(scheduler.parse(NpdParser, "500100732259", lane=Lane.INTERACTIVE, deadline=10))
+        except DeadlineExceededError as ex:
+            print(ex)
+        wait(bulk)
+        print(scheduler.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from base import BaseParser
+from exceptions import (
+    DataVerificationError, FieldFormatError, InnNotFoundError, LayoutDriftError, ServiceCaptchaError,
+    ServiceUnavailableError, UndefinedError
+)
+from validation import validate_arguments
+
+# Исключения, после которых запрос повторяется, а скорость запросов к сайту снижается
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (ServiceUnavailableError, ServiceCaptchaError)
+
+# Исключения parse(), означающие, что сайт ответил на запрос: учитываются как успешный запрос.
+# Прочие ошибки (падение браузера и т.п.) скорость не меняют
+ANSWERED_ERRORS: tuple[type[Exception], ...] = (
+    InnNotFoundError, DataVerificationError, FieldFormatError, UndefinedError, LayoutDriftError,
+)
+
+# Начальная скорость запросов к сайтам (запросов в секунду)
+HOST_RATES = {
+    "service.nalog.ru": 1.0,
+    "npd.nalog.ru": 2.0,
+    "kad.arbitr.ru": 0.5,
+}
+
+
+class HostLimiter:
+    """
+    Корзина токенов одного сайта с подстройкой скорости AIMD: каждый успешный запрос прибавляет
+    к скорости increase / rate (около increase запросов в секунду за секунду), сигнал ограничения
+    (капча, недоступность) умножает скорость на decrease, не чаще раза в decrease_interval секунд.
+    """
+
+    def __init__(
+            self,
+            rate: float = 1.0,
+            burst: int = 1,
+            min_rate: float = 0.05,
+            max_rate: float = 20.0,
+            increase: float = 0.1,
+            decrease: float = 0.5,
+            decrease_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            rate (float): Начальная скорость (запросов в секунду).
+            burst (int): Емкость корзины — сколько запросов можно отправить подряд без ожидания.
+            min_rate (float): Минимальная скорость.
+            max_rate (float): Максимальная скорость.
+            increase (float): Аддитивный прирост скорости (запросов в секунду за секунду).
+            decrease (float): Множитель скорости при сигнале ограничения.
+            decrease_interval (float): Минимальный интервал между снижениями скорости (в секундах),
+                чтобы ответы на уже отправленные запросы не снижали скорость повторно.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_interval = decrease_interval
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._decreased_at = float("-inf")
+        self._throttle_rates: deque[float] = deque(maxlen=10)
+        self._completed: deque[float] = deque(maxlen=1000)
+        self._successes = 0
+        self._throttles = 0
+
+    def acquire(self) -> float:
+        """
+        Резервирует токен и ожидает его (при нехватке токенов очередь соблюдается резервированием).
+
+        Returns:
+            float: Время ожидания (в секундах).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def on_success(self) -> None:
+        """Учитывает успешный запрос: аддитивно увеличивает скорость."""
+        with self._lock:
+            self._successes += 1
+            self._completed.append(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self) -> None:
+        """Учитывает сигнал ограничения: мультипликативно снижает скорость."""
+        with self._lock:
+            self._throttles += 1
+            now = time.monotonic()
+            if now - self._decreased_at < self.decrease_interval:
+                return
+            self._throttle_rates.append(self.rate)
+            self._decreased_at = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+
+    def safe_rate(self) -> Optional[float]:
+        """
+        Оценка устойчивой безопасной скорости: средняя скорость, при которой сайт начинал ограничивать
+        запросы, умноженная на decrease. None, если ограничений еще не было (предел не найден).
+        """
+        with self._lock:
+            if not self._throttle_rates:
+                return None
+            return sum(self._throttle_rates) / len(self._throttle_rates) * self.decrease
+
+    def stats(self, window: float = 60.0) -> dict[str, Any]:
+        """
+        Возвращает статистику сайта.
+
+        Args:
+            window (float): Окно для подсчета фактической скорости (в секундах).
+        Returns:
+            dict[str, Any]: rate (текущая скорость), safe_rate, achieved_rate (успешных запросов
+            в секунду за окно), successes, throttles.
+        """
+        safe_rate = self.safe_rate()
+        with self._lock:
+            since = time.monotonic() - window
+            recent = sum(1 for completed in self._completed if completed >= since)
+            return {
+                "rate": self.rate,
+                "safe_rate": safe_rate,
+                "achieved_rate": recent / window,
+                "successes": self._successes,
+                "throttles": self._throttles,
+            }
+
+
+class RateLimiter:
+    """
+    Планировщик запросов, общий для всех экземпляров парсеров процесса: корзина токенов на каждый
+    сайт (по хосту URL парсера) и повтор RETRYABLE_ERRORS с экспоненциальной задержкой и случайным
+    разбросом (full jitter).
+
+    Ограничения действуют в пределах процесса: рабочие процессы ParserExecutor получают свои
+    корзины, поэтому начальную скорость для них стоит делить на число рабочих.
+    """
+
+    def __init__(
+            self,
+            rates: Optional[dict[str, float]] = None,
+            max_retries: int = 3,
+            backoff_base: float = 1.0,
+            backoff_max: float = 60.0,
+            **limiter_kwargs,
+    ) -> None:
+        """
+        Args:
+            rates (Optional[dict[str, float]]): Начальная скорость по хостам (по-умолчанию HOST_RATES).
+            max_retries (int): Количество повторов после RETRYABLE_ERRORS.
+            backoff_base (float): Базовая задержка повтора (в секундах), удваивается с каждой попыткой.
+            backoff_max (float): Максимальная задержка повтора (в секундах).
+            **limiter_kwargs: Параметры HostLimiter (burst, min_rate, max_rate, increase, decrease, ...).
+        """
+        self.rates = dict(HOST_RATES if rates is None else rates)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limiter_kwargs = limiter_kwargs
+        self._lock = threading.Lock()
+        self._hosts: dict[str, HostLimiter] = {}
+
+    def for_url(self, url: str) -> HostLimiter:
+        """Возвращает корзину сайта по URL (создает при первом обращении)."""
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = self._hosts[host] = HostLimiter(rate=self.rates.get(host, 1.0), **self._limiter_kwargs)
+            return limiter
+
+    def backoff(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt (с нуля): случайная в [0, min(max, base * 2^attempt)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, parser: BaseParser, *args, **kwargs) -> Any:
+        """
+        Выполняет parser.parse(*args, **kwargs) с соблюдением скорости сайта и повтором RETRYABLE_ERRORS.
+        Входные данные проверяются до запроса: неверный формат не расходует токен и не влияет на скорость.
+
+        Raises:
+            FieldFormatError: Неверный формат данных.
+            Exception: Исключение parse() (для RETRYABLE_ERRORS — после исчерпания повторов).
+        """
+        validate_arguments(inspect.signature(parser.parse).bind(*args, **kwargs).arguments, parser.INN_LENGTHS)
+        limiter = self.for_url(parser.url)
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                result = parser.parse(*args, **kwargs)
+            except RETRYABLE_ERRORS:
+                limiter.on_throttle()
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                # Форма могла остаться в промежуточном состоянии — повтор начинается с чистой страницы
+                parser.reset()
+                continue
+            except ANSWERED_ERRORS:
+                limiter.on_success()
+                raise
+            limiter.on_success()
+            return result
+
+    def report(self, window: float = 60.0) -> dict[str, dict[str, Any]]:
+        """Возвращает статистику HostLimiter.stats() по всем сайтам."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limiter.stats(window) for host, limiter in hosts.items()}
+
+
+# Общий планировщик процесса
+LIMITER = RateLimiter()
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    with NpdParser(timeout=30, engine="http") as npd_parser:
+        for inn in ["500100732259", "773605003662", "771412345602"]:
+            try:
+                print(inn, LIMITER.call(npd_parser, inn=inn))
+            except Exception as ex:
+                print(inn, ex)
+    for host, stats in LIMITER.report().items():
+        print(host, stats)
+
+
+if __name__ == '__main__':
+    main()
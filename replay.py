@@ -0,0 +1,342 @@
+"""
+Запись ответов сайтов и воспроизведение без сети и браузера для регрессионной проверки разбора
+результатов.
+
+    python -m replay record --parser npd --engine http --input inns.csv --archive npd.jsonl.xz
+    python -m replay verify npd.jsonl.xz
+
+Recorder сохраняет для каждого вызова parse() входные данные, HTTP-обмен движка (engine="http"),
+итоговую страницу браузера с именем отображаемого элемента (outcome) и результат. Архив — JSONL
+в потоках xz: общая разметка страниц разных вызовов сжимается словарем, а каждый сеанс записи
+дописывается новым потоком.
+
+При воспроизведении parse() выполняется целиком, кроме работы с формой в браузере: HTTP-движок
+получает записанные ответы (ReplayTransport), а resolve() — записанный outcome и драйвер-снимок
+итоговой страницы (SnapshotDriver), поэтому проверяются ветвления resolve(), _parse_result(),
+_analyze_result() и разбор ответов HTTP-движков. Для парсеров на Selenium это единственная проверка:
+сетевой обмен браузера (в том числе через перехватчик CDP из browser_profile.py) не записывается,
+а begin() и _wait_for_response() при воспроизведении заменены, поэтому заполнение формы, клики
+и ожидание ответа архив не проверяет.
+"""
+import argparse
+import functools
+import inspect
+import json
+import lzma
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator, Optional
+
+from selenium.common import NoSuchElementException, TimeoutException
+
+from base import BaseParser, By
+from exceptions import LayoutDriftError
+from http_engine import EngineFallback, HtmlNode, HttpResponse, parse_html
+from results import ParseResult, Status
+
+
+class ReplayMismatchError(Exception):
+    """Запрос при воспроизведении не совпал с записанным (или записанные ответы закончились)."""
+
+
+class _Capture:
+    """Данные одного вызова parse(), собираемые Recorder."""
+
+    def __init__(self) -> None:
+        self.exchanges: list[dict[str, Any]] = []
+        self.outcome: Optional[str] = None
+        self.page: Optional[str] = None
+
+    def capture_page(self, page_source: str, outcome: Optional[str]) -> None:
+        """Вызывается BaseParser._wait_for_response() после ответа (outcome None — таймаут)."""
+        self.page = page_source
+        self.outcome = outcome
+
+    def wrap(self, transport: Any) -> Any:
+        """Оборачивает транспорт HTTP-движка, сохраняя запросы и ответы."""
+        def recording(method: str, url: str, fields: Optional[dict[str, str]], headers: dict[str, str],
+                      timeout: int | float) -> HttpResponse:
+            response = transport(method, url, fields, headers, timeout)
+            self.exchanges.append({
+                "method": method, "url": url, "fields": fields,
+                "status": response.status, "body": response.body, "cookies": list(response.cookies),
+            })
+            return response
+
+        return recording
+
+
+class Recorder:
+    """
+    Запись вызовов parse() в архив. Один экземпляр можно использовать из нескольких потоков
+    (каждый со своим парсером).
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Файл архива (.jsonl.xz). Существующий архив дополняется.
+        """
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = lzma.open(path, "at", encoding="utf-8")
+
+    def parse(self, parser: BaseParser, *args, **kwargs) -> ParseResult:
+        """
+        Выполняет parser.parse_result(*args, **kwargs) и записывает вызов.
+
+        Returns:
+            ParseResult: Результат вызова.
+        """
+        arguments = dict(inspect.signature(parser.parse).bind(*args, **kwargs).arguments)
+        capture = _Capture()
+        engine = getattr(parser, "_http_engine", None)
+        parser.recorder = capture
+        if engine is not None:
+            transport = engine.transport
+            engine.transport = capture.wrap(transport)
+        try:
+            result = parser.parse_result(**arguments)
+        finally:
+            parser.recorder = None
+            if engine is not None:
+                engine.transport = transport
+
+        parser_cls = type(parser)
+        record = {
+            "parser": f"{parser_cls.__module__}:{parser_cls.__qualname__}",
+            "engine": "http" if engine is not None else "selenium",
+            "arguments": arguments,
+            "exchanges": capture.exchanges,
+            "outcome": capture.outcome,
+            "page": capture.page,
+            "status": result.status.value,
+            "value": result.value,
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+        return result
+
+    def close(self) -> None:
+        """Завершает поток xz архива."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'Recorder':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def load_cases(path: str) -> Iterator[dict[str, Any]]:
+    """Лениво читает записанные вызовы из архива."""
+    with lzma.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class SnapshotElement:
+    """Элемент снимка страницы с интерфейсом WebElement, достаточным для разбора результатов."""
+
+    def __init__(self, node: HtmlNode) -> None:
+        self._node = node
+
+    @property
+    def text(self) -> str:
+        return self._node.text()
+
+    @property
+    def tag_name(self) -> str:
+        return self._node.tag
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self._node.attrs.get(name)
+
+    def is_displayed(self) -> bool:
+        return self._node.is_displayed()
+
+
+class SnapshotDriver:
+    """
+    Драйвер-снимок итоговой страницы: поиск элементов по ID, XPATH вида //*[@id="..."]/tag[n],
+    простым CSS_SELECTOR (см. HtmlNode.select), CLASS_NAME, NAME и TAG_NAME. Скрипты не выполняются.
+    """
+
+    def __init__(self, page: Optional[str]) -> None:
+        self.page_source = page or ""
+        self._document = parse_html(self.page_source)
+
+    def find_elements(self, by: str, value: str) -> list[SnapshotElement]:
+        nodes = self._document.iter()
+        if by == By.ID:
+            selected = [node for node in nodes if node.attrs.get("id") == value]
+        elif by == By.XPATH:
+            try:
+                node = self._document.xpath(value)
+            except EngineFallback as ex:
+                raise ReplayMismatchError(str(ex))
+            selected = [node] if node is not None else []
+        elif by == By.CSS_SELECTOR:
+            try:
+                selected = self._document.select(value)
+            except EngineFallback as ex:
+                raise ReplayMismatchError(str(ex))
+        elif by == By.CLASS_NAME:
+            selected = [node for node in nodes if value in node.attrs.get("class", "").split()]
+        elif by == By.NAME:
+            selected = [node for node in nodes if node.attrs.get("name") == value]
+        elif by == By.TAG_NAME:
+            selected = [node for node in nodes if node.tag == value]
+        else:
+            raise ReplayMismatchError(f"Неподдерживаемая стратегия поиска: {by}")
+        return [SnapshotElement(node) for node in selected]
+
+    def find_element(self, by: str, value: str) -> SnapshotElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+    def execute_script(self, script: str, *args) -> None:
+        return None
+
+    def quit(self) -> None:
+        pass
+
+
+class ReplayTransport:
+    """Транспорт HTTP-движка, отвечающий записанными ответами по порядку (метод и URL сверяются)."""
+
+    def __init__(self, exchanges: list[dict[str, Any]]) -> None:
+        self._exchanges = deque(exchanges)
+
+    def __call__(self, method: str, url: str, fields: Optional[dict[str, str]], headers: dict[str, str],
+                 timeout: int | float) -> HttpResponse:
+        if not self._exchanges:
+            raise ReplayMismatchError(f"Нет записанного ответа на {method} {url}")
+        exchange = self._exchanges.popleft()
+        if exchange["method"] != method or exchange["url"] != url:
+            raise ReplayMismatchError(f"Ожидался {exchange['method']} {exchange['url']}, получен {method} {url}")
+        return HttpResponse(exchange["status"], exchange["body"], tuple(exchange["cookies"]))
+
+
+def _replay_begin(self, *args, **kwargs) -> None:
+    """Форма не заполняется: ответ уже записан."""
+
+
+def _replay_wait_for_response(self) -> str:
+    """Возвращает записанный outcome (None — записанный таймаут или изменение разметки)."""
+    if self.replay_outcome is None:
+        raise LayoutDriftError(type(self).__name__) if self.replay_drift else TimeoutException
+    return self.replay_outcome
+
+
+@functools.cache
+def replay_class(parser_cls: type[BaseParser]) -> type[BaseParser]:
+    """Подкласс парсера, в котором отправка формы и ожидание ответа заменены записанным исходом."""
+    return type(parser_cls.__name__, (parser_cls,), {
+        "begin": _replay_begin,
+        "_wait_for_response": _replay_wait_for_response,
+        "replay_outcome": None,
+        "replay_drift": False,
+    })
+
+
+def replay_case(case: dict[str, Any]) -> ParseResult:
+    """
+    Воспроизводит записанный вызов parse() без сети и браузера.
+
+    Returns:
+        ParseResult: Результат воспроизведения (ReplayMismatchError — Status.ERROR).
+    """
+    from cli import load_parser
+
+    parser_cls = load_parser(case["parser"])
+    kwargs = {}
+    if "engine" in inspect.signature(parser_cls.__init__).parameters:
+        kwargs["engine"] = case["engine"]
+    parser = replay_class(parser_cls)(timeout=1, headless=True, driver=SnapshotDriver(case["page"]), **kwargs)
+    parser.replay_outcome = case["outcome"]
+    parser.replay_drift = case["status"] == Status.LAYOUT_DRIFT.value
+    engine = getattr(parser, "_http_engine", None)
+    if engine is not None:
+        engine.transport = ReplayTransport(case["exchanges"])
+    return parser.parse_result(**case["arguments"])
+
+
+def verify(path: str) -> dict[str, Any]:
+    """
+    Воспроизводит все вызовы архива и сравнивает статус и значение с записанными.
+
+    Returns:
+        dict[str, Any]: cases, passed, failed (список расхождений: parser, arguments, expected,
+        actual), seconds.
+    """
+    started = time.perf_counter()
+    cases = passed = 0
+    failed = []
+    for case in load_cases(path):
+        cases += 1
+        result = replay_case(case)
+        if result.status is Status(case["status"]) and result.value == case["value"]:
+            passed += 1
+        else:
+            failed.append({
+                "parser": case["parser"], "arguments": case["arguments"],
+                "expected": {"status": case["status"], "value": case["value"]},
+                "actual": {"status": result.status.value, "value": result.value},
+            })
+    return {"cases": cases, "passed": passed, "failed": failed, "seconds": time.perf_counter() - started}
+
+
+def main():
+    from cli import PARSERS, engine_arguments, load_parser, make_item, parse_arguments, read_rows
+
+    argparser = argparse.ArgumentParser(prog="python -m replay", description="Запись и воспроизведение ответов сайтов")
+    commands = argparser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Выполнить запросы из входного файла и записать их")
+    record_parser.add_argument("--parser", required=True,
+                               help=f"{', '.join(PARSERS)} или путь к классу вида модуль:Класс")
+    record_parser.add_argument("--input", required=True, help="CSV с заголовком или JSONL")
+    record_parser.add_argument("--archive", required=True, help="Архив .jsonl.xz (дописывается)")
+    record_parser.add_argument("--column", help="Колонка входа для парсеров с одним аргументом")
+    record_parser.add_argument("--engine", choices=("selenium", "http"), help="Движок NpdParser и RomParser")
+    record_parser.add_argument("--timeout", default=30, type=float, help="Таймаут ожидания элементов (с)")
+    record_parser.add_argument("--no-headless", dest="headless", action="store_false")
+
+    verify_parser = commands.add_parser("verify", help="Воспроизвести архив и сравнить результаты")
+    verify_parser.add_argument("archive")
+
+    args = argparser.parse_args()
+    if args.command == "record":
+        parser_cls = load_parser(args.parser)
+        arguments = parse_arguments(parser_cls)
+        try:
+            parser_kwargs = engine_arguments(parser_cls, args.engine)
+        except ValueError as ex:
+            argparser.error(str(ex))
+        with Recorder(args.archive) as recorder, \
+                parser_cls(timeout=args.timeout, headless=args.headless, **parser_kwargs) as parser:
+            for row in read_rows(args.input):
+                result = recorder.parse(parser, **make_item(row, arguments, args.column))
+                print(result.status.value, result.value, file=sys.stderr)
+        print(f"записано {recorder.count}", file=sys.stderr)
+    else:
+        report = verify(args.archive)
+        for failure in report["failed"]:
+            print(json.dumps(failure, ensure_ascii=False))
+        print(f"{report['passed']}/{report['cases']} совпадают за {report['seconds']:.2f} с", file=sys.stderr)
+        sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+from exceptions import (
+    UndefinedError, ServiceUnavailableError, FieldFormatError,
+    DataVerificationError, InnNotFoundError, ServiceCaptchaError, LayoutDriftError,
+    DeadlineExceededError
+)
+
+
+class Status(Enum):
+    """Исход запроса к сервису."""
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    UNVERIFIED = "unverified"
+    INVALID_INPUT = "invalid_input"
+    CAPTCHA = "captcha"
+    UNAVAILABLE = "unavailable"
+    LAYOUT_DRIFT = "layout_drift"
+    DEADLINE_EXCEEDED = "deadline_exceeded"
+    UNDEFINED = "undefined"
+    ERROR = "error"
+
+
+# Исключения parse() -> статус
+ERROR_STATUSES: dict[type[Exception], Status] = {
+    InnNotFoundError: Status.NOT_FOUND,
+    DataVerificationError: Status.UNVERIFIED,
+    FieldFormatError: Status.INVALID_INPUT,
+    ServiceCaptchaError: Status.CAPTCHA,
+    ServiceUnavailableError: Status.UNAVAILABLE,
+    LayoutDriftError: Status.LAYOUT_DRIFT,
+    DeadlineExceededError: Status.DEADLINE_EXCEEDED,
+    UndefinedError: Status.UNDEFINED,
+}
+
+
+def status_of(error_type: Optional[type[BaseException]]) -> Status:
+    """Возвращает статус по типу исключения parse() (None — успешный результат)."""
+    if error_type is None:
+        return Status.OK
+    for cls in error_type.__mro__:
+        status = ERROR_STATUSES.get(cls)
+        if status is not None:
+            return status
+    return Status.ERROR
+
+
+@dataclass(slots=True, frozen=True)
+class ParseResult:
+    """
+    Результат запроса к сервису без исключений: статус, значение parse() (bool или str, только для
+    Status.OK), длительность запроса в секундах и источник (имя класса парсера).
+    """
+    status: Status
+    value: Any = None
+    duration: float = 0.0
+    source: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status is Status.OK
+
+    def unwrap(self) -> Any:
+        """
+        Возвращает значение или возбуждает исключение, соответствующее статусу (как parse()).
+
+        Raises:
+            Exception: Исключение из ERROR_STATUSES (для Status.ERROR — UndefinedError).
+        """
+        if self.status is Status.OK:
+            return self.value
+        for error_type, status in ERROR_STATUSES.items():
+            if status is self.status:
+                raise error_type
+        raise UndefinedError
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"status": self.status.value, "value": self.value, "duration": self.duration, "source": self.source}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ParseResult':
+        return cls(Status(data["status"]), data.get("value"), data.get("duration", 0.0), data.get("source", ""))
+
+
+def dump_jsonl(results: Iterable[ParseResult], file: TextIO) -> int:
+    """
+    Записывает результаты в файл по одному JSON на строку.
+
+    Returns:
+        int: Количество записанных результатов.
+    """
+    count = 0
+    for result in results:
+        file.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def load_jsonl(file: TextIO) -> Iterator[ParseResult]:
+    """Лениво читает результаты, записанные dump_jsonl()."""
+    for line in file:
+        if line.strip():
+            yield ParseResult.from_dict(json.loads(line))
+
+
+def to_arrow(results: Iterable[ParseResult]) -> Any:
+    """
+    Собирает результаты в таблицу pyarrow: status и source — словарные столбцы, duration — float32,
+    value — столбец с типом, выведенным из значений (bool или string).
+
+    Raises:
+        ImportError: pyarrow не установлен.
+    """
+    import pyarrow as pa
+
+    statuses, values, durations, sources = [], [], [], []
+    for result in results:
+        statuses.append(result.status.value)
+        values.append(result.value)
+        durations.append(result.duration)
+        sources.append(result.source)
+    return pa.table({
+        "status": pa.array(statuses, pa.string()).dictionary_encode(),
+        "value": pa.array(values),
+        "duration": pa.array(durations, pa.float32()),
+        "source": pa.array(sources, pa.string()).dictionary_encode(),
+    })
+
+
+def from_arrow(table: Any) -> Iterator[ParseResult]:
+    """Лениво читает результаты из таблицы, собранной to_arrow()."""
+    for batch in table.to_batches():
+        columns = [batch.column(name).to_pylist() for name in ("status", "value", "duration", "source")]
+        for status, value, duration, source in zip(*columns):
+            yield ParseResult(Status(status), value, duration, source)
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    with NpdParser(timeout=30, engine="http") as npd_parser:
+        results = [npd_parser.parse_result(inn) for inn in ["500100732259", "773605003662", "123"]]
+    for result in results:
+        print(result)
+    with open("results.jsonl", "w", encoding="utf-8") as file:
+        dump_jsonl(results, file)
+
+
+if __name__ == '__main__':
+    main()
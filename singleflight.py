@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from base import BaseParser
+from cache import parse_key
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых запросов: пока выполняется вызов с некоторым ключом, новые
+    вызовы с тем же ключом не запускают свой, а ожидают результат (или исключение) уже идущего.
+    Результаты не сохраняются — после завершения вызова следующий запрос выполняется заново
+    (для хранения результатов см. ResultCache).
+
+    Работает одновременно для потоков и циклов событий asyncio: общий вызов представлен
+    concurrent.futures.Future, асинхронные вызывающие ожидают его через asyncio.wrap_future.
+    Отмена или таймаут одного из ожидающих не прерывают общий вызов.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._executions = 0
+        self._coalesced = 0
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        """Возвращает (future вызова, True — вызывающий выполняет вызов сам)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            # Состояние RUNNING: отмена ожидающими (в том числе через wrap_future) невозможна
+            future.set_running_or_notify_cancel()
+            self._executions += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        # Ключ снимается до публикации результата: запросы после завершения выполняются заново
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Выполняет fn(*args, **kwargs) в текущем потоке или ожидает уже идущий вызов с тем же ключом.
+
+        Raises:
+            Exception: Исключение общего вызова.
+        """
+        future, leader = self._join(key)
+        if leader:
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as ex:
+                self._finish(key, future, error=ex)
+                raise
+            self._finish(key, future, result)
+            return result
+        return future.result()
+
+    async def do_async(self, key: str, fn: Callable[..., Any], *args,
+                       call_timeout: Optional[int | float] = None, **kwargs) -> Any:
+        """
+        Асинхронный вариант do(). Корутинная функция fn выполняется отдельной задачей в цикле событий
+        первого вызывающего, обычная — в пуле потоков цикла.
+
+        Args:
+            call_timeout (Optional[int | float]): Таймаут ожидания этого вызывающего (в секундах).
+                Общий вызов продолжается и после таймаута, его результат получат остальные.
+        Raises:
+            asyncio.TimeoutError: Вызов не завершился за call_timeout секунд.
+            Exception: Исключение общего вызова.
+        """
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            if inspect.iscoroutinefunction(fn):
+                task = loop.create_task(self._lead(key, future, fn, args, kwargs))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                loop.run_in_executor(None, self._lead_sync, key, future, fn, args, kwargs)
+        return await asyncio.wait_for(asyncio.wrap_future(future), call_timeout)
+
+    async def _lead(self, key: str, future: Future, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as ex:
+            self._finish(key, future, error=ex)
+            if not isinstance(ex, Exception):
+                raise
+            return
+        self._finish(key, future, result)
+
+    def _lead_sync(self, key: str, future: Future, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as ex:
+            self._finish(key, future, error=ex)
+            return
+        self._finish(key, future, result)
+
+    def parse(self, parser: BaseParser, *args, **kwargs) -> Any:
+        """
+        Выполняет parser.parse(*args, **kwargs), объединяя одновременные вызовы одного класса парсера
+        с одинаковыми нормализованными данными (см. parse_key).
+
+        Raises:
+            FieldFormatError: Неверный формат данных (проверяется до объединения).
+            Exception: Исключение parse().
+        """
+        return self.do(parse_key(type(parser), args, kwargs), parser.parse, *args, **kwargs)
+
+    async def parse_async(self, parser: Any, *args, call_timeout: Optional[int | float] = None, **kwargs) -> Any:
+        """
+        Асинхронный вариант parse() для AsyncBaseParser: ключ строится по классу parser.PARSER, поэтому
+        асинхронные вызовы объединяются и с синхронными вызовами parse() в других потоках.
+
+        Raises:
+            asyncio.TimeoutError: Вызов не завершился за call_timeout секунд.
+            FieldFormatError: Неверный формат данных.
+            Exception: Исключение parse().
+        """
+        key = parse_key(parser.PARSER, args, kwargs)
+        return await self.do_async(key, parser.parse, *args, call_timeout=call_timeout, **kwargs)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            dict[str, int]: executions (выполненных вызовов), coalesced (вызовов, получивших чужой
+            результат), in_flight (выполняется сейчас).
+        """
+        with self._lock:
+            return {"executions": self._executions, "coalesced": self._coalesced, "in_flight": len(self._calls)}
+
+
+# Общий объединитель запросов процесса
+FLIGHTS = SingleFlight()
+
+
+# Пример использования
+def main():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from parser_npd import NpdParser
+
+    parsers = [NpdParser(timeout=30, engine="http") for _ in range(4)]
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(FLIGHTS.parse, parser, "5001 0073 2259") for parser in parsers]
+            print([future.result() for future in futures])
+    finally:
+        for parser in parsers:
+            parser.close()
+    print(FLIGHTS.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Общие фикстуры: локальные копии сайтов (benchmarks/mock_sites.py), парсеры, направленные на них,
+и парсеры без браузера с заданными исходами parse().
+
+Запуск из корня репозитория: python -m pytest
+"""
+from typing import Any, Optional
+
+import pytest
+
+from base import BaseParser
+from benchmarks.mock_sites import MockSites
+from parser_npd import NpdParser
+from parser_rom import RomParser
+
+
+@pytest.fixture(scope="session")
+def sites():
+    with MockSites(port=0) as sites:
+        yield sites
+
+
+@pytest.fixture
+def clean_sites(sites):
+    """Сервер без внедряемых капчи и ошибок; тест может изменить доли, они восстанавливаются после теста."""
+    sites.captcha_rate = sites.error_rate = 0.0
+    yield sites
+    sites.captcha_rate = sites.error_rate = 0.0
+
+
+@pytest.fixture(scope="session")
+def npd_parser_cls(sites):
+    return type("LocalNpdParser", (NpdParser,), {"URL": f"{sites.base_url}/check-status/"})
+
+
+@pytest.fixture(scope="session")
+def rom_parser_cls(sites):
+    return type("LocalRomParser", (RomParser,), {"URL": f"{sites.base_url}/rom/"})
+
+
+class ScriptedParser(BaseParser):
+    """
+    Парсер без браузера: исход parse() для ИНН берется из outcomes — значение, класс исключения или
+    список исходов последовательных вызовов (последний повторяется). Остальные ИНН возвращают True.
+    """
+    outcomes: dict[str, Any] = {}
+
+    def __init__(self, timeout: int | float = 1, headless: bool = True, driver: Optional[Any] = None) -> None:
+        super().__init__("http://scripted.test/", timeout, headless, driver, lazy=True)
+        self.calls: list[str] = []
+
+    def parse(self, inn: str) -> Any:
+        self.calls.append(inn)
+        outcome = self.outcomes.get(inn, True)
+        if isinstance(outcome, list):
+            outcome = outcome.pop(0) if len(outcome) > 1 else outcome[0]
+        if isinstance(outcome, type) and issubclass(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def scripted_parser():
+    """Фабрика ScriptedParser: make(outcomes, **атрибуты класса) -> парсер."""
+    def make(outcomes: Optional[dict[str, Any]] = None, **attributes) -> ScriptedParser:
+        parser_cls = type("ScriptedParser", (ScriptedParser,), {"outcomes": dict(outcomes or {}), **attributes})
+        return parser_cls()
+
+    return make
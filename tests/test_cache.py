@@ -0,0 +1,103 @@
+"""
+ResultCache (cache.py): ключи по нормализованным аргументам, время жизни, отрицательное кэширование
+и дисковый уровень.
+"""
+import time
+
+import pytest
+
+from cache import ResultCache, parse_key
+from exceptions import FieldFormatError, InnNotFoundError, ServiceUnavailableError
+
+INN = "7707083893"
+
+
+@pytest.fixture
+def cache():
+    cache = ResultCache()
+    yield cache
+    cache.close()
+
+
+def test_key_normalizes_arguments(scripted_parser):
+    parser_cls = type(scripted_parser())
+    assert parse_key(parser_cls, (INN,), {}) == parse_key(parser_cls, (), {"inn": " 7707 083 893\r\n"})
+    with pytest.raises(FieldFormatError):
+        parse_key(parser_cls, ("7707083894",), {})
+
+
+def test_hit_skips_parse(cache, scripted_parser):
+    parser = scripted_parser({INN: "значение"})
+    assert cache.parse(parser, INN) == "значение"
+    assert cache.parse(parser, inn="7707-083-893") == "значение"
+    assert parser.calls == [INN]
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_entry_expires_after_ttl(cache, scripted_parser):
+    parser = scripted_parser({INN: [1, 2]}, CACHE_TTL=0.05)
+    assert cache.parse(parser, INN) == 1
+    assert cache.parse(parser, INN) == 1
+    time.sleep(0.1)
+    assert cache.parse(parser, INN) == 2
+    assert len(parser.calls) == 2
+
+
+def test_negative_result_cached_with_own_ttl(cache, scripted_parser):
+    parser = scripted_parser({INN: InnNotFoundError}, NEGATIVE_CACHE_TTL=0.05)
+    for _ in range(2):
+        with pytest.raises(InnNotFoundError):
+            cache.parse(parser, INN)
+    assert len(parser.calls) == 1
+    time.sleep(0.1)
+    with pytest.raises(InnNotFoundError):
+        cache.parse(parser, INN)
+    assert len(parser.calls) == 2
+
+
+def test_negative_caching_disabled_by_zero_ttl(cache, scripted_parser):
+    parser = scripted_parser({INN: InnNotFoundError}, NEGATIVE_CACHE_TTL=0)
+    for _ in range(2):
+        with pytest.raises(InnNotFoundError):
+            cache.parse(parser, INN)
+    assert len(parser.calls) == 2
+
+
+def test_temporary_errors_not_cached(cache, scripted_parser):
+    parser = scripted_parser({INN: [ServiceUnavailableError, True]})
+    with pytest.raises(ServiceUnavailableError):
+        cache.parse(parser, INN)
+    assert cache.parse(parser, INN) is True
+    assert len(parser.calls) == 2
+
+
+def test_invalid_input_rejected_before_parse(cache, scripted_parser):
+    parser = scripted_parser()
+    with pytest.raises(FieldFormatError):
+        cache.parse(parser, "123")
+    assert parser.calls == []
+
+
+def test_disk_tier_shared_between_instances(tmp_path, scripted_parser):
+    path = str(tmp_path / "cache.sqlite3")
+    parser = scripted_parser({INN: "с диска"})
+    first = ResultCache(path)
+    first.parse(parser, INN)
+    first.close()
+
+    second = ResultCache(path)
+    assert second.parse(parser, INN) == "с диска"
+    assert second.stats()["disk_hits"] == 1
+    assert parser.calls == [INN]
+    second.close()
+
+
+def test_memory_tier_is_lru(scripted_parser):
+    cache = ResultCache(max_items=2)
+    parser = scripted_parser()
+    inns = ["7707083893", "500100732259", "7736050003"]
+    for inn in inns:
+        cache.parse(parser, inn)
+    assert cache.stats()["size"] == 2
+    cache.parse(parser, inns[0])
+    assert parser.calls == inns + [inns[0]]
@@ -0,0 +1,102 @@
+"""
+Пакетная обработка (cli.py): дедупликация, отсев неверного формата, возобновление по выходному файлу
+и статистика. Рабочие процессы ParserExecutor импортируют CliParser из этого модуля.
+"""
+import argparse
+import json
+
+import pytest
+
+from base import BaseParser
+from cli import Progress, engine_arguments, item_key, load_done, run
+from exceptions import InnNotFoundError
+from parser_arbitr import ArbitrParser
+from parser_npd import NpdParser
+
+FOUND = "7707083893"
+NOT_FOUND = "500100732259"
+
+
+class CliParser(BaseParser):
+    """Парсер без браузера: ИНН, оканчивающиеся на 9, не найдены."""
+
+    def __init__(self, timeout: int | float = 1, headless: bool = True) -> None:
+        super().__init__("http://scripted.test/", timeout, headless, lazy=True)
+
+    def parse(self, inn: str) -> bool:
+        if inn.endswith("9"):
+            raise InnNotFoundError
+        return True
+
+
+def run_file(tmp_path, rows: list[str]) -> tuple[Progress, list[dict]]:
+    input_path = tmp_path / "inns.csv"
+    input_path.write_text("inn\n" + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+    output_path = tmp_path / "results.jsonl"
+    args = argparse.Namespace(
+        parser=f"{__name__}:CliParser", input=str(input_path), output=str(output_path), workers=1,
+        column=None, engine=None, timeout=1, headless=True, stats_interval=3600.0,
+    )
+    progress = run(args)
+    records = []
+    for line in output_path.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # Недописанная строка прошлого запуска остается в файле, cli.load_done ее пропускает
+            continue
+    return progress, records
+
+
+def key(inn: str) -> str:
+    return item_key({"inn": inn})
+
+
+def test_run_dedups_and_rejects_invalid_input(tmp_path):
+    progress, records = run_file(tmp_path, [FOUND, '"7707 083 893"', "123", NOT_FOUND])
+    assert [(record["key"], record["status"]) for record in records] == [
+        (key(FOUND), "ok"), (key("123"), "invalid_input"), (key(NOT_FOUND), "not_found"),
+    ]
+    assert records[0]["result"] is True and records[0]["input"] == {"inn": FOUND}
+    assert progress.duplicates == 1 and progress.processed == 3
+    assert progress.statuses == {"ok": 1, "invalid_input": 1, "not_found": 1}
+
+
+def test_resume_skips_final_records_and_retries_temporary_errors(tmp_path):
+    previous = [
+        {"key": key(FOUND), "status": "ok", "result": True},
+        {"key": key(NOT_FOUND), "status": "unavailable", "result": None},
+    ]
+    output = tmp_path / "results.jsonl"
+    # Последняя строка недописана при аварийной остановке
+    output.write_text("".join(json.dumps(record) + "\n" for record in previous) + '{"key": "', encoding="utf-8")
+
+    progress, records = run_file(tmp_path, [FOUND, NOT_FOUND])
+    assert progress.skipped == 1 and progress.processed == 1
+    assert records[-1]["key"] == key(NOT_FOUND) and records[-1]["status"] == "not_found"
+    assert load_done(str(output), {"unavailable"}) == {key(FOUND), key(NOT_FOUND)}
+
+
+def test_load_done_keeps_last_record_per_key(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text("\n".join(json.dumps(record) for record in [
+        {"key": "a", "status": "ok"}, {"key": "a", "status": "captcha"}, {"key": "b", "status": "not_found"},
+    ]) + "\n", encoding="utf-8")
+    assert load_done(str(output), {"captcha", "unavailable"}) == {"b"}
+
+
+def test_progress_stats(capsys):
+    progress = Progress(interval=3600.0)
+    for status in ["ok", "ok", "not_found", "ok"]:
+        progress.record(status)
+    progress.duplicates = 2
+    progress.print()
+    line = capsys.readouterr().err
+    assert "обработано 4" in line and "ошибок 25.0%" in line and "дубликатов 2" in line
+
+
+def test_engine_option_only_for_parsers_that_accept_it():
+    assert engine_arguments(NpdParser, "http") == {"engine": "http"}
+    assert engine_arguments(ArbitrParser, None) == {}
+    with pytest.raises(ValueError):
+        engine_arguments(ArbitrParser, "http")
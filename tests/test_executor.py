@@ -0,0 +1,68 @@
+"""
+ParserExecutor: рабочий, парсер которого не создался, запускается заново с задержкой, а исполнитель
+закрывается, только если не запускается ни один рабочий. Парсер этих тестов не открывает браузер.
+"""
+import os
+
+import pytest
+
+from base import BaseParser
+from executor import ParserExecutor
+
+
+class FlakyParser(BaseParser):
+    """Парсер, конструктор которого первые fail_times раз (во всех процессах) возбуждает ConnectionError."""
+
+    def __init__(self, timeout: int | float, headless: bool = True, marker: str = "", fail_times: int = 1) -> None:
+        for attempt in range(fail_times):
+            try:
+                os.close(os.open(f"{marker}.{attempt}", os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                continue
+            raise ConnectionError("chromedriver не запустился")
+        super().__init__("about:blank", timeout, headless, lazy=True)
+        self.marker = marker
+
+    def parse(self, value: int) -> int:
+        # Отрицательное значение один раз завершает рабочий процесс, как упавший браузер
+        if value < 0:
+            try:
+                os.close(os.open(f"{self.marker}.crash", os.O_CREAT | os.O_EXCL))
+                os._exit(1)
+            except FileExistsError:
+                pass
+        return value * 2
+
+
+class FastRetryExecutor(ParserExecutor):
+    START_ATTEMPTS = 2
+    START_BACKOFF = 0.05
+
+
+def test_worker_restarted_after_failed_start(tmp_path):
+    with FastRetryExecutor(FlakyParser, workers=1, marker=str(tmp_path / "start"), fail_times=1) as executor:
+        futures = [executor.submit(value) for value in range(5)]
+        # Первое задание было выдано рабочему, который не запустился
+        assert isinstance(futures[0].exception(timeout=60), ConnectionError)
+        assert [future.result(timeout=60) for future in futures[1:]] == [2, 4, 6, 8]
+        assert executor.submit(10).result(timeout=60) == 20
+        stats = executor.stats()
+    assert stats["restarts"] >= 1
+    assert stats["completed"] == 5 and stats["failed"] == 1
+
+
+def test_crashed_worker_restarted_and_job_retried(tmp_path):
+    with FastRetryExecutor(FlakyParser, workers=1, marker=str(tmp_path / "start"), fail_times=0) as executor:
+        assert executor.submit(-1).result(timeout=60) == -2
+        assert executor.submit(3).result(timeout=60) == 6
+        assert executor.stats()["restarts"] == 1
+
+
+def test_closed_when_no_worker_starts(tmp_path):
+    executor = FastRetryExecutor(FlakyParser, workers=2, marker=str(tmp_path / "start"), fail_times=100)
+    futures = [executor.submit(value) for value in range(4)]
+    for future in futures:
+        assert isinstance(future.exception(timeout=60), ConnectionError)
+    with pytest.raises(RuntimeError):
+        executor.submit(5)
+    executor.close()
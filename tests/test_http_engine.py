@@ -0,0 +1,218 @@
+"""
+Движок engine="http" возвращает те же значения и исключения, что и разбор страницы браузера (resolve()).
+
+Ответы отдает benchmarks/mock_sites.py. Сторона браузера проверяется без Chrome: итоговая страница
+открывается драйвером-снимком (replay.SnapshotDriver), исход определяется так же, как find_outcome
+(первый отображаемый элемент ERRORS, затем RESULTS), и передается в resolve(). Если браузер не увидел
+бы ни одного элемента, parse() завершился бы по таймауту ServiceUnavailableError.
+"""
+import json
+import re
+from typing import Any, Callable, Optional
+
+import pytest
+
+from benchmarks.mock_parsers import valid_inn
+from benchmarks.mock_sites import ROM_PAGE
+from exceptions import FieldFormatError, ServiceUnavailableError
+from http_engine import EngineFallback, HttpResponse
+from locators import compile_registry
+from replay import SnapshotDriver
+
+
+def inn_ending(parity: int) -> str:
+    """ИНН с верными контрольными цифрами и последней цифрой заданной четности (см. mock_sites)."""
+    return next(inn for inn in (valid_inn(f"{5001007300 + index}") for index in range(100))
+                if int(inn[-1]) % 2 == parity)
+
+
+FOUND_INN = inn_ending(0)
+NOT_FOUND_INN = inn_ending(1)
+
+
+def outcome_of(call: Callable[[], Any]) -> tuple[str, Any]:
+    """("value", значение) или ("error", класс исключения)."""
+    try:
+        return "value", call()
+    except Exception as ex:
+        return "error", type(ex)
+
+
+def displayed_outcome(parser_cls: type, page: str) -> Optional[str]:
+    """Имя первого отображаемого элемента ERRORS, затем RESULTS — как BaseParser.find_outcome."""
+    driver = SnapshotDriver(page)
+    for registry in (parser_cls.ERRORS, parser_cls.RESULTS):
+        for name, candidates in compile_registry(registry).items():
+            if any(element.is_displayed() for by, value in candidates for element in driver.find_elements(by, value)):
+                return name
+    return None
+
+
+def browser_outcome(parser_cls: type, page: str) -> tuple[str, Any]:
+    """Результат parse() в браузере, остановившемся на странице page."""
+    outcome = displayed_outcome(parser_cls, page)
+    if outcome is None:
+        return "error", ServiceUnavailableError
+    parser = parser_cls(timeout=1, driver=SnapshotDriver(page))
+    return outcome_of(lambda: parser.resolve(outcome))
+
+
+def http_parser(parser_cls: type, rewrite: Optional[Callable[[str], str]] = None) -> tuple[Any, list[HttpResponse]]:
+    """
+    Парсер с движком http, сохраняющий ответы сервера. rewrite изменяет тело ответа на отправку формы.
+    """
+    parser = parser_cls(timeout=5, engine="http")
+    engine = parser._http_engine
+    transport = engine.transport
+    responses: list[HttpResponse] = []
+
+    def capturing(method: str, url: str, fields: Optional[dict[str, str]], headers: dict[str, str],
+                  timeout: int | float) -> HttpResponse:
+        response = transport(method, url, fields, headers, timeout)
+        if rewrite is not None and method != "GET":
+            response = HttpResponse(response.status, rewrite(response.body), response.cookies)
+        responses.append(response)
+        return response
+
+    engine.transport = capturing
+    return parser, responses
+
+
+def npd_outcomes(parser_cls: type, inn: str, rewrite: Optional[Callable[[str], str]] = None):
+    parser, responses = http_parser(parser_cls, rewrite)
+    http = outcome_of(lambda: parser._analyze_result(parser._http_engine.get_result_text(inn, parser._current_date())))
+    return http, browser_outcome(parser_cls, responses[-1].body)
+
+
+def rom_browser_page(body: str) -> str:
+    """
+    Страница реестра после выполнения скрипта search() с ответом body: элементы, которые скрипт не
+    показал, скрыты inline-стилем (SnapshotDriver не применяет CSS-классы).
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = {}
+    shown = set()
+    if isinstance(payload, dict) and not payload.get("captchaRequired"):
+        if payload.get("ERRORS"):
+            shown.add("field-errors")
+        elif isinstance(payload.get("rows"), list):
+            shown.add("pnlData" if payload["rows"] else "pnlNoData")
+    page = ROM_PAGE
+    for marker, visible, name in (
+            ('class="field-errors hidden"', 'class="field-errors"', "field-errors"),
+            ('id="pnlNoData" class="hidden"', 'id="pnlNoData"', "pnlNoData"),
+            ('id="pnlData" class="hidden"', 'id="pnlData"', "pnlData"),
+    ):
+        page = page.replace(marker, visible if name in shown else f'{visible} style="display:none"')
+    return page
+
+
+def rom_outcomes(parser_cls: type, inn: str, rewrite: Optional[Callable[[str], str]] = None):
+    parser, responses = http_parser(parser_cls, rewrite)
+    http = outcome_of(lambda: parser._http_engine.search(inn))
+    body = responses[-1].body if responses[-1].status == 200 else ""
+    page = body if body.lstrip().startswith("<") else rom_browser_page(body)
+    return http, browser_outcome(parser_cls, page)
+
+
+@pytest.mark.parametrize("inn, expected", [
+    (FOUND_INN, ("value", True)),
+    (NOT_FOUND_INN, ("value", False)),
+    ("50010073", ("error", FieldFormatError)),
+])
+def test_npd_matches_browser(clean_sites, npd_parser_cls, inn, expected):
+    http, browser = npd_outcomes(npd_parser_cls, inn)
+    assert http == browser == expected
+
+
+def test_npd_unexpected_status_text(clean_sites, npd_parser_cls):
+    http, browser = npd_outcomes(npd_parser_cls, FOUND_INN,
+                                 rewrite=lambda body: body.replace("является плательщиком", "сведения обновляются"))
+    assert http == browser == ("error", ServiceUnavailableError)
+
+
+def test_npd_service_error(clean_sites, npd_parser_cls):
+    clean_sites.error_rate = 1.0
+    http, browser = npd_outcomes(npd_parser_cls, FOUND_INN)
+    assert http == browser == ("error", ServiceUnavailableError)
+
+
+@pytest.mark.parametrize("inn, expected", [
+    (FOUND_INN, ("value", True)),
+    (NOT_FOUND_INN, ("value", False)),
+    ("50010073", ("error", FieldFormatError)),
+])
+def test_rom_matches_browser(clean_sites, rom_parser_cls, inn, expected):
+    http, browser = rom_outcomes(rom_parser_cls, inn)
+    assert http == browser == expected
+
+
+@pytest.mark.parametrize("found", [True, False])
+def test_rom_html_response_matches_browser(clean_sites, rom_parser_cls, found):
+    # Ответ — разметка с панелями результата (без скрипта страницы)
+    page = rom_browser_page(json.dumps({"rows": [{}] if found else []}))
+    page = re.sub(r"<script>.*?</script>", "", page, flags=re.S)
+    http, browser = rom_outcomes(rom_parser_cls, FOUND_INN, rewrite=lambda body: page)
+    assert http == browser == ("value", found)
+
+
+def test_rom_service_error(clean_sites, rom_parser_cls):
+    clean_sites.error_rate = 1.0
+    http, browser = rom_outcomes(rom_parser_cls, FOUND_INN)
+    assert http == browser == ("error", ServiceUnavailableError)
+
+
+class BrowserFallback(Exception):
+    """Вызван сценарий браузера."""
+
+
+def fallback_to_browser(parser: Any) -> Any:
+    """Подменяет begin(): вызов сценария браузера возбуждает BrowserFallback."""
+    def begin(*args, **kwargs):
+        raise BrowserFallback
+
+    parser.begin = begin
+    return parser
+
+
+@pytest.mark.parametrize("rewrite", [
+    None,
+    lambda body: re.sub(r"<div>\d{12} [^<]*</div>", "", body),
+], ids=["captcha", "unexpected_markup"])
+def test_npd_falls_back_to_browser(clean_sites, npd_parser_cls, rewrite):
+    if rewrite is None:
+        clean_sites.captcha_rate = 1.0
+    http, _ = npd_outcomes(npd_parser_cls, FOUND_INN, rewrite)
+    assert http == ("error", EngineFallback)
+
+    parser, _ = http_parser(npd_parser_cls, rewrite)
+    with pytest.raises(BrowserFallback):
+        fallback_to_browser(parser).parse(FOUND_INN)
+
+
+@pytest.mark.parametrize("rewrite", [
+    None,
+    lambda body: json.dumps({"status": "ok"}),
+    lambda body: "<html><body><div>Технические работы</div></body></html>",
+], ids=["captcha", "unexpected_json", "unexpected_markup"])
+def test_rom_falls_back_to_browser(clean_sites, rom_parser_cls, rewrite):
+    if rewrite is None:
+        clean_sites.captcha_rate = 1.0
+    http, browser = rom_outcomes(rom_parser_cls, FOUND_INN, rewrite)
+    assert http == ("error", EngineFallback)
+    # Браузер не увидел бы ни одного элемента результата: сценарий браузера разберется сам
+    assert browser == ("error", ServiceUnavailableError)
+
+    parser, _ = http_parser(rom_parser_cls, rewrite)
+    with pytest.raises(BrowserFallback):
+        fallback_to_browser(parser).parse(FOUND_INN)
+
+
+@pytest.mark.parametrize("inn, expected", [(FOUND_INN, True), (NOT_FOUND_INN, False)])
+def test_parse_uses_http_engine(clean_sites, npd_parser_cls, rom_parser_cls, inn, expected):
+    for parser_cls in (npd_parser_cls, rom_parser_cls):
+        parser, responses = http_parser(parser_cls)
+        assert fallback_to_browser(parser).parse(inn) is expected
+        assert not parser.driver_started
@@ -0,0 +1,122 @@
+"""
+Инкрементальная перепроверка (incremental.py): вероятность изменения в RecheckPolicy, min_age
+по-умолчанию, история статусов и запуск IncrementalChecker с файлом изменений.
+"""
+import io
+import json
+import math
+from concurrent.futures import Future
+
+import pytest
+
+from cli import item_key
+from exceptions import InnNotFoundError, ServiceCaptchaError
+from incremental import DAY, IncrementalChecker, RecheckPolicy, StatusHistory, default_min_age
+from parser_npd import NpdParser
+from results import Status
+
+FOUND = "7707083893"
+NOT_FOUND = "500100732259"
+NOW = 1_000 * DAY
+
+
+def subject(age: float, changes: int = 0, observed: float = 0.0) -> dict:
+    checked_at = NOW - age
+    return {"checked_at": checked_at, "first_checked": checked_at - observed, "changes": changes}
+
+
+def test_new_and_old_subjects_always_due():
+    policy = RecheckPolicy()
+    assert policy.score(None, NOW) == 1.0
+    assert policy.score(subject(policy.max_age), NOW) == 1.0
+
+
+def test_probability_of_change():
+    policy = RecheckPolicy(min_age=0.0, threshold=0.0, prior_days=90.0)
+    # Без истории изменений — априорно одно изменение за prior_days дней
+    assert policy.score(subject(9 * DAY), NOW) == pytest.approx(1 - math.exp(-0.1))
+    # Три изменения за 110 дней наблюдений: (3 + 1) / (110 + 90) дней
+    assert policy.score(subject(10 * DAY, changes=3, observed=110 * DAY), NOW) == pytest.approx(1 - math.exp(-0.2))
+
+
+def test_threshold_and_min_age():
+    policy = RecheckPolicy(min_age=DAY, threshold=0.1)
+    assert policy.score(subject(DAY / 2, changes=100, observed=DAY), NOW) is None
+    assert policy.score(subject(5 * DAY), NOW) is None
+    assert policy.score(subject(10 * DAY), NOW) == pytest.approx(1 - math.exp(-10 / 90))
+
+
+def test_default_min_age_is_half_cache_ttl(scripted_parser):
+    assert default_min_age(NpdParser) == NpdParser.CACHE_TTL / 2 == 12 * 60 * 60
+    parser_cls = type(scripted_parser(CACHE_TTL=3600))
+    assert default_min_age(parser_cls) == 1800
+    with StatusHistory(":memory:") as history:
+        assert IncrementalChecker(history, NpdParser).policy.min_age == 12 * 60 * 60
+
+
+def test_history_records_only_changes():
+    with StatusHistory(":memory:") as history:
+        item = {"inn": FOUND}
+        assert history.observe("NpdParser", "k", item, Status.OK, True, at=1.0) == {}
+        assert history.observe("NpdParser", "k", item, Status.OK, True, at=2.0) is None
+        previous = history.observe("NpdParser", "k", item, Status.NOT_FOUND, None, at=3.0)
+        assert (previous["status"], previous["value"], previous["checked_at"]) == ("ok", True, 2.0)
+
+        record = history.get("NpdParser", "k")
+        assert (record["checks"], record["changes"], record["first_checked"], record["changed_at"]) == (3, 1, 1.0, 3.0)
+        assert history.changes("NpdParser", "k") == [
+            {"changed_at": 3.0, "old_status": "ok", "old_value": True, "status": "not_found", "value": None},
+        ]
+
+
+def completed(parser):
+    """Функция постановки запроса, выполняющая parse() сразу."""
+    def submit(**item) -> Future:
+        future = Future()
+        try:
+            future.set_result(parser.parse(**item))
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+
+    return submit
+
+
+def test_run_checks_only_due_subjects(scripted_parser):
+    parser = scripted_parser({NOT_FOUND: [InnNotFoundError, True], "7736050003": ServiceCaptchaError})
+    items = [{"inn": FOUND}, {"inn": NOT_FOUND}, {"inn": "7736050003"}, {"inn": "123"}, {"inn": FOUND}]
+    with StatusHistory(":memory:") as history:
+        checker = IncrementalChecker(history, type(parser))
+        diff = io.StringIO()
+        report = checker.run(items, completed(parser), diff)
+        assert {name: report[name] for name in ("total", "checked", "failed", "changed", "new", "saved")} == {
+            "total": 3, "checked": 2, "failed": 1, "changed": 2, "new": 2, "saved": 0,
+        }
+        assert (report["invalid"], report["duplicates"]) == (1, 1)
+        assert [json.loads(line)["status"] for line in diff.getvalue().splitlines()] == ["ok", "not_found"]
+        # Капча не сохраняется в истории: ИНН остается к проверке
+        assert history.get(type(parser).__name__, item_key({"inn": "7736050003"})) is None
+
+        parser.calls.clear()
+        report = checker.run(items, completed(parser), diff)
+        assert parser.calls == ["7736050003"]
+        assert (report["saved"], report["failed"]) == (2, 1)
+
+        # Без min_age перепроверяются все ИНН; изменился только один
+        checker.policy = RecheckPolicy(min_age=0.0, threshold=0.0)
+        diff = io.StringIO()
+        report = checker.run(items, completed(parser), diff)
+        change = json.loads(diff.getvalue())
+        assert (report["checked"], report["changed"], report["new"]) == (2, 1, 0)
+        assert change["input"] == {"inn": NOT_FOUND}
+        assert (change["status"], change["result"], change["previous"]["status"]) == ("ok", True, "not_found")
+
+
+def test_budget_defers_lowest_scores(scripted_parser):
+    parser_cls = type(scripted_parser())
+    with StatusHistory(":memory:") as history:
+        checker = IncrementalChecker(history, parser_cls, RecheckPolicy(min_age=0.0, threshold=0.0))
+        history.observe(checker.parser, item_key({"inn": FOUND}), {"inn": FOUND}, Status.OK, True, at=NOW - DAY)
+        plan = checker.plan([{"inn": FOUND}, {"inn": NOT_FOUND}], now=NOW, budget=1)
+        assert plan["due"] == [(item_key({"inn": NOT_FOUND}), {"inn": NOT_FOUND})]
+        assert plan["deferred"] == 1
@@ -0,0 +1,123 @@
+"""
+Общий набор проверок хранилищ очереди (jobqueue.py): SqliteQueue, RedisQueue на LocalRedis и
+RedisQueue на fakeredis — последний выполняет сами Lua-скрипты (нужны пакеты fakeredis и lupa,
+без них вариант пропускается).
+"""
+import time
+
+import pytest
+
+from exceptions import ServiceUnavailableError
+from jobqueue import LocalRedis, QueueWorker, RedisQueue, SqliteQueue, job_id, submit
+from ratelimit import RateLimiter
+from results import ParseResult, Status, status_of
+
+QUEUE = "npd"
+
+
+@pytest.fixture(params=["sqlite", "local_redis", "fakeredis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SqliteQueue(str(tmp_path / "queue.sqlite3"))
+    elif request.param == "local_redis":
+        backend = RedisQueue(LocalRedis())
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        backend = RedisQueue(fakeredis.FakeRedis())
+    yield backend
+    backend.close()
+
+
+def test_put_is_idempotent(backend):
+    assert backend.put(QUEUE, "a", {"inn": "7707083893"})
+    assert not backend.put(QUEUE, "a", {"inn": "7707083893"})
+    job = backend.reserve(QUEUE, 60)
+    assert backend.ack(job, ParseResult(Status.OK, True))
+    # Выполненное задание тоже не добавляется повторно
+    assert not backend.put(QUEUE, "a", {"inn": "7707083893"})
+    assert backend.stats(QUEUE) == {"ready": 0, "delayed": 0, "done": 1}
+
+
+def test_reserve_hands_job_to_one_worker(backend):
+    backend.put(QUEUE, "a", {"inn": "7707083893"})
+    job = backend.reserve(QUEUE, 60)
+    assert (job.id, job.queue, job.arguments, job.attempt) == ("a", QUEUE, {"inn": "7707083893"}, 1)
+    assert backend.reserve(QUEUE, 60) is None
+    assert backend.stats(QUEUE) == {"ready": 0, "delayed": 1, "done": 0}
+
+
+def test_expired_reservation_is_requeued(backend):
+    backend.put(QUEUE, "a", {"inn": "7707083893"})
+    lost = backend.reserve(QUEUE, 0.05)
+    time.sleep(0.1)
+    job = backend.reserve(QUEUE, 60)
+    assert job.id == "a" and job.attempt == 2 and job.lease != lost.lease
+    # Рабочий с истекшим резервом не может подтвердить или вернуть задание
+    assert not backend.ack(lost, ParseResult(Status.OK, True))
+    assert not backend.retry(lost, 0.0)
+    assert backend.ack(job, ParseResult(Status.OK, False))
+    assert list(backend.results(QUEUE)) == [("a", ParseResult(Status.OK, False))]
+
+
+def test_retry_delay(backend):
+    backend.put(QUEUE, "a", {"inn": "7707083893"})
+    job = backend.reserve(QUEUE, 60)
+    assert backend.retry(job, 0.2)
+    assert not backend.retry(job, 0.0)
+    assert backend.reserve(QUEUE, 60) is None
+    assert backend.stats(QUEUE) == {"ready": 0, "delayed": 1, "done": 0}
+    time.sleep(0.25)
+    again = backend.reserve(QUEUE, 60)
+    assert again.id == "a" and again.attempt == 2
+
+
+def test_put_delay_and_order(backend):
+    backend.put(QUEUE, "later", {"inn": "500100732259"}, delay=0.2)
+    backend.put(QUEUE, "now", {"inn": "7707083893"})
+    assert backend.reserve(QUEUE, 60).id == "now"
+    assert backend.reserve(QUEUE, 60) is None
+    time.sleep(0.25)
+    assert backend.reserve(QUEUE, 60).id == "later"
+
+
+def test_queues_are_separate(backend):
+    backend.put("npd", "a", {"inn": "7707083893"})
+    assert backend.reserve("rom", 60) is None
+    assert backend.reserve("npd", 60).id == "a"
+
+
+class FlakyParser:
+    """Парсер без браузера: первый запрос каждого ИНН завершается недоступностью сервиса."""
+    INN_LENGTHS = (10, 12)
+    url = "http://local.test/"
+
+    def __init__(self, timeout: float = 30, headless: bool = True) -> None:
+        self.seen: set[str] = set()
+        self.resets = 0
+
+    def parse_result(self, inn: str) -> ParseResult:
+        if inn not in self.seen:
+            self.seen.add(inn)
+            return ParseResult(status_of(ServiceUnavailableError))
+        return ParseResult(Status.OK, inn.endswith("3"))
+
+    def reset(self) -> None:
+        self.resets += 1
+
+    def close(self) -> None:
+        pass
+
+
+def test_worker_retries_and_acks(backend):
+    counts = submit(backend, QUEUE, iter([{"inn": "7707083893"}, {"inn": "7707083893 "}, {"inn": "123"},
+                                          {"inn": "500100732259"}]))
+    assert counts == {"added": 2, "duplicates": 1, "invalid": 1}
+
+    limiter = RateLimiter(rates={"local.test": 1000.0}, backoff_base=0.0)
+    worker = QueueWorker(backend, FlakyParser, QUEUE, poll_interval=0.01, limiter=limiter)
+    assert worker.run(exit_when_empty=True) == {"acked": 2, "retried": 2, "lost": 0}
+    assert dict(backend.results(QUEUE)) == {
+        job_id({"inn": "7707083893"}): ParseResult(Status.OK, True),
+        job_id({"inn": "500100732259"}): ParseResult(Status.OK, False),
+    }
@@ -0,0 +1,39 @@
+"""
+Локаторы парсеров на локальных копиях страниц (benchmarks/mock_sites.py): каждый вариант находит
+ровно один элемент, а основной вариант переживает сдвиг разметки, ломающий позиционный XPath.
+"""
+import pytest
+
+from benchmarks.mock_sites import ARBITR_PAGE, INN_PAGE, NPD_PAGE, ROM_PAGE
+from locators import compile_registry
+from parser_arbitr import ArbitrParser
+from parser_inn import InnParser
+from parser_npd import NpdParser
+from parser_rom import RomParser
+from replay import SnapshotDriver
+
+PAGES = [(NpdParser, NPD_PAGE), (RomParser, ROM_PAGE), (InnParser, INN_PAGE), (ArbitrParser, ARBITR_PAGE)]
+
+
+def matches(page: str, candidates) -> list[int]:
+    driver = SnapshotDriver(page)
+    return [len(driver.find_elements(by, value)) for by, value in candidates]
+
+
+@pytest.mark.parametrize("parser_cls, page", PAGES, ids=[parser_cls.__name__ for parser_cls, _ in PAGES])
+def test_every_candidate_finds_one_element(parser_cls, page):
+    for name, candidates in compile_registry(parser_cls.LOCATORS).items():
+        assert matches(page, candidates) == [1] * len(candidates), name
+
+
+@pytest.mark.parametrize("parser_cls, page, name, shifted", [
+    (RomParser, ROM_PAGE, "submit", ('<div id="pnlSearch">', '<div id="pnlSearch">\n    <div>Подсказка</div>')),
+    (ArbitrParser, ARBITR_PAGE, "notification_close", ('<body id="js">', '<body id="js">\n<div></div>')),
+    (ArbitrParser, ARBITR_PAGE, "submit", ('<div><button type="button" onclick="search()">Найти</button></div>',
+                                           '<form><button type="button" onclick="search()">Найти</button></form>')),
+])
+def test_primary_survives_markup_shift(parser_cls, page, name, shifted):
+    candidates = compile_registry(parser_cls.LOCATORS)[name]
+    found = matches(page.replace(*shifted), candidates)
+    assert found[0] == 1
+    assert found[-1] == 0
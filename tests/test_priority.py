@@ -0,0 +1,164 @@
+"""
+PriorityScheduler (priority.py): порядок полос и сроков, резерв рабочих для полосы INTERACTIVE
+и завершение запросов, которые не успеют выполниться, DeadlineExceededError.
+"""
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from exceptions import DeadlineExceededError
+from priority import Lane, PriorityScheduler
+
+
+class GatedParser:
+    """Парсер без браузера: parse() записывает вызов и ждет открытия шлюза с именем аргумента."""
+
+    def __init__(self, calls: list[str], gates: dict[str, threading.Event], delay: float = 0.0) -> None:
+        self.calls = calls
+        self.gates = gates
+        self.delay = delay
+
+    def parse(self, name: str) -> str:
+        self.calls.append(name)
+        gate = self.gates.get(name)
+        if gate is not None:
+            assert gate.wait(5)
+        time.sleep(self.delay)
+        return name
+
+    def close(self) -> None:
+        pass
+
+
+class Harness:
+    def __init__(self, workers: int, reserved: int, delay: float = 0.0) -> None:
+        self.calls: list[str] = []
+        self.gates: dict[str, threading.Event] = {}
+        self.scheduler = PriorityScheduler(
+            {GatedParser: workers}, reserved=reserved,
+            parser_factory=lambda parser_cls: parser_cls(self.calls, self.gates, delay),
+        )
+
+    def gate(self, name: str) -> threading.Event:
+        self.gates[name] = threading.Event()
+        return self.gates[name]
+
+    def wait_started(self, name: str) -> None:
+        deadline = time.monotonic() + 5
+        while name not in self.calls:
+            assert time.monotonic() < deadline, f"{name} не выдан рабочему"
+            time.sleep(0.005)
+
+    def stats(self) -> dict:
+        return self.scheduler.stats()["GatedParser"]
+
+
+@pytest.fixture
+def harness():
+    harnesses = []
+
+    def make(workers: int = 1, reserved: int = 0, delay: float = 0.0) -> Harness:
+        harnesses.append(Harness(workers, reserved, delay))
+        return harnesses[-1]
+
+    yield make
+    for harness in harnesses:
+        for gate in harness.gates.values():
+            gate.set()
+        harness.scheduler.close(cancel_pending=True)
+
+
+def test_lanes_served_by_priority_then_deadline(harness):
+    h = harness()
+    blocker = h.gate("blocker")
+    first = h.scheduler.submit(GatedParser, "blocker", lane=Lane.BULK)
+    h.wait_started("blocker")
+
+    futures = [
+        h.scheduler.submit(GatedParser, "bulk", lane=Lane.BULK),
+        h.scheduler.submit(GatedParser, "normal", lane=Lane.NORMAL),
+        h.scheduler.submit(GatedParser, "interactive", lane=Lane.INTERACTIVE),
+        h.scheduler.submit(GatedParser, "interactive_deadline", lane=Lane.INTERACTIVE, deadline=60),
+    ]
+    blocker.set()
+    assert [future.result(5) for future in [first, *futures]] == ["blocker", "bulk", "normal", "interactive",
+                                                                  "interactive_deadline"]
+    assert h.calls == ["blocker", "interactive_deadline", "interactive", "normal", "bulk"]
+    assert h.stats()["lanes"]["bulk"]["completed"] == 2
+
+
+def test_reserved_worker_serves_only_interactive(harness):
+    h = harness(workers=2, reserved=1)
+    gates = [h.gate("bulk1"), h.gate("bulk2")]
+    bulk = [h.scheduler.submit(GatedParser, name) for name in ["bulk1", "bulk2"]]
+    h.wait_started("bulk1")
+    time.sleep(0.05)
+    # Резервный рабочий свободен, но массовый запрос ждет общего рабочего
+    assert h.calls == ["bulk1"]
+    assert h.stats()["lanes"]["bulk"]["queued"] == 1
+
+    assert h.scheduler.parse(GatedParser, "interactive", deadline=5) == "interactive"
+    assert h.calls == ["bulk1", "interactive"]
+    for gate in gates:
+        gate.set()
+    assert [future.result(5) for future in bulk] == ["bulk1", "bulk2"]
+
+
+def test_reserve_must_leave_shared_workers():
+    with pytest.raises(ValueError):
+        PriorityScheduler({GatedParser: 2}, reserved=2)
+
+
+def test_hopeless_request_rejected_at_submit(harness):
+    h = harness(delay=0.05)
+    for index in range(5):
+        h.scheduler.parse(GatedParser, f"warmup{index}")
+    assert h.stats()["estimate"] >= 0.05
+
+    future = h.scheduler.submit(GatedParser, "late", lane=Lane.INTERACTIVE, deadline=0.01)
+    with pytest.raises(DeadlineExceededError):
+        future.result(1)
+    assert "late" not in h.calls
+    assert h.stats()["lanes"]["interactive"]["skipped"] == 1
+
+
+def test_queued_request_expires(harness):
+    h = harness(delay=0.05)
+    for index in range(5):
+        h.scheduler.parse(GatedParser, f"warmup{index}")
+    blocker = h.gate("blocker")
+    h.scheduler.submit(GatedParser, "blocker")
+    h.wait_started("blocker")
+
+    future = h.scheduler.submit(GatedParser, "expiring", deadline=0.3)
+    with pytest.raises(DeadlineExceededError):
+        future.result(2)
+    blocker.set()
+    assert "expiring" not in h.calls
+    assert h.stats()["lanes"]["bulk"]["skipped"] == 1
+
+
+def test_cancel_queued_request(harness):
+    h = harness()
+    blocker = h.gate("blocker")
+    h.scheduler.submit(GatedParser, "blocker")
+    h.wait_started("blocker")
+    cancelled = h.scheduler.submit(GatedParser, "cancelled")
+    kept = h.scheduler.submit(GatedParser, "kept")
+    assert cancelled.cancel()
+    blocker.set()
+    assert kept.result(5) == "kept"
+    with pytest.raises(CancelledError):
+        cancelled.result()
+    assert h.calls == ["blocker", "kept"]
+
+
+def test_close_runs_pending_requests(harness):
+    h = harness()
+    futures = [h.scheduler.submit(GatedParser, f"job{index}") for index in range(3)]
+    h.scheduler.close()
+    assert [future.result(0) for future in futures] == ["job0", "job1", "job2"]
+    with pytest.raises(RuntimeError):
+        h.scheduler.submit(GatedParser, "closed")
@@ -0,0 +1,97 @@
+"""
+RateLimiter (ratelimit.py): подстройка скорости AIMD, повтор временных ошибок и учет ответов сайта.
+"""
+import pytest
+from selenium.common import WebDriverException
+
+from exceptions import FieldFormatError, InnNotFoundError, ServiceCaptchaError, ServiceUnavailableError
+from ratelimit import HostLimiter, RateLimiter
+
+INN = "7707083893"
+HOST = "scripted.test"
+
+
+@pytest.fixture
+def limiter():
+    # Высокая скорость и нулевая задержка повтора: тесты не ждут
+    return RateLimiter(rates={HOST: 10.0}, max_retries=2, backoff_base=0.0, burst=100, decrease_interval=0.0)
+
+
+def test_additive_increase_multiplicative_decrease():
+    host = HostLimiter(rate=2.0, increase=0.1, decrease=0.5, decrease_interval=0.0, min_rate=0.5, max_rate=2.2)
+    host.on_success()
+    assert host.rate == pytest.approx(2.05)
+    host.on_throttle()
+    assert host.rate == pytest.approx(1.025)
+    for _ in range(3):
+        host.on_throttle()
+    assert host.rate == 0.5
+    for _ in range(1000):
+        host.on_success()
+    assert host.rate == 2.2
+    assert host.safe_rate() == pytest.approx((2.05 + 1.025 + 0.5125 + 0.5) / 4 * 0.5)
+
+
+def test_throttle_decreases_once_per_interval():
+    host = HostLimiter(rate=4.0, decrease_interval=60.0)
+    host.on_throttle()
+    host.on_throttle()
+    assert host.rate == 2.0
+    assert host.stats()["throttles"] == 2
+
+
+def test_acquire_waits_when_bucket_empty():
+    host = HostLimiter(rate=20.0, burst=1)
+    assert host.acquire() == 0.0
+    assert host.acquire() == pytest.approx(0.05, abs=0.01)
+
+
+def test_backoff_bounds():
+    limiter = RateLimiter(backoff_base=1.0, backoff_max=5.0)
+    assert all(0.0 <= limiter.backoff(0) <= 1.0 for _ in range(100))
+    assert all(0.0 <= limiter.backoff(10) <= 5.0 for _ in range(100))
+
+
+def test_retryable_error_retried_with_reset(limiter, scripted_parser):
+    parser = scripted_parser({INN: [ServiceCaptchaError, ServiceUnavailableError, "ok"]})
+    resets = []
+    parser.reset = lambda: resets.append(True)
+    assert limiter.call(parser, INN) == "ok"
+    assert len(parser.calls) == 3 and len(resets) == 2
+    stats = limiter.for_url(parser.url).stats()
+    assert (stats["throttles"], stats["successes"]) == (2, 1)
+    assert stats["rate"] < 10.0
+
+
+def test_retries_exhausted(limiter, scripted_parser):
+    parser = scripted_parser({INN: ServiceUnavailableError})
+    with pytest.raises(ServiceUnavailableError):
+        limiter.call(parser, INN)
+    assert len(parser.calls) == 3
+
+
+def test_answered_error_counts_as_success(limiter, scripted_parser):
+    parser = scripted_parser({INN: InnNotFoundError})
+    with pytest.raises(InnNotFoundError):
+        limiter.call(parser, INN)
+    stats = limiter.for_url(parser.url).stats()
+    assert len(parser.calls) == 1
+    assert (stats["successes"], stats["throttles"]) == (1, 0)
+    assert stats["rate"] > 10.0
+
+
+def test_browser_error_does_not_change_rate(limiter, scripted_parser):
+    parser = scripted_parser({INN: WebDriverException})
+    with pytest.raises(WebDriverException):
+        limiter.call(parser, INN)
+    stats = limiter.for_url(parser.url).stats()
+    assert len(parser.calls) == 1
+    assert (stats["rate"], stats["successes"], stats["throttles"]) == (10.0, 0, 0)
+
+
+def test_invalid_input_rejected_before_token(limiter, scripted_parser):
+    parser = scripted_parser()
+    with pytest.raises(FieldFormatError):
+        limiter.call(parser, "7707083894")
+    assert parser.calls == []
+    assert limiter.report() == {}
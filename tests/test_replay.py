@@ -0,0 +1,97 @@
+"""
+Запись и воспроизведение (replay.py): вызовы записываются в архив xz и воспроизводятся без сети
+и браузера. Для парсеров на Selenium воспроизводится только resolve() по записанному исходу и снимку
+страницы — отправка формы и ожидание ответа (begin(), _wait_for_response()) не проверяются.
+"""
+import json
+import lzma
+
+import pytest
+
+from benchmarks.mock_sites import NPD_PAGE
+from parser_npd import NpdParser
+from replay import Recorder, ReplayMismatchError, ReplayTransport, SnapshotDriver, load_cases, verify
+from results import Status
+from test_http_engine import FOUND_INN, NOT_FOUND_INN
+
+
+class LocalNpdParser(NpdParser):
+    """NpdParser, импортируемый replay_case по пути модуль:Класс; URL задает фикстура local_npd."""
+
+
+@pytest.fixture
+def local_npd(clean_sites, monkeypatch):
+    monkeypatch.setattr(LocalNpdParser, "URL", f"{clean_sites.base_url}/check-status/")
+    return LocalNpdParser
+
+
+def test_http_round_trip(tmp_path, local_npd):
+    archive = str(tmp_path / "npd.jsonl.xz")
+    with Recorder(archive) as recorder, local_npd(timeout=5, engine="http") as parser:
+        results = [recorder.parse(parser, inn) for inn in [FOUND_INN, NOT_FOUND_INN, "123"]]
+    assert [(result.status, result.value) for result in results] == [
+        (Status.OK, True), (Status.OK, False), (Status.INVALID_INPUT, None),
+    ]
+
+    cases = list(load_cases(archive))
+    assert [case["arguments"] for case in cases] == [{"inn": FOUND_INN}, {"inn": NOT_FOUND_INN}, {"inn": "123"}]
+    assert cases[0]["parser"] == f"{__name__}:LocalNpdParser" and cases[0]["engine"] == "http"
+    assert [exchange["method"] for exchange in cases[0]["exchanges"]] == ["GET", "POST"]
+    assert cases[2]["exchanges"] == []
+
+    report = verify(archive)
+    assert (report["cases"], report["passed"], report["failed"]) == (3, 3, [])
+
+
+def test_archive_appends_xz_streams(tmp_path, local_npd):
+    archive = str(tmp_path / "npd.jsonl.xz")
+    for inn in [FOUND_INN, NOT_FOUND_INN]:
+        with Recorder(archive) as recorder, local_npd(timeout=5, engine="http") as parser:
+            recorder.parse(parser, inn=inn)
+    assert [case["arguments"]["inn"] for case in load_cases(archive)] == [FOUND_INN, NOT_FOUND_INN]
+    assert verify(archive)["passed"] == 2
+
+
+def test_verify_reports_changed_result(tmp_path, local_npd):
+    archive = str(tmp_path / "npd.jsonl.xz")
+    with Recorder(archive) as recorder, local_npd(timeout=5, engine="http") as parser:
+        recorder.parse(parser, FOUND_INN)
+    case = next(load_cases(archive))
+    case["value"] = False
+    # Ответ сайта с другим URL не совпадает с запросом движка
+    mismatched = dict(case, value=True, exchanges=[dict(case["exchanges"][0], url="http://other.test/")])
+    with lzma.open(archive, "wt", encoding="utf-8") as file:
+        file.write(json.dumps(case, ensure_ascii=False) + "\n" + json.dumps(mismatched, ensure_ascii=False) + "\n")
+
+    report = verify(archive)
+    assert report["passed"] == 0
+    assert [failure["actual"] for failure in report["failed"]] == [
+        {"status": "ok", "value": True}, {"status": "error", "value": None},
+    ]
+
+
+def test_replay_transport_checks_order():
+    transport = ReplayTransport([{"method": "GET", "url": "http://a.test/", "status": 200, "body": "", "cookies": []}])
+    with pytest.raises(ReplayMismatchError):
+        transport("POST", "http://a.test/", {}, {}, 1)
+    with pytest.raises(ReplayMismatchError):
+        transport("GET", "http://a.test/", None, {}, 1)
+
+
+def test_selenium_round_trip_replays_resolve(tmp_path, local_npd):
+    # Браузер, остановившийся на странице результата: форма не отправляется, исход берется со снимка
+    page = NPD_PAGE.format(
+        inn=FOUND_INN, date="", inn_error="display:none;", captcha="",
+        result=f"<div>{FOUND_INN} является плательщиком налога на профессиональный доход</div>",
+    )
+    parser = local_npd(timeout=1, driver=SnapshotDriver(page))
+    parser.begin = lambda inn: None
+    parser.wait_for_outcome = lambda results, errors=None: "result"
+    archive = str(tmp_path / "npd.jsonl.xz")
+    with Recorder(archive) as recorder:
+        assert recorder.parse(parser, FOUND_INN).value is True
+
+    case = next(load_cases(archive))
+    assert (case["engine"], case["outcome"], case["exchanges"]) == ("selenium", "result", [])
+    assert case["page"] == page
+    assert verify(archive)["passed"] == 1
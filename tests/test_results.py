@@ -0,0 +1,88 @@
+"""
+ParseResult (results.py): соответствие исключений и статусов, unwrap(), parse_result() и
+сериализация в JSONL и Arrow.
+"""
+import io
+
+import pytest
+from selenium.common import WebDriverException
+
+from exceptions import (
+    DataVerificationError, DeadlineExceededError, FieldFormatError, InnNotFoundError, LayoutDriftError,
+    ServiceCaptchaError, ServiceUnavailableError, UndefinedError,
+)
+from results import (
+    ERROR_STATUSES, ParseResult, Status, dump_jsonl, from_arrow, load_jsonl, status_of, to_arrow,
+)
+
+
+@pytest.mark.parametrize("error_type, status", [
+    (None, Status.OK),
+    (InnNotFoundError, Status.NOT_FOUND),
+    (DataVerificationError, Status.UNVERIFIED),
+    (FieldFormatError, Status.INVALID_INPUT),
+    (ServiceCaptchaError, Status.CAPTCHA),
+    (ServiceUnavailableError, Status.UNAVAILABLE),
+    (LayoutDriftError, Status.LAYOUT_DRIFT),
+    (DeadlineExceededError, Status.DEADLINE_EXCEEDED),
+    (UndefinedError, Status.UNDEFINED),
+    (WebDriverException, Status.ERROR),
+    (ValueError, Status.ERROR),
+])
+def test_status_of(error_type, status):
+    assert status_of(error_type) is status
+
+
+def test_status_of_subclass():
+    class SiteInnNotFoundError(InnNotFoundError):
+        pass
+
+    assert status_of(SiteInnNotFoundError) is Status.NOT_FOUND
+
+
+def test_every_status_has_one_error_type():
+    statuses = list(ERROR_STATUSES.values())
+    assert len(statuses) == len(set(statuses))
+    assert set(Status) - set(statuses) == {Status.OK, Status.ERROR}
+
+
+@pytest.mark.parametrize("error_type", list(ERROR_STATUSES))
+def test_unwrap_raises_error_of_status(error_type):
+    with pytest.raises(error_type):
+        ParseResult(status_of(error_type)).unwrap()
+
+
+def test_unwrap():
+    assert ParseResult(Status.OK, "500100732259").unwrap() == "500100732259"
+    assert ParseResult(Status.OK, False).ok
+    with pytest.raises(UndefinedError):
+        ParseResult(Status.ERROR).unwrap()
+
+
+def test_parse_result(scripted_parser):
+    parser = scripted_parser({"7707083893": InnNotFoundError})
+    found = parser.parse_result("500100732259")
+    missing = parser.parse_result("7707083893")
+    assert (found.status, found.value, found.source) == (Status.OK, True, "ScriptedParser")
+    assert (missing.status, missing.value) == (Status.NOT_FOUND, None)
+    assert found.duration >= 0.0
+
+
+def test_jsonl_round_trip():
+    results = [
+        ParseResult(Status.OK, True, 1.5, "NpdParser"),
+        ParseResult(Status.OK, "500100732259", 0.25, "InnParser"),
+        ParseResult(Status.CAPTCHA, None, 3.0, "RomParser"),
+    ]
+    file = io.StringIO()
+    assert dump_jsonl(results, file) == 3
+    file.seek(0)
+    assert list(load_jsonl(file)) == results
+
+
+def test_arrow_round_trip():
+    pytest.importorskip("pyarrow")
+    results = [ParseResult(Status.OK, True, 1.5, "NpdParser"), ParseResult(Status.NOT_FOUND, None, 0.5, "NpdParser")]
+    table = to_arrow(results)
+    assert table.num_rows == 2
+    assert list(from_arrow(table)) == results
@@ -0,0 +1,157 @@
+"""
+SingleFlight (singleflight.py): объединение одновременных одинаковых вызовов потоков и корутин,
+передача исключения общего вызова всем ожидающим.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from exceptions import FieldFormatError, InnNotFoundError
+from singleflight import SingleFlight
+
+INN = "7707083893"
+
+
+def wait_coalesced(flights: SingleFlight, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while flights.stats()["coalesced"] < count:
+        assert time.monotonic() < deadline, "ожидающие не присоединились к вызову"
+        time.sleep(0.005)
+
+
+class Gate:
+    """Функция вызова, которая ждет разрешения и считает запуски."""
+
+    def __init__(self, result=None, error: type[Exception] | None = None) -> None:
+        self.release = threading.Event()
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self, *args):
+        self.calls += 1
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    async def run_async(self, *args):
+        self.calls += 1
+        while not self.release.is_set():
+            await asyncio.sleep(0.005)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_threads_share_one_call():
+    flights = SingleFlight()
+    gate = Gate("значение")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flights.do, "key", gate) for _ in range(4)]
+        wait_coalesced(flights, 3)
+        gate.release.set()
+        assert [future.result() for future in futures] == ["значение"] * 4
+    assert gate.calls == 1
+    assert flights.stats() == {"executions": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_exception_propagates_to_all_waiters():
+    flights = SingleFlight()
+    gate = Gate(error=InnNotFoundError)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flights.do, "key", gate) for _ in range(3)]
+        wait_coalesced(flights, 2)
+        gate.release.set()
+        for future in futures:
+            with pytest.raises(InnNotFoundError):
+                future.result()
+    assert gate.calls == 1 and flights.stats()["in_flight"] == 0
+
+
+def test_finished_call_is_not_reused():
+    flights = SingleFlight()
+    results = iter([1, 2])
+    assert flights.do("key", lambda: next(results)) == 1
+    assert flights.do("key", lambda: next(results)) == 2
+    assert flights.stats() == {"executions": 2, "coalesced": 0, "in_flight": 0}
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    gate = Gate(True)
+    gate.release.set()
+    assert flights.do("a", gate) and flights.do("b", gate)
+    assert gate.calls == 2
+
+
+@pytest.mark.parametrize("coroutine", [True, False])
+def test_async_callers_share_one_call(coroutine):
+    flights = SingleFlight()
+    gate = Gate("значение")
+    fn = gate.run_async if coroutine else gate
+
+    async def run():
+        tasks = [asyncio.ensure_future(flights.do_async("key", fn)) for _ in range(3)]
+        while flights.stats()["coalesced"] < 2:
+            await asyncio.sleep(0.005)
+        gate.release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == ["значение"] * 3
+    assert gate.calls == 1
+
+
+def test_async_timeout_does_not_cancel_shared_call():
+    flights = SingleFlight()
+    gate = Gate(error=InnNotFoundError)
+
+    async def run():
+        leader = asyncio.ensure_future(flights.do_async("key", gate.run_async))
+        with pytest.raises(asyncio.TimeoutError):
+            await flights.do_async("key", gate.run_async, call_timeout=0.05)
+        gate.release.set()
+        with pytest.raises(InnNotFoundError):
+            await leader
+
+    asyncio.run(run())
+    assert gate.calls == 1
+
+
+def test_thread_and_coroutine_share_one_call():
+    flights = SingleFlight()
+    gate = Gate("значение")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        thread = executor.submit(flights.do, "key", gate)
+        while flights.stats()["in_flight"] == 0:
+            time.sleep(0.005)
+
+        async def run():
+            waiter = asyncio.ensure_future(flights.do_async("key", gate.run_async))
+            while flights.stats()["coalesced"] < 1:
+                await asyncio.sleep(0.005)
+            gate.release.set()
+            return await waiter
+
+        assert asyncio.run(run()) == "значение"
+        assert thread.result() == "значение"
+    assert gate.calls == 1
+
+
+def test_parse_coalesces_normalized_arguments(scripted_parser):
+    flights = SingleFlight()
+    parser = scripted_parser()
+    gate = Gate(True)
+    parser.parse = gate
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flights.parse, parser, inn) for inn in [INN, "7707 083 893"]]
+        wait_coalesced(flights, 1)
+        gate.release.set()
+        assert [future.result() for future in futures] == [True, True]
+    assert gate.calls == 1
+    with pytest.raises(FieldFormatError):
+        flights.parse(parser, "123")
+    assert flights.stats()["executions"] == 1
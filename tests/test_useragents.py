@@ -0,0 +1,37 @@
+"""
+Пул пользовательских агентов (useragents.py): закрепленный файл и тот же отбор и веса записей
+fake_useragent, что и у UserAgent.random.
+"""
+import pytest
+
+import useragents
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(useragents, "_pool", None)
+    monkeypatch.delenv(useragents.PINNED_ENV, raising=False)
+
+
+def test_pinned_file(tmp_path, monkeypatch):
+    path = tmp_path / "agents.txt"
+    path.write_text("Agent/1\n\n  Agent/2  \n", encoding="utf-8")
+    monkeypatch.setenv(useragents.PINNED_ENV, str(path))
+    assert useragents.user_agent_pool() == ("Agent/1", "Agent/2")
+    assert useragents.random_user_agent() in ("Agent/1", "Agent/2")
+
+
+def test_pin_user_agents():
+    useragents.pin_user_agents(["Agent/1 ", ""])
+    assert useragents.user_agent_pool() == ("Agent/1",)
+    with pytest.raises(ValueError):
+        useragents.pin_user_agents([" "])
+
+
+def test_pool_matches_user_agent_filter():
+    fake_useragent = pytest.importorskip("fake_useragent")
+    user_agent = fake_useragent.UserAgent(browsers='chrome', os="windows", platforms="pc")
+    # Отбор UserAgent.random
+    expected = [browser["useragent"] for browser in user_agent._filter_useragents()]
+    # Повторяющиеся записи остаются в пуле как веса
+    assert list(useragents.user_agent_pool()) == expected
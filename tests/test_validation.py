@@ -0,0 +1,73 @@
+"""
+Нормализация и проверка входных данных (validation.py) до обращения к сайту.
+"""
+import pytest
+
+from benchmarks.mock_sites import INN_PAGE
+from exceptions import FieldFormatError
+from parser_inn import InnParser
+from replay import SnapshotDriver
+from validation import validate_arguments, validate_inn, validate_inns, validate_passport, validate_patronymic
+
+
+@pytest.mark.parametrize("value", [
+    "7707083893", "7707083893\r\n", "7707083893\n", " 7707 083 893\t", "7707-083-893", " 7707083893", 7707083893,
+])
+def test_inn_separators_and_line_endings(value):
+    assert validate_inn(value) == "7707083893"
+    assert list(validate_inns([value])) == ["7707083893"]
+
+
+@pytest.mark.parametrize("value", ["7707083894", "770708389", "77070838931", "7707O83893", ""])
+def test_inn_rejected(value):
+    with pytest.raises(FieldFormatError):
+        validate_inn(value)
+    assert list(validate_inns([value])) == [None]
+
+
+def test_inn_lengths():
+    assert validate_inn("500100732259", (12,)) == "500100732259"
+    with pytest.raises(FieldFormatError):
+        validate_inn("7707083893", (12,))
+
+
+def test_passport_line_ending():
+    assert validate_passport("4506123456\r\n") == "45 06 123456"
+
+
+@pytest.mark.parametrize("value", ["", "   ", None])
+def test_patronymic_optional(value):
+    assert validate_patronymic(value) == ""
+
+
+def test_patronymic_checked_when_given():
+    assert validate_patronymic("  Иванович ") == "Иванович"
+    with pytest.raises(FieldFormatError):
+        validate_patronymic("Иван0вич")
+
+
+def test_arguments_without_patronymic():
+    arguments = validate_arguments({
+        "surname": "Иванов", "name": "Иван", "lastname": "", "birthdate": "1980-01-31", "passport": "4506123456",
+    })
+    assert arguments["lastname"] == ""
+    with pytest.raises(FieldFormatError):
+        validate_arguments({"surname": "", "name": "Иван", "lastname": ""})
+
+
+class FormSubmitted(Exception):
+    """Форма дошла до отправки."""
+
+
+def test_inn_parser_accepts_missing_patronymic():
+    parser = InnParser(timeout=1, driver=SnapshotDriver(INN_PAGE))
+    submitted = {}
+
+    def begin(**arguments):
+        submitted.update(arguments)
+        raise FormSubmitted
+
+    parser.begin = begin
+    with pytest.raises(FormSubmitted):
+        parser.parse(surname="Иванов", name="Иван", lastname="", birthdate="31.01.1980", passport="4506123456")
+    assert submitted["lastname"] == ""
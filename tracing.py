@@ -0,0 +1,164 @@
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Optional, TextIO, TypeVar
+
+import exceptions
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Границы корзин гистограммы длительности шагов (в секундах)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def classify(ex: Optional[BaseException]) -> str:
+    """Возвращает исход шага: ok, имя исключения из exceptions.py или other."""
+    if ex is None:
+        return "ok"
+    if type(ex).__module__ == exceptions.__name__:
+        return type(ex).__name__
+    return "other"
+
+
+class _Histogram:
+    """Гистограмма длительностей с фиксированными корзинами."""
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Tracer:
+    """
+    Сборщик длительностей шагов парсеров. Выключен по-умолчанию: декорированные шаги в этом случае
+    только проверяют флаг enabled.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], _Histogram] = {}
+        self._outcomes: dict[tuple[str, str], int] = {}
+        self._jsonl: Optional[TextIO] = None
+
+    def enable(self, jsonl_path: Optional[str] = None) -> None:
+        """
+        Включает сбор метрик.
+
+        Args:
+            jsonl_path (Optional[str]): Если задан, каждый шаг дополнительно записывается строкой JSON в файл.
+        """
+        with self._lock:
+            if jsonl_path:
+                self._jsonl = open(jsonl_path, "a", encoding="utf-8")
+            self.enabled = True
+
+    def disable(self) -> None:
+        """Выключает сбор метрик и закрывает файл JSONL."""
+        with self._lock:
+            self.enabled = False
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+    def reset(self) -> None:
+        """Сбрасывает накопленные метрики."""
+        with self._lock:
+            self._histograms.clear()
+            self._outcomes.clear()
+
+    def record(self, parser: str, step: str, duration: float, outcome: str) -> None:
+        """Учитывает длительность шага; для шага parse также увеличивает счетчик исходов."""
+        with self._lock:
+            key = (parser, step, outcome)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(duration)
+            if step == "parse":
+                self._outcomes[(parser, outcome)] = self._outcomes.get((parser, outcome), 0) + 1
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps({
+                    "ts": time.time(), "parser": parser, "step": step,
+                    "duration": round(duration, 6), "outcome": outcome,
+                }) + "\n")
+                self._jsonl.flush()
+
+    def to_prometheus(self) -> str:
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = [
+            "# HELP parser_step_duration_seconds Длительность шагов парсеров.",
+            "# TYPE parser_step_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (parser, step, outcome), histogram in sorted(self._histograms.items()):
+                labels = f'parser="{parser}",step="{step}",outcome="{outcome}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'parser_step_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'parser_step_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"parser_step_duration_seconds_sum{{{labels}}} {histogram.total}")
+                lines.append(f"parser_step_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP parser_parse_total Количество вызовов parse() по исходам.")
+            lines.append("# TYPE parser_parse_total counter")
+            for (parser, outcome), count in sorted(self._outcomes.items()):
+                lines.append(f'parser_parse_total{{parser="{parser}",outcome="{outcome}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Записывает метрики в файл (например, для textfile collector node_exporter)."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+
+# Общий сборщик процесса
+TRACER = Tracer()
+
+
+def traced(method: F) -> F:
+    """Декоратор шага парсера: при включенном TRACER записывает длительность и исход вызова."""
+    step = method.__name__.lstrip("_")
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not TRACER.enabled:
+            return method(self, *args, **kwargs)
+
+        error = None
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except BaseException as ex:
+            error = ex
+            raise
+        finally:
+            TRACER.record(type(self).__name__, step, time.perf_counter() - started, classify(error))
+
+    return wrapper  # type: ignore[return-value]
+
+
+# Пример использования
+def main():
+    from parser_npd import NpdParser
+
+    TRACER.enable(jsonl_path="spans.jsonl")
+    with NpdParser(timeout=30) as npd_parser:
+        for inn, result in npd_parser.parse_many(["500100732259", "773605003662"]):
+            print(inn, result)
+    print(TRACER.to_prometheus())
+    TRACER.disable()
+
+
+if __name__ == '__main__':
+    main()
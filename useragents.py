@@ -0,0 +1,71 @@
+import os
+import random
+import threading
+from typing import Iterable, Optional
+
+# Файл с закрепленным списком пользовательских агентов (по одному на строку)
+PINNED_ENV = "NALOG_USER_AGENTS"
+
+_lock = threading.Lock()
+_pool: Optional[tuple[str, ...]] = None
+
+
+def pin_user_agents(agents: Iterable[str]) -> None:
+    """Закрепляет список пользовательских агентов процесса вместо данных fake_useragent."""
+    global _pool
+    agents = tuple(agent.strip() for agent in agents if agent.strip())
+    if not agents:
+        raise ValueError("Пустой список пользовательских агентов")
+    with _lock:
+        _pool = agents
+
+
+def user_agent_pool() -> tuple[str, ...]:
+    """
+    Возвращает пул пользовательских агентов процесса. Загружается один раз: из файла PINNED_ENV,
+    если переменная окружения задана, иначе из данных fake_useragent (Chrome, Windows, ПК).
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _lock:
+        if _pool is None:
+            _pool = _load_pool()
+        return _pool
+
+
+def _load_pool() -> tuple[str, ...]:
+    path = os.environ.get(PINNED_ENV)
+    if path:
+        with open(path, encoding="utf-8") as file:
+            agents = tuple(line.strip() for line in file if line.strip())
+        if agents:
+            return agents
+
+    from fake_useragent import UserAgent
+
+    user_agent = UserAgent(browsers='chrome', os="windows", platforms="pc")
+    # Тот же отбор, что и в UserAgent.random, но один раз на процесс. Повторы не удаляются: частые
+    # агенты встречаются в данных многократно, и random.choice по пулу дает те же вероятности,
+    # что и UserAgent.random
+    agents = tuple(
+        browser["useragent"] for browser in user_agent.data_browsers
+        if browser["browser"] in user_agent.browsers and browser["os"] in user_agent.os
+        and browser["type"] in user_agent.platforms and browser["version"] >= user_agent.min_version
+        and browser["percent"] >= user_agent.min_percentage
+    )
+    return agents or (user_agent.random,)
+
+
+def random_user_agent() -> str:
+    """Возвращает случайный пользовательский агент из пула процесса."""
+    return random.choice(user_agent_pool())
+
+
+# Пример использования
+def main():
+    print(len(user_agent_pool()), random_user_agent())
+
+
+if __name__ == '__main__':
+    main()
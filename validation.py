@@ -0,0 +1,175 @@
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from exceptions import FieldFormatError
+
+# Весовые коэффициенты контрольных цифр ИНН
+_INN10_WEIGHTS = (2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN11_WEIGHTS = (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN12_WEIGHTS = (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+
+# Разделители, допустимые во входных данных ИНН и паспорта (включая концы строк CSV/JSONL)
+_SEPARATORS = str.maketrans("", "", " \t\r\n-\u00a0")
+_DIGITS = re.compile(r"[0-9]+")
+_NAME = re.compile(r"[А-Яа-яЁёA-Za-z]+(?:[ '\-][А-Яа-яЁёA-Za-z]+)*")
+_DATE_FORMATS = ("%d.%m.%Y", "%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d")
+
+
+def _check_digit(digits: str, weights: tuple[int, ...]) -> int:
+    return sum(int(digit) * weight for digit, weight in zip(digits, weights)) % 11 % 10
+
+
+def is_valid_inn(inn: str) -> bool:
+    """Проверяет контрольные цифры нормализованного ИНН (10 цифр — организация, 12 — физическое лицо)."""
+    if len(inn) == 10:
+        return _check_digit(inn, _INN10_WEIGHTS) == int(inn[9])
+    if len(inn) == 12:
+        return (_check_digit(inn, _INN11_WEIGHTS) == int(inn[10])
+                and _check_digit(inn, _INN12_WEIGHTS) == int(inn[11]))
+    return False
+
+
+def validate_inn(value: Any, lengths: tuple[int, ...] = (10, 12)) -> str:
+    """
+    Нормализует ИНН (убирает пробельные символы и дефисы) и проверяет длину и контрольные цифры.
+
+    Args:
+        value (Any): ИНН (строка или число).
+        lengths (tuple[int, ...]): Допустимая длина ИНН.
+    Returns:
+        str: Нормализованный ИНН.
+    Raises:
+        FieldFormatError: Неверный формат или контрольные цифры.
+    """
+    inn = str(value).strip().translate(_SEPARATORS)
+    if len(inn) not in lengths or not _DIGITS.fullmatch(inn) or not is_valid_inn(inn):
+        raise FieldFormatError
+    return inn
+
+
+def validate_passport(value: str) -> str:
+    """
+    Нормализует серию и номер паспорта РФ к формату "xx xx xxxxxx".
+
+    Raises:
+        FieldFormatError: Не 10 цифр.
+    """
+    digits = str(value).strip().translate(_SEPARATORS)
+    if len(digits) != 10 or not _DIGITS.fullmatch(digits):
+        raise FieldFormatError
+    return f"{digits[:2]} {digits[2:4]} {digits[4:]}"
+
+
+def validate_birthdate(value: str | date) -> str:
+    """
+    Нормализует дату рождения к формату ДД.ММ.ГГГГ. Принимаются ДД.ММ.ГГГГ, ДД-ММ-ГГГГ, ДД/ММ/ГГГГ,
+    ГГГГ-ММ-ДД и date.
+
+    Raises:
+        FieldFormatError: Неверный формат, несуществующая дата, дата до 1900 года или в будущем.
+    """
+    if isinstance(value, date):
+        parsed = value
+    else:
+        text = str(value).strip()
+        for date_format in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, date_format).date()
+                break
+            except ValueError:
+                continue
+        else:
+            raise FieldFormatError
+    if parsed.year < 1900 or parsed > date.today():
+        raise FieldFormatError
+    return parsed.strftime("%d.%m.%Y")
+
+
+def validate_name(value: str) -> str:
+    """
+    Нормализует фамилию, имя или отчество: схлопывает пробелы.
+
+    Raises:
+        FieldFormatError: Пустое значение или недопустимые символы.
+    """
+    name = " ".join(str(value).split())
+    if not _NAME.fullmatch(name):
+        raise FieldFormatError
+    return name
+
+
+def validate_patronymic(value: Optional[str]) -> str:
+    """
+    Нормализует отчество (см. validate_name). Отчества может не быть: пустое значение и None
+    возвращаются пустой строкой.
+
+    Raises:
+        FieldFormatError: Недопустимые символы.
+    """
+    if value is None or not str(value).strip():
+        return ""
+    return validate_name(value)
+
+
+# Проверки аргументов parse() по имени
+VALIDATORS: dict[str, Callable[[Any], str]] = {
+    "passport": validate_passport,
+    "birthdate": validate_birthdate,
+    "surname": validate_name,
+    "name": validate_name,
+    "lastname": validate_patronymic,
+}
+
+
+def validate_arguments(arguments: dict[str, Any], inn_lengths: tuple[int, ...] = (10, 12)) -> dict[str, Any]:
+    """
+    Нормализует и проверяет именованные аргументы parse() (inn, passport, birthdate, surname, name,
+    lastname). Остальные аргументы возвращаются без изменений.
+
+    Raises:
+        FieldFormatError: Первый аргумент с неверным форматом.
+    """
+    normalized = {}
+    for name, value in arguments.items():
+        if name == "inn":
+            normalized[name] = validate_inn(value, inn_lengths)
+        elif name in VALIDATORS:
+            normalized[name] = VALIDATORS[name](value)
+        else:
+            normalized[name] = value
+    return normalized
+
+
+def validate_inns(values: Iterable[Any], lengths: tuple[int, ...] = (10, 12)) -> Iterator[Optional[str]]:
+    """
+    Пакетная проверка ИНН для предварительной фильтрации больших входных файлов: для каждого значения
+    возвращает нормализованный ИНН или None. Контрольные цифры считаются без исключений и повторного
+    разбора, результат для повторяющихся значений берется из памяти.
+    """
+    seen: dict[str, Optional[str]] = {}
+    allowed = frozenset(lengths)
+    for value in values:
+        raw = str(value)
+        result = seen.get(raw, ...)
+        if result is ...:
+            inn = raw.strip().translate(_SEPARATORS)
+            result = inn if len(inn) in allowed and _DIGITS.fullmatch(inn) and is_valid_inn(inn) else None
+            if len(seen) < 1_000_000:
+                seen[raw] = result
+        yield result
+
+
+# Пример использования
+def main():
+    print(validate_inn("7707 083 893"))
+    print(validate_passport("4506123456"), validate_birthdate("1980-01-31"), validate_name("  Иванов  "))
+    print(list(validate_inns(["500100732259", "500100732250", "123", "7707083893"])))
+    try:
+        validate_inn("7707083894")
+    except FieldFormatError as ex:
+        print(ex)
+
+
+if __name__ == '__main__':
+    main()